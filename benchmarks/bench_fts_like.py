@@ -0,0 +1,133 @@
+# benchmarks/bench_fts_like.py
+"""
+Benchmark : LIKE '%terme%' (parcours complet) vs réécriture FTS5 (index trigramme).
+
+La base réelle est multipliée synthétiquement : chaque copie reçoit des noms
+"chiffrés" (décalage des lettres) pour garder une distribution de texte réaliste
+sans que les termes recherchés ne correspondent aux copies.
+
+Usage :
+    python benchmarks/bench_fts_like.py --scale 100 --repeat 20
+"""
+import argparse
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.database.schema import metadata, creation_views_sql, creation_fts_sql, rebuild_fts_sql
+from src.database.query_rewrite import rewrite_like_to_fts, available_fts_tables
+from src.database.rollups import materialize_rollups
+
+SOURCE_DB = PROJECT_ROOT / "data" / "processed" / "elections.db"
+
+QUERIES = {
+    "circonscription": "SELECT nom_circonscription, taux_participation FROM circonscriptions "
+                       "WHERE nom_circonscription_norm LIKE '%agboville%'",
+    "parti (vue élus)": "SELECT COUNT(*) FROM vue_elus_uniquement WHERE parti_politique_norm LIKE '%pdci%'",
+    "candidat": "SELECT nom_liste_candidat, score_voix FROM vue_resultats_detailles "
+                "WHERE nom_liste_candidat_norm LIKE '%sangare%'",
+    "région (stats)": "SELECT * FROM vue_stats_regionales WHERE region_nom_norm LIKE '%abidjan%'",
+}
+
+_TEXT_COLUMNS_CIRCO = ["region_nom", "region_nom_norm", "nom_circonscription", "nom_circonscription_norm"]
+_TEXT_COLUMNS_CAND = ["nom_liste_candidat", "nom_liste_candidat_norm", "parti_politique", "parti_politique_norm"]
+
+
+def _shift(text, k):
+    """Décale les lettres de k positions (copie synthétique ne correspondant plus aux termes)."""
+    if text is None or k == 0:
+        return text
+    lower, upper = string.ascii_lowercase, string.ascii_uppercase
+    table = str.maketrans(lower + upper, lower[k % 26:] + lower[:k % 26] + upper[k % 26:] + upper[:k % 26])
+    return f"{text.translate(table)} {k}"
+
+
+def build_scaled_database(path: Path, scale: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    engine.dispose()
+
+    src = sqlite3.connect(SOURCE_DB)
+    src.row_factory = sqlite3.Row
+    circos = [dict(r) for r in src.execute("SELECT * FROM circonscriptions")]
+    cands = [dict(r) for r in src.execute("SELECT * FROM candidats")]
+    src.close()
+
+    dst = sqlite3.connect(path)
+    circo_id = cand_id = 0
+    for k in range(scale):
+        id_map = {}
+        for row in circos:
+            circo_id += 1
+            id_map[row["id"]] = circo_id
+            new = {**row, "id": circo_id, **{c: _shift(row[c], k) for c in _TEXT_COLUMNS_CIRCO}}
+            dst.execute(
+                f"INSERT INTO circonscriptions ({', '.join(new)}) VALUES ({', '.join('?' * len(new))})",
+                list(new.values()),
+            )
+        for row in cands:
+            cand_id += 1
+            new = {
+                **row,
+                "id": cand_id,
+                "circonscription_id": id_map[row["circonscription_id"]],
+                **{c: _shift(row[c], k) for c in _TEXT_COLUMNS_CAND},
+            }
+            dst.execute(
+                f"INSERT INTO candidats ({', '.join(new)}) VALUES ({', '.join('?' * len(new))})",
+                list(new.values()),
+            )
+
+    for sql in creation_views_sql + creation_fts_sql + rebuild_fts_sql:
+        dst.execute(sql)
+    materialize_rollups(dst)
+    dst.commit()
+    dst.execute("ANALYZE")
+    dst.close()
+    print(f"Base synthétique : {circo_id} circonscriptions, {cand_id} candidats (x{scale})")
+
+
+def _time(conn, query, repeat):
+    timings = []
+    rows = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(query).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), sorted(map(tuple, rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100, help="Nombre de copies de la base réelle")
+    parser.add_argument("--repeat", type=int, default=20, help="Exécutions par requête (médiane)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "elections_scaled.db"
+        build_scaled_database(path, args.scale)
+
+        conn = sqlite3.connect(path)
+        fts_tables = available_fts_tables(conn)
+
+        print(f"\n{'requête':<20} {'LIKE (ms)':>10} {'FTS5 (ms)':>10} {'gain':>7} {'lignes':>7}")
+        for name, query in QUERIES.items():
+            rewritten = rewrite_like_to_fts(query, fts_tables)
+            like_ms, like_rows = _time(conn, query, args.repeat)
+            fts_ms, fts_rows = _time(conn, rewritten, args.repeat)
+            assert like_rows == fts_rows, f"Résultats différents pour '{name}'"
+            print(f"{name:<20} {like_ms:>10.2f} {fts_ms:>10.2f} {like_ms / fts_ms:>6.1f}x {len(like_rows):>7}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/bench_import_time.py
+"""
+Benchmark du démarrage à froid : `python -X importtime` dans un processus neuf pour
+- l'import du graphe + build_agent_graph() (sans appel LLM ni base) ;
+- l'import de app.py (interface Streamlit ; ignoré si streamlit n'est pas installé).
+
+Affiche le temps total (médiane sur --repeat processus) et les modules les plus coûteux
+(temps cumulé), et échoue (code de sortie 1) si un scénario dépasse son budget.
+Pour le graphe, la part hors LangGraph (langgraph, langchain_core, langsmith : incompressible,
+~0,7 s ici) a son propre budget : bien plus stable que le total d'une machine à l'autre.
+Mesuré ici (1 CPU, médianes) : total 0,8 à 1,1 s, hors LangGraph ~0,1 s ;
+avant le chargement différé des nœuds : total 1,4 à 2 s, hors LangGraph ~0,7 s.
+Vérifie aussi que les bibliothèques lourdes (SQLAlchemy, matplotlib, client Mistral, pandas)
+ne sont pas chargées par la construction du graphe : elles le sont au premier usage.
+
+Usage :
+    python benchmarks/bench_import_time.py --repeat 5 --budget-ms 1500 --outside-budget-ms 300 --app-budget-ms 4000
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules qui ne doivent pas être importés par la simple construction du graphe
+LAZY_MODULES = ("sqlalchemy", "matplotlib", "langchain_mistralai", "pandas")
+# Paquets du framework, chargés de toute façon pour construire le graphe
+FRAMEWORK_PACKAGES = {"langgraph", "langgraph_sdk", "langchain_core", "langsmith"}
+
+GRAPH_SNIPPET = (
+    "import sys\n"
+    "from src.agent.graph import build_agent_graph\n"
+    "build_agent_graph(); build_agent_graph(async_mode=True)\n"
+    f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+)
+APP_SNIPPET = "import app\n"
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(snippet: str):
+    """Exécute le snippet dans un interpréteur neuf ; renvoie (temps cumulé par module en ms, stdout, code retour)."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", snippet], cwd=PROJECT_ROOT,
+                          capture_output=True, text=True, env=env)
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            modules.append((match.group(4), int(match.group(2)) / 1000, depth))
+    return modules, proc.stdout.strip(), proc.returncode, proc.stderr
+
+
+def framework_ms(modules) -> float:
+    """
+    Temps cumulé des imports du framework les plus externes (un import langsmith fait par
+    langchain_core n'est pas compté deux fois). importtime liste les enfants avant leur parent.
+    """
+    total, parents = 0.0, []
+    for name, ms, depth in reversed(modules):
+        while parents and parents[-1][0] >= depth:
+            parents.pop()
+        nested = any(parent.split(".")[0] in FRAMEWORK_PACKAGES for _, parent in parents)
+        if name.split(".")[0] in FRAMEWORK_PACKAGES and not nested:
+            total += ms
+        parents.append((depth, name))
+    return total
+
+
+def measure(label: str, snippet: str, repeat: int, budget_ms: float, top: int, check_lazy: bool = False,
+            outside_budget_ms: float = None) -> int:
+    """Affiche le temps d'import (médiane) et les modules les plus lourds ; renvoie le nombre de budgets dépassés."""
+    print(f"\n--- {label} ---")
+    totals, outside, modules, stdout = [], [], [], ""
+    for _ in range(repeat):
+        modules, stdout, code, stderr = run_importtime(snippet)
+        if code != 0:
+            error = stderr.strip().splitlines()[-1] if stderr.strip() else f"code {code}"
+            if "ModuleNotFoundError" in error:
+                print(f"ignoré : {error}")
+                return 0
+            print(f"ÉCHEC : {error}")
+            return 1
+        # Somme des modules de premier niveau = temps total d'import du snippet
+        totals.append(sum(ms for _, ms, depth in modules if depth == 0))
+        outside.append(totals[-1] - framework_ms(modules))
+
+    total = statistics.median(totals)
+    heaviest = {}
+    for name, ms, depth in modules:
+        root = name.split(".")[0]
+        if depth <= 1:
+            heaviest[root] = max(heaviest.get(root, 0), ms)
+    print(f"{'paquet':<32} {'cumulé (ms)':>12}")
+    for name, ms in sorted(heaviest.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{name:<32} {ms:>12.1f}")
+    print(f"total (médiane sur {repeat}) : {total:.0f} ms, budget {budget_ms:.0f} ms")
+
+    failures = 0
+    if total > budget_ms:
+        print(f"ÉCHEC : démarrage au-dessus du budget ({total:.0f} ms > {budget_ms:.0f} ms)")
+        failures += 1
+    if outside_budget_ms is not None:
+        rest = statistics.median(outside)
+        print(f"hors LangGraph (médiane) : {rest:.0f} ms, budget {outside_budget_ms:.0f} ms")
+        if rest > outside_budget_ms:
+            print(f"ÉCHEC : part hors LangGraph au-dessus du budget ({rest:.0f} ms > {outside_budget_ms:.0f} ms)")
+            failures += 1
+    loaded = stdout.splitlines()[-1] if check_lazy and stdout else ""
+    if loaded:
+        print(f"ÉCHEC : modules chargés trop tôt : {loaded}")
+        failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Processus mesurés par scénario (médiane)")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("COLD_START_BUDGET_MS", "1500")),
+                        help="Budget du graphe (import + construction), en ms")
+    parser.add_argument("--outside-budget-ms", type=float, default=float(os.getenv("COLD_START_OUTSIDE_BUDGET_MS", "300")),
+                        help="Budget de la part hors LangGraph du graphe, en ms")
+    parser.add_argument("--app-budget-ms", type=float, default=float(os.getenv("APP_COLD_START_BUDGET_MS", "4000")),
+                        help="Budget de l'import de app.py, en ms")
+    parser.add_argument("--top", type=int, default=10, help="Nombre de paquets affichés")
+    args = parser.parse_args()
+
+    failures = measure("graphe : import + build_agent_graph()", GRAPH_SNIPPET, args.repeat, args.budget_ms, args.top,
+                       check_lazy=True, outside_budget_ms=args.outside_budget_ms)
+    failures += measure("app.py", APP_SNIPPET, args.repeat, args.app_budget_ms, args.top)
+
+    if failures:
+        print(f"\nÉCHEC : {failures} contrôle(s) en échec")
+        sys.exit(1)
+    print("\nOK : démarrage dans le budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_query_plans.py
+"""
+Benchmark de non-régression des plans : EXPLAIN QUERY PLAN + temps d'exécution des requêtes
+de few_shot_examples.json (après la réécriture FTS5 faite à l'exécution), sur la base réelle
+et sur une base agrandie synthétiquement.
+
+Échoue (code de sortie 1) si une requête parcourt entièrement une table de base ou un agrégat
+volumineux. Seuls les petits agrégats (une ligne par région ou par parti) peuvent être parcourus.
+
+Usage :
+    python benchmarks/bench_query_plans.py --scale 100 --repeat 20
+"""
+import argparse
+import json
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bench_fts_like import SOURCE_DB, build_scaled_database
+from src.database.query_rewrite import rewrite_like_to_fts, available_fts_tables, full_table_scans
+
+EXAMPLES_PATH = PROJECT_ROOT / "src" / "agent" / "few_shot_examples" / "few_shot_examples.json"
+
+# Agrégats d'une ligne par région ou par parti : leur parcours complet reste borné
+SMALL_ROLLUPS = {"vue_stats_regionales", "stats_sieges_partis", "stats_voix_partis_regions"}
+
+
+def _median_ms(conn, query, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def check_database(path: Path, label: str, examples, repeat: int) -> int:
+    """Affiche plan et temps par requête ; renvoie le nombre de requêtes en parcours complet."""
+    conn = sqlite3.connect(path)
+    fts_tables = available_fts_tables(conn)
+    failures = 0
+
+    print(f"\n--- {label} ---")
+    print(f"{'id':>3} {'intention':<28} {'temps (ms)':>10}  parcours complets")
+    for example in examples:
+        query = rewrite_like_to_fts(example["sql_query"], fts_tables)
+        scans = full_table_scans(conn, query, allowed=SMALL_ROLLUPS)
+        elapsed = _median_ms(conn, query, repeat)
+        status = ", ".join(scans) if scans else "-"
+        print(f"{example['id']:>3} {example['intention'][:28]:<28} {elapsed:>10.2f}  {status}")
+        if scans:
+            failures += 1
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {query}"):
+                print(f"      {row[-1]}")
+    conn.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100, help="Nombre de copies de la base réelle")
+    parser.add_argument("--repeat", type=int, default=20, help="Exécutions par requête (médiane)")
+    args = parser.parse_args()
+
+    with open(EXAMPLES_PATH, "r", encoding="utf-8") as f:
+        examples = json.load(f)
+
+    failures = check_database(SOURCE_DB, "base réelle", examples, args.repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "elections_scaled.db"
+        build_scaled_database(path, args.scale)
+        failures += check_database(path, f"base x{args.scale}", examples, args.repeat)
+
+    if failures:
+        print(f"\nÉCHEC : {failures} plan(s) avec parcours complet")
+        sys.exit(1)
+    print("\nOK : aucun parcours complet")
+
+
+if __name__ == "__main__":
+    main()
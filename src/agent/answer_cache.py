@@ -0,0 +1,415 @@
+# src/agent/answer_cache.py
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Tuple
+
+from src.ingestion.clean_data import ElectionDataCleaner
+from src.database.connection import DatabaseConnection
+from src.database.result_set import ResultSet
+from .streaming import merge_update
+
+
+current_dir = Path(__file__).resolve().parent
+project_root = current_dir.parent.parent
+DEFAULT_CACHE_PATH = project_root / "data" / "cache" / "answer_cache.db"
+# Base interrogée par l'agent : une ré-ingestion invalide les réponses en cache
+SOURCE_DB_PATH = project_root / "data" / "processed" / "elections.db"
+
+# Mots vides ignorés pour la comparaison approximative (near-duplicate)
+_STOP_WORDS = {
+    "le", "la", "les", "l", "un", "une", "des", "du", "de", "d",
+    "et", "ou", "a", "au", "aux", "dans", "sur", "par", "pour", "en",
+    "est", "sont", "ont", "il", "elle", "ils", "t", "ce", "cette", "ces",
+    "que", "qu", "quel", "quelle", "quels", "quelles", "moi", "donne",
+}
+
+# Paramètres MinHash / LSH : 32 permutations découpées en 16 bandes de 2 lignes
+_NUM_PERM = 32
+_BANDS = 16
+_ROWS_PER_BAND = _NUM_PERM // _BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME or 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(_NUM_PERM)
+]
+
+
+def normalize_question(question: str) -> str:
+    """
+    Clé canonique d'une question : minuscules, sans accents,
+    ponctuation remplacée par des espaces et espaces compactés.
+    """
+    return ElectionDataCleaner.normalize_search_text(question)
+
+
+def _tokens(normalized: str) -> List[str]:
+    """Mots significatifs de la question normalisée (ordre ignoré)."""
+    return sorted({t for t in normalized.split() if t not in _STOP_WORDS})
+
+
+def _minhash(tokens: List[str]) -> List[int]:
+    """Signature MinHash calculée sur l'ensemble des mots."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "big")
+        for t in tokens
+    ]
+    if not hashes:
+        return [_MERSENNE_PRIME] * _NUM_PERM
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def _bands(signature: List[int]) -> List[str]:
+    """Découpe la signature en bandes LSH (une clé texte par bande)."""
+    return [
+        f"{i}:" + "-".join(str(v) for v in signature[i * _ROWS_PER_BAND:(i + 1) * _ROWS_PER_BAND])
+        for i in range(_BANDS)
+    ]
+
+
+def _entities(normalized: str) -> Optional[Tuple[frozenset, set]]:
+    """
+    Entités résolues par le gazetteer (parti, région, circonscription, candidat) :
+    ({(type, valeur _norm)}, mots des alias cités). None si la base n'est pas disponible.
+    """
+    from .gazetteer import extract_entities
+
+    entities = extract_entities(normalized)
+    if entities is None:
+        return None
+    signature = frozenset((kind, value) for kind, aliases in entities.items()
+                          for values in aliases.values() for value in values)
+    alias_tokens = {token for aliases in entities.values() for alias in aliases for token in alias.split()}
+    return signature, alias_tokens
+
+
+def _jaccard(a: List[str], b: List[str]) -> float:
+    sa, sb = set(a), set(b)
+    if not sa and not sb:
+        return 1.0
+    return len(sa & sb) / len(sa | sb)
+
+
+class AnswerCache:
+    """
+    Cache persistant (SQLite) des réponses finales de l'agent.
+
+    - Clé exacte : question normalisée (accents, casse, ponctuation, espaces).
+    - Recherche approximative : MinHash + LSH sur les mots significatifs, confirmée par
+      un Jaccard exact, l'égalité des entités résolues par le gazetteer (parti, lieu, candidat)
+      et l'égalité des autres mots (métrique, nombres, comparaisons, négations).
+    - Éviction LRU (last_access) au-delà de max_entries et expiration TTL.
+    - Chaque réponse porte la signature du fichier de la base interrogée : elle n'est plus
+      servie après une ré-ingestion.
+    """
+
+    def __init__(
+        self,
+        db_path: str = str(DEFAULT_CACHE_PATH),
+        max_entries: int = 2000,
+        ttl_seconds: int = 7 * 24 * 3600,
+        similarity_threshold: float = 0.8,
+        source_db_path: str = str(SOURCE_DB_PATH),
+    ):
+        self.db_path = Path(db_path)
+        self._source = DatabaseConnection(db_path=source_db_path, read_only=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                question_key TEXT PRIMARY KEY,
+                tokens TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                db_signature TEXT
+            );
+            CREATE TABLE IF NOT EXISTS answer_bands (
+                band TEXT NOT NULL,
+                question_key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_answer_bands_band ON answer_bands (band);
+            CREATE INDEX IF NOT EXISTS ix_answer_bands_key ON answer_bands (question_key);
+            CREATE INDEX IF NOT EXISTS ix_answers_last_access ON answers (last_access);
+        """)
+        # Cache créé avant la signature : ses entrées (sans signature) ne seront plus servies
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(answers)")}
+        if "db_signature" not in columns:
+            self._conn.execute("ALTER TABLE answers ADD COLUMN db_signature TEXT")
+        self._conn.commit()
+
+    def _db_signature(self) -> str:
+        """Signature (inode, taille, mtime) du fichier de la base interrogée."""
+        return json.dumps(self._source.file_signature())
+
+    # --- LECTURE ---
+    def get(self, question: str) -> Optional[Dict[str, Any]]:
+        """Renvoie la réponse en cache (exacte ou quasi-identique), sinon None."""
+        key = normalize_question(question)
+        if not key:
+            return None
+
+        now = time.time()
+        signature = self._db_signature()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT question_key, payload, created_at FROM answers WHERE question_key = ? AND db_signature = ?",
+                (key, signature),
+            ).fetchone()
+
+            if row is None:
+                row = self._find_near_duplicate(key, signature)
+
+            if row is None:
+                return None
+
+            hit_key, payload, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._delete(hit_key)
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE answers SET last_access = ? WHERE question_key = ?", (now, hit_key)
+            )
+            self._conn.commit()
+
+        print(f"[Answer Cache] Hit : '{hit_key}'")
+        result = json.loads(payload)
+        result["sql_results"] = ResultSet.from_json(result.get("sql_results"))
+        return result
+
+    def _find_near_duplicate(self, key: str, signature: str):
+        tokens = _tokens(key)
+        if not tokens:
+            return None
+
+        bands = _bands(_minhash(tokens))
+        placeholders = ", ".join("?" for _ in bands)
+        candidates = self._conn.execute(
+            f"""
+            SELECT DISTINCT a.question_key, a.tokens, a.payload, a.created_at
+            FROM answer_bands b JOIN answers a ON a.question_key = b.question_key
+            WHERE b.band IN ({placeholders}) AND a.db_signature = ?
+            """,
+            [*bands, signature],
+        ).fetchall()
+
+        entities = _entities(key) if candidates else None
+        best, best_score = None, 0.0
+        for cand_key, cand_tokens, payload, created_at in candidates:
+            cand_tokens = json.loads(cand_tokens)
+            if entities is None:
+                # Sans gazetteer, seuls les mots vides et l'ordre des mots peuvent différer
+                if set(cand_tokens) != set(tokens):
+                    continue
+            else:
+                cand_entities = _entities(cand_key)
+                # Même formulation, autre parti / région / circonscription / candidat
+                if cand_entities is None or cand_entities[0] != entities[0]:
+                    continue
+                # Hors alias des entités, mêmes mots : "nombre" / "pourcentage", "cinq" / "dix",
+                # "plus" / "moins", "élus" / "pas élus" ne partagent jamais une réponse
+                if set(cand_tokens) - cand_entities[1] != set(tokens) - entities[1]:
+                    continue
+            score = _jaccard(tokens, cand_tokens)
+            if score >= self.similarity_threshold and score > best_score:
+                best, best_score = (cand_key, payload, created_at), score
+        return best
+
+    # --- ÉCRITURE ---
+    def set(self, question: str, result: Dict[str, Any]) -> None:
+        """Stocke final_answer, sql_query, sql_results (et leur troncature) et chart_data d'un résultat."""
+        key = normalize_question(question)
+        if not key:
+            return
+
+        payload = json.dumps({
+            "final_answer": result.get("final_answer"),
+            "sql_query": result.get("sql_query"),
+            "sql_params": result.get("sql_params"),
+            "sql_results": _results_json(result.get("sql_results")),
+            "sql_truncated": result.get("sql_truncated", False),
+            "sql_total_rows": result.get("sql_total_rows"),
+            "sql_total_exact": result.get("sql_total_exact", True),
+            "chart_data": result.get("chart_data"),
+        }, default=str)
+        tokens = _tokens(key)
+        now = time.time()
+        signature = self._db_signature()
+
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO answers (question_key, tokens, payload, created_at, last_access, db_signature) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(tokens), payload, now, now, signature),
+            )
+            if tokens:
+                self._conn.executemany(
+                    "INSERT INTO answer_bands (band, question_key) VALUES (?, ?)",
+                    [(band, key) for band in _bands(_minhash(tokens))],
+                )
+            self._evict(now)
+            self._conn.commit()
+
+    def _delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM answers WHERE question_key = ?", (key,))
+        self._conn.execute("DELETE FROM answer_bands WHERE question_key = ?", (key,))
+
+    def _evict(self, now: float) -> None:
+        """Supprime les entrées expirées puis les moins récemment utilisées."""
+        expired = self._conn.execute(
+            "SELECT question_key FROM answers WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).fetchall()
+        overflow = self._conn.execute(
+            "SELECT question_key FROM answers ORDER BY last_access DESC LIMIT -1 OFFSET ?",
+            (self.max_entries,),
+        ).fetchall()
+        for (key,) in expired + overflow:
+            self._delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.execute("DELETE FROM answer_bands")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+
+class CachedAgentGraph:
+    """
+    Enveloppe le graphe compilé : renvoie la réponse en cache sans appeler
+    le LLM, sinon délègue au graphe puis mémorise les réponses SQL réussies.
+    """
+
+    def __init__(self, graph, cache: AnswerCache):
+        self.graph = graph
+        self.cache = cache
+
+    def invoke(self, state: Dict[str, Any], *args, **kwargs) -> Dict[str, Any]:
+        question = state.get("user_query", "")
+        cached = self.cache.get(question)
+        if cached is not None:
+            return {**state, **_cached_update(cached)}
+
+        result = self.graph.invoke(state, *args, **kwargs)
+        if _is_cacheable(result):
+            self.cache.set(question, result)
+        return result
+
+    async def ainvoke(self, state: Dict[str, Any], *args, **kwargs) -> Dict[str, Any]:
+        question = state.get("user_query", "")
+        # Lecture/écriture SQLite locale déportée dans un thread : la boucle reste libre
+        cached = await asyncio.to_thread(self.cache.get, question)
+        if cached is not None:
+            return {**state, **_cached_update(cached)}
+
+        result = await self.graph.ainvoke(state, *args, **kwargs)
+        if _is_cacheable(result):
+            await asyncio.to_thread(self.cache.set, question, result)
+        return result
+
+    def stream(self, state: Dict[str, Any], *args, stream_mode="values", **kwargs):
+        """
+        Même contrat que graph.stream : sur un hit, un unique nœud virtuel
+        'answer_cache' porte toute la réponse ; sinon le flux du graphe est relayé
+        et l'état final est mémorisé.
+        """
+        question = state.get("user_query", "")
+        cached = self.cache.get(question)
+        if cached is not None:
+            yield from _cached_chunks(state, _cached_update(cached), stream_mode)
+            return
+
+        tracker = _FinalStateTracker(state, stream_mode)
+        for chunk in self.graph.stream(state, *args, stream_mode=stream_mode, **kwargs):
+            tracker.observe(chunk)
+            yield chunk
+
+        if tracker.complete and _is_cacheable(tracker.state):
+            self.cache.set(question, tracker.state)
+
+    async def astream(self, state: Dict[str, Any], *args, stream_mode="values", **kwargs):
+        """Version asynchrone de stream."""
+        question = state.get("user_query", "")
+        cached = await asyncio.to_thread(self.cache.get, question)
+        if cached is not None:
+            for chunk in _cached_chunks(state, _cached_update(cached), stream_mode):
+                yield chunk
+            return
+
+        tracker = _FinalStateTracker(state, stream_mode)
+        async for chunk in self.graph.astream(state, *args, stream_mode=stream_mode, **kwargs):
+            tracker.observe(chunk)
+            yield chunk
+
+        if tracker.complete and _is_cacheable(tracker.state):
+            await asyncio.to_thread(self.cache.set, question, tracker.state)
+
+    def __getattr__(self, name):
+        # Tout le reste (get_graph, stream...) est délégué au graphe compilé
+        return getattr(self.graph, name)
+
+
+def _results_json(results) -> Optional[Dict[str, Any]]:
+    """Forme colonnes compacte pour le payload (accepte aussi l'ancienne liste de dicts)."""
+    results = ResultSet.from_json(results)
+    return results.to_json() if results is not None else None
+
+
+def _is_cacheable(result: Dict[str, Any]) -> bool:
+    """On ne mémorise que les réponses issues d'une requête SQL exécutée avec succès."""
+    return bool(result.get("final_answer") and result.get("sql_query") and result.get("sql_results"))
+
+
+def _cached_update(cached: Dict[str, Any]) -> Dict[str, Any]:
+    return {**cached, "chart_generated": bool(cached.get("chart_data")), "errors": []}
+
+
+def _cached_chunks(state: Dict[str, Any], update: Dict[str, Any], stream_mode):
+    """Rejoue une réponse en cache au format de graph.stream."""
+    modes = [stream_mode] if isinstance(stream_mode, str) else list(stream_mode)
+    for mode in modes:
+        if mode == "updates":
+            data = {"answer_cache": update}
+        elif mode == "values":
+            data = {**state, **update}
+        else:
+            # 'messages', 'debug'... : rien à rejouer, la réponse est déjà complète
+            continue
+        yield data if isinstance(stream_mode, str) else (mode, data)
+
+
+class _FinalStateTracker:
+    """Reconstitue l'état final à partir des chunks 'updates' ou 'values'."""
+
+    def __init__(self, state: Dict[str, Any], stream_mode):
+        self.modes = [stream_mode] if isinstance(stream_mode, str) else list(stream_mode)
+        self.single = isinstance(stream_mode, str)
+        self.state = dict(state)
+        self.complete = "updates" in self.modes or "values" in self.modes
+
+    def observe(self, chunk) -> None:
+        mode, data = (self.modes[0], chunk) if self.single else chunk
+        if mode == "updates":
+            for update in data.values():
+                merge_update(self.state, update or {})
+        elif mode == "values" and "updates" not in self.modes:
+            self.state = dict(data)
@@ -0,0 +1,207 @@
+# src/agent/chart_renderer.py
+
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from src.database.result_set import ResultSet
+
+# Processus de rendu (0 = rendu dans le thread appelant, ex. tests ou environnement sans fork)
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+RENDER_TIMEOUT_S = 30
+
+PLOTLY_MIME = "application/vnd.plotly.v1+json"
+_BAR_COLOR = '#4CAF50'
+
+
+def render_png(spec: Dict[str, Any]) -> bytes:
+    """
+    Dessine un graphique à partir d'une spécification (données déjà préparées) et renvoie le PNG.
+    Figure explicite + canvas Agg : aucun état global pyplot, donc sûr entre threads et processus.
+    Fonction de niveau module : exécutée dans les processus du pool.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    kind = spec["kind"]
+    fig = Figure(figsize=(8, 8) if kind == "pie" else (10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    if kind == "pie":
+        ax.pie(spec["values"], labels=spec["labels"], autopct='%1.1f%%', startangle=140)
+        ax.axis('equal')
+    else:
+        if kind == "line":
+            from matplotlib.ticker import MaxNLocator
+
+            ax.plot(spec["labels"], spec["values"], color=_BAR_COLOR)
+            ax.xaxis.set_major_locator(MaxNLocator(12))
+        else:
+            ax.bar(spec["labels"], spec["values"], color=_BAR_COLOR)
+        ax.set_xlabel(spec["x_label"])
+        ax.set_ylabel(spec["y_label"])
+        ax.set_title(spec["title"])
+        ax.tick_params(axis='x', labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment('right')
+        fig.tight_layout()
+
+    img = io.BytesIO()
+    fig.savefig(img, format='png')
+    return img.getvalue()
+
+
+def plotly_figure(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Même spécification, traduite en figure Plotly (JSON : traces + layout).
+    Rendu côté navigateur : quelques Ko de données au lieu d'un PNG, et aucun dessin sur le serveur.
+    """
+    if spec["kind"] == "pie":
+        return {
+            "data": [{"type": "pie", "labels": spec["labels"], "values": spec["values"],
+                      "textinfo": "percent", "sort": False}],
+            "layout": {"height": 500},
+        }
+    if spec["kind"] == "line":
+        trace = {"type": "scatter", "mode": "lines", "x": spec["labels"], "y": spec["values"],
+                 "line": {"color": _BAR_COLOR}}
+    else:
+        trace = {"type": "bar", "x": spec["labels"], "y": spec["values"], "marker": {"color": _BAR_COLOR}}
+    return {
+        "data": [trace],
+        "layout": {
+            "title": {"text": spec["title"]},
+            "xaxis": {"title": {"text": spec["x_label"]}, "tickangle": -45, "type": "category"},
+            "yaxis": {"title": {"text": spec["y_label"]}},
+        },
+    }
+
+
+def chart_key(chart_type: str, results: ResultSet) -> str:
+    """Adresse de contenu d'un graphique : type demandé + empreinte des données."""
+    payload = json.dumps([chart_type, results.to_json()], default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Cache LRU des PNG rendus, borné en nombre d'entrées et en octets."""
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+            return png
+
+    def set(self, key: str, png: bytes) -> None:
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= len(self._entries.pop(key))
+            self._entries[key] = png
+            self._total_bytes += len(png)
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_RENDER_CACHE = RenderCache()
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _start_context():
+    """
+    Processus de rendu démarrés par un serveur forkserver (ou spawn) : jamais un fork du processus
+    Streamlit / LangGraph, multi-threadé (watchdog, verrous des pools), qui peut s'y bloquer.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool de rendu créé au premier graphique (et recréé s'il a été cassé ou bloqué)."""
+    global _POOL
+    if CHART_WORKERS <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=CHART_WORKERS, mp_context=_start_context())
+        return _POOL
+
+
+def _reset_pool(kill: bool = False) -> None:
+    """
+    Abandonne le pool courant (le suivant est créé à la demande).
+    kill=True : les processus sont terminés, sinon un rendu bloqué occuperait un worker
+    et tous les graphiques suivants attendraient derrière lui.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            processes = list((getattr(_POOL, "_processes", None) or {}).values()) if kill else []
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+        _POOL = None
+
+
+def render_chart(chart_type: str, results: ResultSet, build_spec: Callable[[], Dict[str, Any]]) -> bytes:
+    """
+    PNG du graphique `chart_type` pour ces résultats.
+    Même type + mêmes données -> PNG en cache, sans nouveau rendu.
+    Sinon la spécification est construite ici (léger) et dessinée dans un processus du pool.
+    Lève TimeoutError si le rendu dépasse RENDER_TIMEOUT_S (le nœud continue alors sans graphique).
+    """
+    key = chart_key(chart_type, results)
+    png = _RENDER_CACHE.get(key)
+    if png is not None:
+        print("  ✓ Graphique servi depuis le cache de rendu.")
+        return png
+
+    spec = build_spec()
+    pool = _get_pool()
+    if pool is None:
+        png = render_png(spec)
+    else:
+        future = pool.submit(render_png, spec)
+        try:
+            png = future.result(timeout=RENDER_TIMEOUT_S)
+        except BrokenProcessPool:
+            print("  ⚠ Pool de rendu indisponible -> rendu dans le thread courant.")
+            _reset_pool()
+            png = render_png(spec)
+        except FutureTimeoutError:
+            # Rendu bloqué : workers terminés et pool recréé au prochain graphique
+            print(f"  ⚠ Rendu au-delà de {RENDER_TIMEOUT_S} s -> pool de rendu redémarré.")
+            future.cancel()
+            _reset_pool(kill=True)
+            raise TimeoutError(f"Rendu du graphique au-delà de {RENDER_TIMEOUT_S} s")
+
+    _RENDER_CACHE.set(key, png)
+    return png
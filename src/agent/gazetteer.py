@@ -0,0 +1,317 @@
+# src/agent/gazetteer.py
+import re
+import threading
+from collections import Counter, defaultdict
+from itertools import chain
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+from src.database.connection import DatabaseConnection
+from src.ingestion.clean_data import ElectionDataCleaner
+
+
+current_dir = Path(__file__).resolve().parent
+project_root = current_dir.parent.parent
+DB_PATH = project_root / "data" / "processed" / "elections.db"
+
+KINDS = ("region", "circonscription", "parti", "candidat")
+
+# Colonne *_norm interrogée pour chaque type d'entité
+ENTITY_COLUMNS = {
+    "region": "region_nom_norm",
+    "circonscription": "nom_circonscription_norm",
+    "parti": "parti_politique_norm",
+    "candidat": "nom_liste_candidat_norm",
+}
+
+# Noms d'usage qui ne figurent pas tels quels dans la base
+REGION_ALIASES = {
+    "abidjan": "district autonome d'abidjan",
+    "yamoussoukro": "district autonome de yamoussoukro",
+}
+
+# Mots des libellés de circonscription qui ne désignent pas une localité
+_CIRCO_NOISE = {"commune", "communes", "sous", "prefecture", "prefectures", "ville", "village", "communesetsou", "et"}
+
+# Mots courants jamais rapprochés d'une entité par la recherche approximative
+_FUZZY_STOP_WORDS = {
+    "combien", "quel", "quelle", "quels", "quelles", "region", "regions", "circonscription",
+    "circonscriptions", "commune", "parti", "partis", "candidat", "candidats", "participation",
+    "sieges", "siege", "deputes", "depute", "gagne", "gagnant", "vainqueur", "remporte", "resultats",
+    "resultat", "score", "scores", "voix", "votants", "inscrits", "taux", "nombre", "total",
+    "meilleur", "meilleurs", "premiers", "classement", "national", "nationale", "election",
+    "elections", "legislatives", "obtenu", "obtenus", "donne", "liste", "elus", "elu",
+}
+
+# Seuils de la recherche approximative (fautes de frappe)
+FUZZY_MIN_LENGTH = 5
+FUZZY_MIN_RATIO = 0.85
+_MAX_FUZZY_WORDS = 3
+_FUZZY_CACHE_SIZE = 4096
+
+Match = Tuple[str, str, float]  # (type, alias, similarité)
+
+
+def _trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class Gazetteer:
+    """
+    Index en mémoire des entités de la base (régions, circonscriptions, partis, candidats).
+
+    Chaque alias normalisé pointe vers les valeurs *_norm exactes de la base, ce qui
+    permet de filtrer par égalité / IN au lieu de LIKE '%...%'. Un index de trigrammes
+    sert à rattraper les fautes de frappe ("bouke" -> "bouake").
+    """
+
+    def __init__(self, entries: Dict[str, Dict[str, List[str]]]):
+        self.entries = {kind: entries.get(kind, {}) for kind in KINDS}
+
+        # alias -> {type: valeurs}, pour la recherche exacte par n-grammes de mots
+        self._by_alias: Dict[str, Dict[str, List[str]]] = defaultdict(dict)
+        for kind, aliases in self.entries.items():
+            for alias, values in aliases.items():
+                self._by_alias[alias][kind] = values
+        self._max_words = max((len(a.split()) for a in self._by_alias), default=1)
+
+        # Index de trigrammes : trigramme -> identifiants d'alias (courts seulement)
+        self._aliases: List[str] = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for alias in self._by_alias:
+            if len(alias.split()) > _MAX_FUZZY_WORDS:
+                continue
+            alias_id = len(self._aliases)
+            self._aliases.append(alias)
+            for gram in set(_trigrams(alias)):
+                postings[gram].append(alias_id)
+        self._postings = {gram: tuple(ids) for gram, ids in postings.items()}
+        self._fuzzy_cache: Dict[str, Optional[Tuple[str, float]]] = {}
+
+    @classmethod
+    def from_database(cls, db_path: Path = DB_PATH) -> "Gazetteer":
+        db = DatabaseConnection(db_path=str(db_path), read_only=True, pooled=True)
+        with db.borrow() as conn:
+            regions = [r[0] for r in conn.execute("SELECT DISTINCT region_nom_norm FROM circonscriptions")]
+            circos = [r[0] for r in conn.execute("SELECT DISTINCT nom_circonscription_norm FROM circonscriptions")]
+            parties = [r[0] for r in conn.execute("SELECT DISTINCT parti_politique_norm FROM candidats")]
+            candidates = [r[0] for r in conn.execute("SELECT DISTINCT nom_liste_candidat_norm FROM candidats")]
+
+        fold = ElectionDataCleaner.normalize_search_text
+        party_set = {fold(p) for p in parties if p}
+
+        def _add(mapping: Dict[str, List[str]], alias: str, value: str) -> None:
+            mapping.setdefault(alias, [])
+            if value not in mapping[alias]:
+                mapping[alias].append(value)
+
+        region_map: Dict[str, List[str]] = {}
+        for region in regions:
+            alias = fold(region or "")
+            # La colonne région contient quelques valeurs parasites (sigles de partis, lettres isolées)
+            if len(alias) >= 3 and alias not in party_set:
+                _add(region_map, alias, region)
+        for alias, region in REGION_ALIASES.items():
+            if region in regions:
+                _add(region_map, alias, region)
+
+        circo_map: Dict[str, List[str]] = {}
+        for circo in circos:
+            if not circo:
+                continue
+            for locality in re.split(r",| et ", circo):
+                alias = " ".join(w for w in fold(locality).split() if w not in _CIRCO_NOISE)
+                if len(alias) >= 3:
+                    _add(circo_map, alias, circo)
+
+        party_map: Dict[str, List[str]] = {}
+        for party in parties:
+            alias = fold(party or "")
+            if len(alias) >= 2:
+                _add(party_map, alias, party)
+                # "pdci rda" -> aussi "pdci"
+                head = alias.split()[0]
+                if len(head) >= 3 and head != alias:
+                    _add(party_map, head, party)
+
+        candidate_map: Dict[str, List[str]] = {}
+        for candidate in candidates:
+            alias = fold(candidate or "")
+            # Les listes sans tête nommée portent l'étiquette du parti ("independant") : ce n'est pas un nom
+            if len(alias) >= 5 and alias not in party_map:
+                _add(candidate_map, alias, candidate)
+
+        gazetteer = cls({
+            "region": region_map,
+            "circonscription": circo_map,
+            "parti": party_map,
+            "candidat": candidate_map,
+        })
+        print(f"[Gazetteer] {len(gazetteer._by_alias)} alias indexés ({len(gazetteer._postings)} trigrammes).")
+        return gazetteer
+
+    # --- RECHERCHE ---
+
+    def _fuzzy(self, term: str) -> Optional[Tuple[str, float]]:
+        """Alias le plus proche d'un terme (trigrammes candidats, puis ratio de similarité)."""
+        if term in self._fuzzy_cache:
+            return self._fuzzy_cache[term]
+
+        grams = set(_trigrams(term))
+        counts = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+
+        best: Optional[Tuple[str, float]] = None
+        min_shared = max(1, len(grams) // 2)
+        matcher = SequenceMatcher(None, b=term)
+        for alias_id, shared in counts.items():
+            if shared < min_shared:
+                continue
+            alias = self._aliases[alias_id]
+            # Borne supérieure du ratio par les longueurs : évite la plupart des calculs complets
+            if 2 * min(len(alias), len(term)) < FUZZY_MIN_RATIO * (len(alias) + len(term)):
+                continue
+            matcher.set_seq1(alias)
+            if matcher.quick_ratio() < FUZZY_MIN_RATIO:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= FUZZY_MIN_RATIO and (best is None or ratio > best[1]):
+                best = (alias, ratio)
+
+        if len(self._fuzzy_cache) >= _FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[term] = best
+        return best
+
+    def resolve(self, mention: str, kind: Optional[str] = None) -> List[Match]:
+        """
+        Résout une mention isolée ("Gbêkê", "PDCI", "bouke") en alias connus.
+        Renvoie [(type, alias, similarité)] ; vide si rien d'assez proche.
+        """
+        term = ElectionDataCleaner.normalize_search_text(mention)
+        if term in self._by_alias:
+            return [(k, term, 1.0) for k in self._by_alias[term] if kind in (None, k)]
+        fuzzy = self._fuzzy(term) if len(term) >= FUZZY_MIN_LENGTH else None
+        if fuzzy is None:
+            return []
+        alias, ratio = fuzzy
+        return [(k, alias, ratio) for k in self._by_alias[alias] if kind in (None, k)]
+
+    def values(self, kind: str, alias: str) -> List[str]:
+        return self.entries[kind].get(alias, [])
+
+    def entities(self, text: str) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Entités citées dans une question normalisée : {type: {alias: [valeurs _norm]}}.
+        Mots entiers, le plus long d'abord, sans chevauchement ; puis fautes de frappe
+        sur les mots restants.
+        """
+        words = text.split()
+        used = [False] * len(words)
+        found: Dict[str, Dict[str, List[str]]] = {kind: {} for kind in KINDS}
+
+        def _take(start: int, size: int, alias: str) -> None:
+            for kind, values in self._by_alias[alias].items():
+                found[kind].setdefault(alias, values)
+            for i in range(start, start + size):
+                used[i] = True
+
+        # 1. Correspondances exactes
+        for size in range(min(self._max_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                if any(used[start:start + size]):
+                    continue
+                alias = " ".join(words[start:start + size])
+                if alias in self._by_alias:
+                    _take(start, size, alias)
+
+        # 2. Fautes de frappe sur les mots non reconnus
+        for size in range(min(_MAX_FUZZY_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                span = words[start:start + size]
+                if any(used[start:start + size]) or span[0] in _FUZZY_STOP_WORDS or span[-1] in _FUZZY_STOP_WORDS:
+                    continue
+                term = " ".join(span)
+                if len(term) < FUZZY_MIN_LENGTH:
+                    continue
+                fuzzy = self._fuzzy(term)
+                if fuzzy:
+                    _take(start, size, fuzzy[0])
+
+        return found
+
+    # --- CONTEXTE POUR LES PROMPTS ---
+
+    def region_names(self) -> List[str]:
+        """Valeurs region_nom_norm valides (sans les valeurs parasites)."""
+        return sorted({v for values in self.entries["region"].values() for v in values})
+
+
+_GAZETTEER: Optional[Gazetteer] = None
+_GAZETTEER_SIGNATURE: Optional[tuple] = None
+_GAZETTEER_LOCK = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """
+    Gazetteer partagé, construit à partir de la base et reconstruit quand le fichier .db change
+    (même signature que le cache de résultats : inode, taille, date de modification).
+    """
+    global _GAZETTEER, _GAZETTEER_SIGNATURE
+    signature = DatabaseConnection(db_path=str(DB_PATH), read_only=True).file_signature()
+    with _GAZETTEER_LOCK:
+        if _GAZETTEER is None or signature != _GAZETTEER_SIGNATURE:
+            _GAZETTEER = Gazetteer.from_database()
+            _GAZETTEER_SIGNATURE = signature
+        return _GAZETTEER
+
+
+def extract_entities(text: str) -> Optional[Dict[str, Dict[str, List[str]]]]:
+    """
+    Entités connues citées dans la question normalisée :
+    {"region": {alias: [valeurs _norm]}, "circonscription": {...}, "parti": {...}, "candidat": {...}}.
+    None si la base n'a pas pu être chargée.
+    """
+    try:
+        gazetteer = get_gazetteer()
+    except Exception as e:
+        print(f"[Gazetteer] Base indisponible : {e}")
+        return None
+    return gazetteer.entities(text)
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def sql_filter(kind: str, values: List[str]) -> str:
+    """Prédicat exact (= ou IN) sur la colonne *_norm du type d'entité."""
+    column = ENTITY_COLUMNS[kind]
+    unique = sorted(set(values))
+    if len(unique) == 1:
+        return f"{column} = {_quote(unique[0])}"
+    return f"{column} IN ({', '.join(_quote(v) for v in unique)})"
+
+
+def format_resolved_entities(user_query: str) -> str:
+    """Bloc de prompt listant les entités résolues et le filtre SQL exact à utiliser."""
+    entities = extract_entities(ElectionDataCleaner.normalize_search_text(user_query))
+    if not entities:
+        return ""
+
+    lines = []
+    for kind in KINDS:
+        for alias, values in entities[kind].items():
+            lines.append(f"- {kind} '{alias}' -> {sql_filter(kind, values)}")
+    return "\n".join(lines)
+
+
+def format_region_list() -> str:
+    """Liste des régions pour les prompts (générée depuis la base, plus de copie en dur)."""
+    try:
+        regions = get_gazetteer().region_names()
+    except Exception as e:
+        print(f"[Gazetteer] Base indisponible : {e}")
+        return "(liste indisponible)"
+    return ", ".join(_quote(r) if "'" not in r else f'"{r}"' for r in regions)
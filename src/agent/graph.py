@@ -1,24 +1,45 @@
 # src/agent/graph.py
 
+import importlib
+
 from langgraph.graph import StateGraph, END
 from langgraph.types import Command
+from typing import Optional, Literal
 from .state import AgentState
+from .answer_cache import AnswerCache, CachedAgentGraph
+
+# Les nœuds sont importés à leur premier appel : importer le graphe (démarrage de l'app)
+# ne charge ni le client LLM, ni SQLAlchemy, ni matplotlib.
+NODES_PACKAGE = "src.agent.nodes"
+
+
+def _lazy_node(module: str, name: str, async_mode: bool = False):
+    """
+    Nœud 'name' du module 'src.agent.nodes.<module>', résolu à chaque appel
+    (recherche dans sys.modules après le premier import : coût négligeable, et les
+    patchs appliqués au module restent visibles).
+    """
+    def resolve():
+        return getattr(importlib.import_module(f"{NODES_PACKAGE}.{module}"), name)
+
+    if async_mode:
+        async def anode(state: AgentState) -> Command:
+            return await resolve()(state)
+        anode.__name__ = anode.__qualname__ = name
+        return anode
+
+    def node(state: AgentState) -> Command:
+        return resolve()(state)
+    node.__name__ = node.__qualname__ = name
+    return node
+
+
+def _node(module: str, sync_name: str, async_name: str, async_mode: bool):
+    """Version synchrone ou asynchrone d'un nœud, chargée au premier appel."""
+    if async_mode:
+        return _lazy_node(module, async_name, async_mode=True)
+    return _lazy_node(module, sync_name)
 
-# Importation de tous les nœuds
-from src.agent.nodes.classify_intent_sql import (
-    classify_intent_node, 
-    reponse_hors_sujet_node, 
-    reponse_politique_node)
-from src.agent.nodes.generate_clarification_node import generate_clarification_node
-from src.agent.nodes.retrieve_similar_sql import retrieve_similar_examples
-from src.agent.nodes.generate_adapte_sql import generate_sql_query_node
-from src.agent.nodes.verify_sql import verify_sql_node
-from src.agent.nodes.execute_sql import execute_sql_node
-from src.agent.nodes.generate_chart_sql import (
-    determine_chart_intent_node, 
-    generate_chart_node
-)
-from src.agent.nodes.generate_final_answer_sql import generate_final_answer_node
 
 def guardrail_node(state: AgentState) -> Command:
     """
@@ -52,9 +73,41 @@ def guardrail_node(state: AgentState) -> Command:
     # Si tout est OK, on passe à la classification
     return Command(goto="classify_intent")
 
-def build_agent_graph():
+GraphMode = Literal["sequential", "combined", "speculative"]
+
+
+def _classify_node(mode: GraphMode, async_mode: bool):
+    """Nœud enregistré sous le nom 'classify_intent' selon le mode du pipeline."""
+    if mode == "combined":
+        return _node("classify_generate_sql", "classify_and_generate_sql_node",
+                     "aclassify_and_generate_sql_node", async_mode)
+    if mode == "speculative":
+        return _node("speculative_classify", "speculative_classify_node", "aspeculative_classify_node", async_mode)
+    if mode == "sequential":
+        return _node("classify_intent_sql", "classify_intent_node", "aclassify_intent_node", async_mode)
+    raise ValueError(f"Mode de graphe inconnu : {mode}")
+
+
+def build_agent_graph(
+    answer_cache: Optional[AnswerCache] = None,
+    async_mode: bool = False,
+    mode: GraphMode = "sequential",
+):
     """
     Construit le graphe de l'agent.
+
+    Args:
+        answer_cache: Si fourni, le graphe est enveloppé par un cache de réponses
+            consulté avant tout appel LLM.
+        async_mode: Si True, les nœuds LLM / SQLite / graphique sont leurs versions
+            asynchrones : le graphe s'utilise avec 'await graph.ainvoke(state)'.
+            Les nœuds purement CPU et instantanés (garde-fou, BM25, routage)
+            restent partagés entre les deux modes.
+        mode: "sequential" (classification puis génération SQL : deux appels LLM)
+            ou "combined" (un seul appel structuré renvoie classification + SQL,
+            la génération séparée ne sert plus qu'aux corrections après erreur)
+            ou "speculative" (exemples + génération SQL lancés en parallèle de la
+            classification ; le SQL est jeté si la question n'est pas autorisée).
     """
     
     # Initialisation du graphe avec la structure AgentState
@@ -62,21 +115,29 @@ def build_agent_graph():
 
     # --- 1. AJOUT DES NŒUDS ---
     builder.add_node("guardrail", guardrail_node)
-    builder.add_node("classify_intent", classify_intent_node)
+    builder.add_node("classify_intent", _classify_node(mode, async_mode))
     
    
-    builder.add_node("generate_clarification", generate_clarification_node)
+    builder.add_node("generate_clarification", _node("generate_clarification_node", "generate_clarification_node",
+                                                     "agenerate_clarification_node", async_mode))
     
-    builder.add_node("recherche_similaire", retrieve_similar_examples)
-    builder.add_node("generate_sql", generate_sql_query_node)
-    builder.add_node("verify_sql", verify_sql_node)
-    builder.add_node("execute_sql", execute_sql_node)
-    builder.add_node("determine_chart_intent", determine_chart_intent_node)
-    builder.add_node("generate_chart", generate_chart_node)
-    builder.add_node("generate_final_answer", generate_final_answer_node)
-    builder.add_node("reponse_hors_sujet", reponse_hors_sujet_node)
-    builder.add_node("reponse_politique", reponse_politique_node)
+    builder.add_node("recherche_similaire", _lazy_node("retrieve_similar_sql", "retrieve_similar_examples"))
+    builder.add_node("generate_sql", _node("generate_adapte_sql", "generate_sql_query_node",
+                                           "agenerate_sql_query_node", async_mode))
+    builder.add_node("verify_sql", _node("verify_sql", "verify_sql_node", "averify_sql_node", async_mode))
+    builder.add_node("execute_sql", _node("execute_sql", "execute_sql_node", "aexecute_sql_node", async_mode))
+    builder.add_node("determine_chart_intent", _lazy_node("generate_chart_sql", "determine_chart_intent_node"))
+    builder.add_node("generate_chart", _node("generate_chart_sql", "generate_chart_node",
+                                             "agenerate_chart_node", async_mode))
+    builder.add_node("generate_final_answer", _node("generate_final_answer_sql", "generate_final_answer_node",
+                                                    "agenerate_final_answer_node", async_mode))
+    builder.add_node("reponse_hors_sujet", _lazy_node("classify_intent_sql", "reponse_hors_sujet_node"))
+    builder.add_node("reponse_politique", _lazy_node("classify_intent_sql", "reponse_politique_node"))
 
     builder.set_entry_point("guardrail")
 
-    return builder.compile()
\ No newline at end of file
+    graph = builder.compile()
+
+    if answer_cache is not None:
+        return CachedAgentGraph(graph, answer_cache)
+    return graph
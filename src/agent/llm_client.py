@@ -1,26 +1,48 @@
 # src/agent/llm_client.py
 import os
+import hashlib
+import threading
 import unicodedata
-from langchain_mistralai import ChatMistralAI
+from typing import Dict, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+DEFAULT_MODEL = "mistral-small-latest"
+
 class LLMClient:
-    def __init__(self, model_name="mistral-small-latest"):
+    def __init__(self, model_name=DEFAULT_MODEL, api_key=None):
         # On récupère la clé
-        api_key = os.getenv("MISTRAL_API_KEY")
+        api_key = api_key or os.getenv("MISTRAL_API_KEY")
         if not api_key:
             raise ValueError("MISTRAL_API_KEY manquante dans l'environnement.")
         
+        # Import différé : langchain_mistralai n'est chargé qu'à la création du premier client
+        from langchain_mistralai import ChatMistralAI
+
+        # ChatMistralAI ouvre un httpx.Client (keep-alive) : une instance = un pool HTTP
         self.llm = ChatMistralAI(
             model=model_name,
             api_key=api_key,
             temperature=0
         )
+        # Runnables 'with_structured_output' réutilisés par schéma
+        self._structured_llms = {}
+        self._structured_lock = threading.Lock()
+
+    def _get_structured_llm(self, schema):
+        with self._structured_lock:
+            structured_llm = self._structured_llms.get(schema)
+            if structured_llm is None:
+                structured_llm = self.llm.with_structured_output(schema)
+                self._structured_llms[schema] = structured_llm
+            return structured_llm
 
     def invoke(self, prompt):
         return self.llm.invoke(prompt)
+
+    async def ainvoke(self, prompt):
+        return await self.llm.ainvoke(prompt)
     
     def invoke_structured(self, prompt, schema):
         """
@@ -28,7 +50,7 @@ class LLMClient:
         Renvoie TOUJOURS un objet du type 'schema' ou lève une exception.
         """
         try:
-            structured_llm = self.llm.with_structured_output(schema)
+            structured_llm = self._get_structured_llm(schema)
             result = structured_llm.invoke(prompt)
             
             if result is None:
@@ -38,4 +60,48 @@ class LLMClient:
         except Exception as e:
 
             print(f"[LLMClient Error] Erreur lors de l'extraction structurée : {e}")
-            raise RuntimeError(f"Échec de la génération structurée : {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Échec de la génération structurée : {str(e)}")
+
+    async def ainvoke_structured(self, prompt, schema):
+        """Version asynchrone de invoke_structured (même contrat)."""
+        try:
+            structured_llm = self._get_structured_llm(schema)
+            result = await structured_llm.ainvoke(prompt)
+
+            if result is None:
+                raise ValueError("Le LLM a renvoyé un résultat vide.")
+            return result
+
+        except Exception as e:
+
+            print(f"[LLMClient Error] Erreur lors de l'extraction structurée : {e}")
+            raise RuntimeError(f"Échec de la génération structurée : {str(e)}")
+
+
+# --- REGISTRE DES CLIENTS (un par modèle et par clé, partagé par tout le processus) ---
+_CLIENTS: Dict[Tuple[str, str], LLMClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_llm_client(model_name: str = DEFAULT_MODEL) -> LLMClient:
+    """
+    Renvoie le client partagé pour ce modèle, créé au premier appel.
+    Un changement de MISTRAL_API_KEY (saisie dans l'UI) crée un nouveau client.
+    """
+    api_key = os.getenv("MISTRAL_API_KEY")
+    if not api_key:
+        raise ValueError("MISTRAL_API_KEY manquante dans l'environnement.")
+
+    key = (model_name, hashlib.sha256(api_key.encode()).hexdigest())
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = LLMClient(model_name=model_name, api_key=api_key)
+            _CLIENTS[key] = client
+        return client
+
+
+def reset_llm_clients() -> None:
+    """Oublie les clients partagés (tests, rotation de clé)."""
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
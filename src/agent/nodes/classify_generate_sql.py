@@ -0,0 +1,136 @@
+# src/agent/nodes/classify_generate_sql.py
+from langgraph.types import Command
+from langchain_core.prompts import ChatPromptTemplate
+from typing import Literal
+
+from ..state import AgentState, UserQueryClassification, ClassificationWithSQL
+from ..llm_client import get_llm_client
+from .fast_intent_rules import classify_with_rules
+from .classify_intent_sql import classification_rules, _route_classification, _handle_classification_error
+from .generate_adapte_sql import sql_schema_context, sql_rules, _clean_sql_output, sql_update
+from .retrieve_similar_sql import build_examples_context
+from ..gazetteer import format_resolved_entities, format_region_list
+from src.ingestion.clean_data import ElectionDataCleaner
+from langsmith import traceable
+
+
+CombinedRoute = Literal[
+    "verify_sql", "recherche_similaire", "generate_clarification", "reponse_hors_sujet", "reponse_politique"
+]
+
+
+@traceable(name="intent_classification_sql")
+def classify_and_generate_sql_node(state: AgentState) -> Command[CombinedRoute]:
+    """
+    Mode combiné : un seul appel LLM structuré renvoie la classification ET le SQL.
+    Une question autorisée part directement en vérification SQL.
+    """
+    # Voie rapide : les règles (puis les templates SQL) évitent tout appel LLM
+    fast_classification = classify_with_rules(state['user_query'])
+    if fast_classification is not None:
+        return _route_classification(state, fast_classification)
+
+    try:
+        llm_client = get_llm_client()
+    except Exception as e:
+        return _handle_classification_error(str(e))
+
+    try:
+        examples_context = build_examples_context(state['user_query'])
+        combined = llm_client.invoke_structured(
+            _build_combined_prompt(state['user_query'], examples_context),
+            ClassificationWithSQL
+        )
+        return _route_combined(state, combined, examples_context)
+
+    except Exception as e:
+        return _handle_classification_error(str(e))
+
+
+@traceable(name="intent_classification_sql")
+async def aclassify_and_generate_sql_node(state: AgentState) -> Command[CombinedRoute]:
+    """Version asynchrone de classify_and_generate_sql_node."""
+    fast_classification = classify_with_rules(state['user_query'])
+    if fast_classification is not None:
+        return _route_classification(state, fast_classification)
+
+    try:
+        llm_client = get_llm_client()
+    except Exception as e:
+        return _handle_classification_error(str(e))
+
+    try:
+        examples_context = build_examples_context(state['user_query'])
+        combined = await llm_client.ainvoke_structured(
+            _build_combined_prompt(state['user_query'], examples_context),
+            ClassificationWithSQL
+        )
+        return _route_combined(state, combined, examples_context)
+
+    except Exception as e:
+        return _handle_classification_error(str(e))
+
+
+def _build_combined_prompt(user_query: str, examples_context: str) -> str:
+    """
+    Un seul prompt : schéma et liste des régions une seule fois (bloc partagé),
+    puis les règles de classification et les règles SQL sans leur propre copie du schéma.
+    """
+    try:
+        normalized_query = ElectionDataCleaner.normalize_text(user_query)
+    except Exception:
+        normalized_query = user_query.lower().strip()
+
+    system_prompt = f"""
+Tu es à la fois le classifieur et le générateur SQL d'un agent qui analyse
+les élections législatives ivoiriennes. Remplis la structure en UN SEUL passage :
+
+1. La classification (request_validity, query_nature, task_type, chart_type, reasoning_summary)
+   selon les RÈGLES DE CLASSIFICATION.
+2. sql_query : la requête SQLite (dialecte SQLite, SQL brut) selon les RÈGLES SQL,
+   UNIQUEMENT si request_validity vaut "allowed". Pour toute autre validité, sql_query vaut null.
+
+=== SCHÉMA ET DONNÉES (communs aux deux tâches) ===
+{sql_schema_context()}
+RÉGIONS DE CÔTE D'IVOIRE (region_nom_norm) : [{format_region_list()}]
+
+=== RÈGLES DE CLASSIFICATION ===
+{classification_rules("voir RÉGIONS DE CÔTE D'IVOIRE ci-dessus")}
+
+=== RÈGLES SQL ===
+{sql_rules(examples_context, resolved_entities=format_resolved_entities(user_query), include_regions=False)}
+"""
+
+    human_message = f"""
+QUESTION UTILISATEUR : "{user_query}"
+VALEUR DE RECHERCHE NETTOYÉE : "{normalized_query}"
+"""
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", human_message)
+    ])
+    return prompt.format()
+
+
+def _route_combined(state: AgentState, combined: ClassificationWithSQL, examples_context: str) -> Command[CombinedRoute]:
+    """Oriente le flux à partir du résultat combiné."""
+    classification = UserQueryClassification(**combined.model_dump(exclude={"sql_query"}))
+    sql_query = _clean_sql_output(combined.sql_query.strip()) if combined.sql_query else ""
+
+    # Autorisée sans SQL exploitable : on reprend le chemin séquentiel (exemples -> génération)
+    if classification.request_validity != "allowed" or not sql_query:
+        return _route_classification(state, classification)
+
+    print(f"\n[Classify + SQL] Query: '{state['user_query'][:50]}...'")
+    print(f"  → Nature: {classification.query_nature.upper()}")
+    print(f"  → SQL :   {sql_query}")
+
+    return Command(
+        update={
+            "classification": classification,
+            "similar_examples_context": examples_context,
+            **sql_update(sql_query),
+        },
+        goto="verify_sql"
+    )
@@ -4,21 +4,15 @@ from langgraph.graph import END
 from langchain_core.prompts import ChatPromptTemplate
 from typing import Literal
 from ..state import AgentState, UserQueryClassification
-from ..llm_client import LLMClient
+from ..llm_client import get_llm_client
+from .fast_intent_rules import classify_with_rules
+from ..gazetteer import format_region_list
 from langsmith import traceable
 
 
 
-@traceable(name="intent_classification")
-def classify_intent_node(state: AgentState) -> Command[Literal["recherche_similaire", "reponse_hors_sujet", "reponse_politique"]]:
-    
-    try:
-        llm_client = LLMClient()
-    except Exception as e:
-        # Si la clé API est absente, on part directement en erreur
-        return _handle_classification_error(str(e))
-    
-    data_context = """
+# Schéma des tables (prompt de classification seul ; le mode combiné utilise le schéma SQL)
+_CLASSIFICATION_SCHEMA = """
 SCHÉMA EXACT DE LA BASE DE DONNÉES ÉLECTORALES IVOIRIENNES :
 
 TABLES :
@@ -48,12 +42,18 @@ TABLES :
    - score_voix (INT)
    - pourcentage_voix (FLOAT)
    - est_elu (BOOL)
+   - rang_circonscription (INT), marge_voix (INT), marge_pourcentage (FLOAT), part_voix_regionale (FLOAT) : pré-calculés
 
 VUES DISPONIBLES :
 - vue_resultats_detailles : jointure complète candidats + circonscriptions
 - vue_elus_uniquement : candidats élus seulement
 - vue_stats_regionales : agrégations par région
+- stats_sieges_partis : sièges par parti (pré-calculés)
+- stats_voix_partis_regions : voix par parti et par région (pré-calculées)
+"""
 
+# Exemples de questions valides (le mode combiné s'appuie plutôt sur les exemples few-shot)
+_CLASSIFICATION_EXAMPLES = """
 EXEMPLES DE QUESTIONS VALIDES :
 - "How many seats did RHDP win?"
 - "Top 10 candidates by score in Abidjan region."
@@ -63,7 +63,10 @@ EXEMPLES DE QUESTIONS VALIDES :
 - "Which constituency has the highest participation rate?"
 - "Who won in Yamoussoukro?"
 - "Candidats du RHDP qui ont gagné" (VALIDE - agrégation nationale possible)
+"""
 
+# Règles de classification (réutilisées par le mode combiné classification + SQL)
+_CLASSIFICATION_RULES = """
 EXEMPLES DE QUESTIONS HORS SCOPE :
 - Questions sur d'autres pays
 - Questions non législatives ivoiriennes
@@ -86,12 +89,7 @@ Une question est "ambiguous" UNIQUEMENT si elle manque d'informations CRITIQUES
 
 3. PÉRIMÈTRES GÉOGRAPHIQUES :
    Régions valides (peuvent contenir plusieurs circonscriptions) :
-   'agneby-tiassa', 'bafing', 'belier', 'bere', 'bounkani', 'cavally',
-   "district autonome d'abidjan", 'district autonome de yamoussoukro', 'folon',
-   'gbeke', 'gbokle', 'goh', 'gontougo', 'grands ponts', 'guemon', 'hambol',
-   'haut-sassandra', 'iffou', 'indenie-djuablin', 'kabadougou', 'la me',
-   'loh-djiboua', 'marahoue', 'moronou', 'nawa', "n'zi", 'poro', 'san-pedro',
-   'sud-comoe', 'tonkpi', 'worodougou'
+   {regions}
 
    RÈGLE : Si la question mentionne une région de cette liste → VALIDE (agrégation possible)
      
@@ -127,6 +125,71 @@ Analyze the user request and fill the classification structure.
    - Ex: "Candidats du RHDP qui ont gagné" → pie (répartition par parti des élus)
 """
 
+
+def classification_rules(regions: str) -> str:
+    """Règles de classification seules ; `regions` : liste des régions ou renvoi vers un bloc partagé."""
+    return _CLASSIFICATION_RULES.format(regions=regions)
+
+
+def classification_context() -> str:
+    """Contexte de classification, avec la liste des régions tirée du gazetteer."""
+    return _CLASSIFICATION_SCHEMA + _CLASSIFICATION_EXAMPLES + classification_rules(format_region_list())
+
+
+@traceable(name="intent_classification")
+def classify_intent_node(state: AgentState) -> Command[Literal["recherche_similaire", "reponse_hors_sujet", "reponse_politique"]]:
+    
+    # Voie rapide : les questions évidentes sont classées sans appel LLM
+    fast_classification = classify_with_rules(state['user_query'])
+    if fast_classification is not None:
+        return _route_classification(state, fast_classification)
+
+    try:
+        llm_client = get_llm_client()
+    except Exception as e:
+        # Si la clé API est absente, on part directement en erreur
+        return _handle_classification_error(str(e))
+    
+    try:
+        # Le LLM va maintenant remplir 'query_nature' automatiquement
+        classification = llm_client.invoke_structured(
+            _build_classification_prompt(state['user_query']),
+            UserQueryClassification
+        )
+        return _route_classification(state, classification)
+        
+    except Exception as e:
+        return _handle_classification_error(str(e))
+
+
+@traceable(name="intent_classification")
+async def aclassify_intent_node(state: AgentState) -> Command[Literal["recherche_similaire", "reponse_hors_sujet", "reponse_politique"]]:
+    """Version asynchrone de classify_intent_node (graphe 'ainvoke')."""
+    fast_classification = classify_with_rules(state['user_query'])
+    if fast_classification is not None:
+        return _route_classification(state, fast_classification)
+
+    try:
+        llm_client = get_llm_client()
+    except Exception as e:
+        return _handle_classification_error(str(e))
+
+    try:
+        classification = await llm_client.ainvoke_structured(
+            _build_classification_prompt(state['user_query']),
+            UserQueryClassification
+        )
+        return _route_classification(state, classification)
+
+    except Exception as e:
+        return _handle_classification_error(str(e))
+
+
+def _build_classification_prompt(user_query: str) -> str:
+    """Construit le prompt de classification pour une question."""
+
+    data_context = classification_context()
+
     system_prompt = f"""
     You are a strict classifier for a SQL agent analyzing IVORIAN electoral data.
     
@@ -149,13 +212,6 @@ Analyze the user request and fill the classification structure.
          Ex: "Total votes per party", "Average participation by region", "How many seats?"
        - "comparison": Comparing specific entities side-by-side.
          Ex: "RHDP vs PDCI results", "Difference between North and South".
-voici la liste des region de la cote d'ivoire qui contiennes des circonscriptons: 'agneby-tiassa' 'bafing' 'belier' 'bere' 'bounkani' 'cavally'
- "district autonome d'abidjan" 'district autonome de yamoussoukro' 'folon'
- 'gbeke' 'gbokle' 'goh' 'gontougo' 'grands ponts' 'guemon' 'hambol' 
- 'haut-sassandra' 'haut- sassandra' 'iffou' 'indenie-djuablin'      
- 'kabadougou' 'la me' 'loh-djiboua' 'marahoue' 'moronou' 'nawa' "n'zi"
- 'poro' 'san-pedro' 'sud-comoe' 'tonkpi' 'worodougou'
- 
 
     3. VISUALIZATION:
        - chart_type: "bar" (ranking/comparison), "pie" (proportions), etc.
@@ -165,44 +221,36 @@ voici la liste des region de la cote d'ivoire qui contiennes des circonscriptons
         ("system", system_prompt),
         ("human", "User question: {question}")
     ])
-    
-    try:
-        formatted_prompt = prompt.format(question=state['user_query'])
-        
-        # Le LLM va maintenant remplir 'query_nature' automatiquement
-        classification = llm_client.invoke_structured(
-            formatted_prompt,
-            UserQueryClassification
-        )
-        
-        print(f"\n[Classify Intent] Query: '{state['user_query'][:50]}...'")
-        print(f"  → Validity: {classification.request_validity}")
-        print(f"  → Nature:   {classification.query_nature.upper()}")
-        print(f"  → Chart:    {classification.chart_type}")
+    return prompt.format(question=user_query)
 
-        if classification.request_validity == "allowed":
-            goto = "recherche_similaire"
-        
-        elif classification.request_validity == "ambiguous":
-            goto = "generate_clarification"
-            
-        elif classification.request_validity == "out_of_scope":
-            goto = "reponse_hors_sujet"
-        elif classification.request_validity == "policy_violation":
-            goto = "reponse_politique"
-        else:
-            goto = "reponse_hors_sujet"
-        
-        return Command(
-            update={
-                "classification": classification,
-            },
-            goto=goto
-        )
+
+def _route_classification(state: AgentState, classification: UserQueryClassification) -> Command:
+    """Oriente le flux selon la validité de la requête."""
+    print(f"\n[Classify Intent] Query: '{state['user_query'][:50]}...'")
+    print(f"  → Validity: {classification.request_validity}")
+    print(f"  → Nature:   {classification.query_nature.upper()}")
+    print(f"  → Chart:    {classification.chart_type}")
+
+    if classification.request_validity == "allowed":
+        goto = "recherche_similaire"
+    
+    elif classification.request_validity == "ambiguous":
+        goto = "generate_clarification"
         
-    except Exception as e:
-        return _handle_classification_error(str(e))
+    elif classification.request_validity == "out_of_scope":
+        goto = "reponse_hors_sujet"
+    elif classification.request_validity == "policy_violation":
+        goto = "reponse_politique"
+    else:
+        goto = "reponse_hors_sujet"
     
+    return Command(
+        update={
+            "classification": classification,
+        },
+        goto=goto
+    )
+
     
         
 def _handle_classification_error(error_msg: str) -> Command:
@@ -1,47 +1,87 @@
 # src/agent/nodes/execute_sql.py
+import asyncio
+import os
+import sqlite3
 from langgraph.types import Command
-from typing import Literal
+from typing import Any, Dict, List, Literal, NamedTuple, Optional
 from pathlib import Path
 from ..state import AgentState
+from src.database.authorizer import declared_ctes, select_only_authorizer, pop_denial
 from src.database.connection import DatabaseConnection
+from src.database.governor import QueryBudget, governed
+from src.database.result_cache import QueryResultCache
+from src.database.result_set import ResultSet
+from src.database.query_rewrite import available_fts_tables, rewrite_like_to_fts
 from langsmith import traceable
 from langgraph.graph import END 
 
+
+DB_PATH = Path(__file__).resolve().parent.parent.parent.parent / "data" / "processed" / "elections.db"
+
+# --- CACHE DES RÉSULTATS (partagé entre les sessions) ---
+_RESULT_CACHE = QueryResultCache(max_entries=256, max_bytes=32 * 1024 * 1024)
+
+# --- RÉSULTATS BORNÉS ---
+# Lignes gardées dans l'état (et donc dans l'historique de l'UI) ; au-delà, seul le total est compté
+MAX_RESULT_ROWS = int(os.getenv("SQL_MAX_ROWS", "500"))
+FETCH_BATCH_SIZE = 100
+# Au-delà, le comptage s'arrête : le total devient une borne inférieure (sql_total_exact = False)
+MAX_COUNTED_ROWS = 100_000
+
+
+class FetchResult(NamedTuple):
+    rows: ResultSet
+    total_rows: int
+    total_exact: bool
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_rows > len(self.rows)
+
+    def state_update(self) -> Dict[str, Any]:
+        return {
+            "sql_results": self.rows,
+            "sql_truncated": self.truncated,
+            "sql_total_rows": self.total_rows,
+            "sql_total_exact": self.total_exact,
+        }
+
 @traceable(name="sql_execution")
 def execute_sql_node(state: AgentState) -> Command[Literal["determine_chart_intent"]]:
     query = state['sql_query']
+    params = state.get('sql_params') or {}
     
     if not query:
         return Command(
             update={
                 "errors": ["Aucune requête à exécuter."],
-                "sql_results": [],
+                "sql_results": ResultSet.empty(),
                 "final_answer": "Désolé, je n'ai pas pu exécuter votre requête. Veuillez reformuler votre question s'il vous plaît."
             },
             goto=END
         )
 
-    print(f"\n[Execute SQL] Exécution de : {query}")
-
-    current_dir = Path(__file__).resolve().parent
-    project_root = current_dir.parent.parent.parent
-    db_path = project_root / "data" / "processed" / "elections.db"
-    
     try:
-        db = DatabaseConnection(db_path=str(db_path), read_only=True)
-        
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            results = [dict(row) for row in rows]
-            
-        print(f"  ✓ {len(results)} lignes récupérées.")
-        if results:
-            print(f"  ℹ Aperçu : {results[0]}")
+        if state.get('sql_results') is not None:
+            # Déjà exécutée par verify_sql (préparation unique sous autorisateur)
+            result = FetchResult(
+                state['sql_results'],
+                state.get('sql_total_rows') or len(state['sql_results']),
+                state.get('sql_total_exact', True),
+            )
+        else:
+            print(f"\n[Execute SQL] Exécution de : {query} {params}")
+            result = fetch_results(query, params)
+
+        print(f"  ✓ {len(result.rows)} lignes récupérées.")
+        if result.truncated:
+            bound = "" if result.total_exact else "au moins "
+            print(f"  ℹ Résultat tronqué : {len(result.rows)} lignes gardées sur {bound}{result.total_rows}.")
+        if result.rows:
+            print(f"  ℹ Aperçu : {result.rows.row(0)}")
 
         return Command(
-            update={"sql_results": results},
+            update=result.state_update(),
             goto="determine_chart_intent"
         )
 
@@ -51,8 +91,100 @@ def execute_sql_node(state: AgentState) -> Command[Literal["determine_chart_inte
         return Command(
             update={
                 "errors": [f"Erreur d'exécution : {str(e)}"],  # UNE SEULE erreur
-                "sql_results": [],
+                "sql_results": ResultSet.empty(),
                 "final_answer": "Désolé, je n'ai pas pu exécuter votre requête. Veuillez reformuler votre question s'il vous plaît."
             },
             goto=END
-        )
\ No newline at end of file
+        )
+
+
+def fetch_results(query: str, params: Optional[Dict[str, Any]] = None, max_rows: int = None) -> FetchResult:
+    """
+    Exécute une requête SELECT sur une connexion du pool protégée par l'autorisateur :
+    la validation (objets autorisés, SELECT uniquement) se fait à la préparation, sans parse séparé.
+    Les valeurs sont liées (params) : une même forme de requête réutilise l'instruction préparée
+    en cache sur la connexion (ni parse, ni plan, ni autorisateur).
+    Au plus max_rows lignes sont matérialisées (fetchmany) ; les suivantes sont seulement comptées.
+    L'exécution est gouvernée (échéance + budget d'instructions VM, cf. governor.py).
+    Lève sqlite3.Error si la requête est invalide ou refusée (raison dans pop_denial()),
+    QueryAborted si elle dépasse son budget.
+    """
+    max_rows = MAX_RESULT_ROWS if max_rows is None else max_rows
+    db = DatabaseConnection(db_path=str(DB_PATH), read_only=True, pooled=True, authorizer=select_only_authorizer)
+    signature = db.file_signature()
+
+    params = params or {}
+    entry = _RESULT_CACHE.get_entry(query, signature, params)
+    if entry is not None:
+        rows, meta = entry
+        cached = FetchResult(rows, meta.get("total_rows", len(rows)), meta.get("total_exact", True))
+        # Réutilisable si le résultat en cache est complet ou tronqué à la même limite
+        if len(rows) == min(max_rows, cached.total_rows):
+            print(f"  ✓ {len(rows)} lignes (cache).")
+            return cached
+
+    pop_denial()
+    with db.borrow() as conn:
+        fts_tables = available_fts_tables(conn, signature)
+        cursor = conn.cursor()
+        cursor.row_factory = None  # tuples bruts : les noms de colonnes viennent de cursor.description
+        try:
+            with governed(conn) as budget, declared_ctes(query):
+                _execute_with_fts(cursor, query, params, fts_tables, budget)
+                result = _fetch_bounded(cursor, max_rows, budget)
+        finally:
+            cursor.close()
+
+    _RESULT_CACHE.set(query, signature, result.rows,
+                      meta={"total_rows": result.total_rows, "total_exact": result.total_exact}, params=params)
+    return result
+
+
+def _fetch_bounded(cursor, max_rows: int, budget: QueryBudget) -> FetchResult:
+    """
+    Lit au plus max_rows lignes par lots, puis compte le reste sans le garder en mémoire.
+    Si le budget s'épuise pendant le comptage, les lignes sont gardées et le total devient une borne.
+    """
+    columns = [description[0] for description in cursor.description or ()]
+    rows: List[tuple] = []
+    while len(rows) < max_rows:
+        batch = cursor.fetchmany(min(FETCH_BATCH_SIZE, max_rows - len(rows)))
+        if not batch:
+            return FetchResult(ResultSet.from_rows(columns, rows), len(rows), True)
+        rows.extend(batch)
+
+    result_set = ResultSet.from_rows(columns, rows)
+    total = len(rows)
+    try:
+        for _ in cursor:
+            total += 1
+            if total >= MAX_COUNTED_ROWS:
+                return FetchResult(result_set, total, cursor.fetchone() is None)
+    except sqlite3.OperationalError:
+        if not budget.tripped:
+            raise
+        print(f"  ℹ Comptage interrompu ({budget.tripped}) : total partiel.")
+        return FetchResult(result_set, total, False)
+    return FetchResult(result_set, total, True)
+
+
+def _execute_with_fts(cursor, query: str, params: Dict[str, Any], fts_tables, budget: QueryBudget = None) -> None:
+    """Exécute la requête avec les LIKE '%...%' servis par l'index FTS5 ; requête d'origine en secours."""
+    rewritten = rewrite_like_to_fts(query, fts_tables, params)
+    if rewritten == query:
+        cursor.execute(query, params)
+        return
+
+    try:
+        cursor.execute(rewritten, params)
+        print("  ℹ LIKE réécrits vers l'index FTS5.")
+    except Exception as e:
+        if budget is not None and budget.tripped:
+            raise
+        print(f"  ⚠ Réécriture FTS5 refusée ({e}) -> requête d'origine.")
+        cursor.execute(query, params)
+
+
+async def aexecute_sql_node(state: AgentState) -> Command[Literal["determine_chart_intent"]]:
+    """Version asynchrone : la lecture SQLite tourne dans un thread, la boucle reste libre."""
+    return await asyncio.to_thread(execute_sql_node, state)
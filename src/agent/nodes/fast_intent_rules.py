@@ -0,0 +1,107 @@
+# src/agent/nodes/fast_intent_rules.py
+import re
+import threading
+from typing import Optional, Dict
+
+from ..state import UserQueryClassification
+from ..gazetteer import extract_entities
+from src.ingestion.clean_data import ElectionDataCleaner
+
+
+# --- PATTERNS (appliqués sur la question normalisée : minuscules, sans accents ni ponctuation) ---
+# Partagés avec sql_templates : une seule définition pour les règles et les templates
+_PARTICIPATION = re.compile(r"\b(taux de )?participation\b")
+_SEATS = re.compile(r"\b(sieges?|deputes?)\b|\bcombien\b.*\belus?\b")
+_WINNER = re.compile(r"\bqui\b.*\b(gagne|remporte|elu|emporte)\b|\b(gagnant|vainqueur|elu)s?\b")
+_RANKING = re.compile(r"\b(plus (fort|forte|eleve|elevee|faible|bas|basse)|classe|classement|top)\b")
+
+# Formulations que les règles ne savent pas traiter : on laisse décider le LLM
+_DEFER = re.compile(
+    r"\b(compare[rz]?|comparaison|versus|vs|difference|entre|graphique|diagramme|histogramme|"
+    r"camembert|courbe|carte|evolution|prevision|predi\w*|financ\w*|pourquoi|ce|cette|cet|ces)\b"
+    # Négations ("n'ont pas été élus", "sans siège") : le sens s'inverse, les règles ne le voient pas
+    r"|\b(n|ne|pas|non|sans|aucun|aucune|jamais|perdu|perdus|battu|battus)\b"
+)
+
+
+_STATS = {"hits": 0, "misses": 0}
+_STATS_LOCK = threading.Lock()
+
+
+def _record(hit: bool) -> None:
+    with _STATS_LOCK:
+        _STATS["hits" if hit else "misses"] += 1
+        total = _STATS["hits"] + _STATS["misses"]
+        rate = _STATS["hits"] / total
+    status = "hit" if hit else "miss -> LLM"
+    print(f"[Fast Intent] {status} (taux de règles : {rate:.0%} sur {total} questions)")
+
+
+def get_rule_stats() -> Dict[str, float]:
+    """Compteurs de la voie rapide : appels LLM évités = hits."""
+    with _STATS_LOCK:
+        total = _STATS["hits"] + _STATS["misses"]
+        return {
+            "hits": _STATS["hits"],
+            "misses": _STATS["misses"],
+            "hit_rate": _STATS["hits"] / total if total else 0.0,
+        }
+
+
+def reset_rule_stats() -> None:
+    with _STATS_LOCK:
+        _STATS["hits"] = 0
+        _STATS["misses"] = 0
+
+
+def classify_with_rules(user_query: str) -> Optional[UserQueryClassification]:
+    """
+    Classification déterministe des questions évidentes.
+    Renvoie None (-> LLM) dès que la question sort des cas sûrs.
+    """
+    classification = _match_rules(user_query)
+    _record(classification is not None)
+    return classification
+
+
+def is_deferred(text: str) -> bool:
+    """Vrai si la question normalisée contient une formulation réservée au LLM."""
+    return bool(_DEFER.search(text))
+
+
+def _match_rules(user_query: str) -> Optional[UserQueryClassification]:
+    text = ElectionDataCleaner.normalize_search_text(user_query)
+    if not text or is_deferred(text):
+        return None
+
+    entities = extract_entities(text)
+    if entities is None:
+        return None
+
+    places = list(entities["region"]) + list(entities["circonscription"])
+    parties = list(entities["parti"])
+
+    # Plusieurs lieux ou plusieurs partis : comparaison implicite, on laisse le LLM
+    if len(places) > 1 or len(parties) > 1:
+        return None
+
+    if _PARTICIPATION.search(text) and places and not parties:
+        return _allowed("ranking" if _RANKING.search(text) else "simple_retrieval",
+                        f"taux de participation à '{places[0]}'")
+
+    if _SEATS.search(text) and parties and not places:
+        return _allowed("aggregation", f"sièges du parti '{parties[0]}'")
+
+    if _WINNER.search(text) and places and not parties:
+        return _allowed("simple_retrieval", f"vainqueur à '{places[0]}'")
+
+    return None
+
+
+def _allowed(query_nature: str, reason: str) -> UserQueryClassification:
+    return UserQueryClassification(
+        request_validity="allowed",
+        query_nature=query_nature,
+        task_type="sql_query",
+        reasoning_summary=f"Règle déterministe : {reason}",
+    )
@@ -2,22 +2,70 @@
 
 from langgraph.types import Command
 from langchain_core.prompts import ChatPromptTemplate
-from typing import Literal
+from typing import Literal, Optional
 import re
 
 from ..state import AgentState
-from ..llm_client import LLMClient
+from ..llm_client import get_llm_client
+from .sql_templates import render_sql_template
+from ..gazetteer import format_resolved_entities, format_region_list
 from src.ingestion.clean_data import ElectionDataCleaner
+from src.database.sql_params import parameterize_sql
 from langsmith import traceable
 
 
-# Initialisation du client LLM
-llm_client = LLMClient()
 @traceable(name="sql_generation")
 def generate_sql_query_node(state: AgentState) -> Command[Literal["verify_sql"]]:
     """
     Nœud de génération SQL avec typage strict des colonnes pour SQLite.
+    Les questions fréquentes sont servies par un template, sans appel LLM.
     """
+    templated = _template_command(state)
+    if templated:
+        return templated
+
+    try:
+        response = get_llm_client().invoke(_build_sql_prompt(state))
+        return _sql_command(response)
+
+    except Exception as e:
+        return _sql_error_command(e)
+
+
+@traceable(name="sql_generation")
+async def agenerate_sql_query_node(state: AgentState) -> Command[Literal["verify_sql"]]:
+    """Version asynchrone de generate_sql_query_node."""
+    templated = _template_command(state)
+    if templated:
+        return templated
+
+    try:
+        response = await get_llm_client().ainvoke(_build_sql_prompt(state))
+        return _sql_command(response)
+
+    except Exception as e:
+        return _sql_error_command(e)
+
+
+def _template_command(state: AgentState) -> Optional[Command[Literal["verify_sql"]]]:
+    """SQL issu d'un template, uniquement au premier essai (une correction d'erreur passe par le LLM)."""
+    if state.get('errors'):
+        return None
+
+    match = render_sql_template(state.get('user_query', ""))
+    if not match:
+        return None
+
+    name, sql_query = match
+    print(f"\n[Generate SQL] Template '{name}' : {sql_query}")
+    return Command(
+        update=sql_update(sql_query),
+        goto="verify_sql"
+    )
+
+
+def _build_sql_prompt(state: AgentState) -> str:
+    """Construit le prompt SQL (schéma, consignes, exemples, erreur précédente)."""
 
     # --- 1. RÉCUPÉRATION DES DONNÉES ---
     user_query = state.get('user_query', "")
@@ -43,12 +91,40 @@ def generate_sql_query_node(state: AgentState) -> Command[Literal["verify_sql"]]
     if classification and hasattr(classification, 'query_nature'):
         query_nature = classification.query_nature
 
-    # --- 5. CONSTRUCTION DU PROMPT AVEC TYPES DE COLONNES ---
-    system_prompt = f"""
+    # --- 5. ENTITÉS RÉSOLUES PAR LE GAZETTEER ---
+    resolved_entities = format_resolved_entities(user_query)
+
+    # --- 6. CONSTRUCTION DU PROMPT AVEC TYPES DE COLONNES ---
+    system_prompt = build_sql_system_prompt(similar_context, error_feedback, resolved_entities)
+
+    human_message = f"""
+QUESTION UTILISATEUR : "{user_query}"
+VALEUR DE RECHERCHE NETTOYÉE : "{normalized_query}"
+TYPE DE REQUÊTE : {query_nature}
+
+Requête SQLite :
+"""
+
+    # --- 7. ASSEMBLAGE DU PROMPT ---
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", human_message)
+    ])
+    return prompt.format()
+
+
+def build_sql_system_prompt(similar_context: str = "", error_feedback: str = "", resolved_entities: str = "") -> str:
+    """Consignes SQL complètes (en-tête, schéma typé, règles de recherche, exemples)."""
+    return f"""
 TU ES UN EXPERT SQLITE (DIALECTE SQLITE).
 Génère une requête SQL brute basée strictement sur le schéma et les types ci-dessous.
 
---- SCHÉMA DÉTAILLÉ DES VUES (TYPES SQLITE) ---
+{sql_schema_context()}{sql_rules(similar_context, error_feedback, resolved_entities)}"""
+
+
+def sql_schema_context() -> str:
+    """Schéma typé des vues et tables pré-calculées (bloc partagé avec le mode combiné)."""
+    return """--- SCHÉMA DÉTAILLÉ DES VUES (TYPES SQLITE) ---
 
 1. VUE 'vue_resultats_detailles' (Tous les scores par candidat) :
    - region_nom (TEXT) : Nom officiel de la région.
@@ -63,6 +139,10 @@ Génère une requête SQL brute basée strictement sur le schéma et les types c
    - score_voix (INTEGER) : Nombre entier de voix.
    - pourcentage_voix (REAL) : Valeur décimale.
    - est_elu (INTEGER) : 1 pour élu, 0 pour non élu.
+   - rang_circonscription (INTEGER) : Rang par voix dans la circonscription (1 = premier, 2 = second...).
+   - marge_voix (INTEGER) : Avance sur le second pour le premier, retard sur le premier pour les autres (NULL si seul candidat).
+   - marge_pourcentage (REAL) : Même écart en valeur décimale de pourcentage.
+   - part_voix_regionale (REAL) : Part des voix de la région obtenues par le candidat (valeur décimale).
 
 2. VUE 'vue_elus_uniquement' (Uniquement les vainqueurs) :
    - region_nom (TEXT), region_nom_norm (TEXT)
@@ -70,6 +150,7 @@ Génère une requête SQL brute basée strictement sur le schéma et les types c
    - parti_politique (TEXT), parti_politique_norm (TEXT)
    - nom_liste_candidat (TEXT), nom_liste_candidat_norm (TEXT)
    - score_voix (INTEGER)
+   - marge_voix (INTEGER), marge_pourcentage (REAL) : Avance sur le second.
 
 3. VUE 'vue_stats_regionales' (Agrégations participation) :
    - region_nom (TEXT), region_nom_norm (TEXT)
@@ -78,8 +159,34 @@ Génère une requête SQL brute basée strictement sur le schéma et les types c
    - total_exprimes (INTEGER) : Somme des suffrages exprimés.
    - taux_participation_regional (REAL) : Moyenne calculée en %.
 
---- CONSIGNES DE SYNTAXE ---
-- TEXT : Utilise 'guillemets simples' et LIKE avec % (ex: region_nom_norm LIKE '%abidjan%').
+4. TABLE 'stats_sieges_partis' (Sièges par parti, pré-calculés) :
+   - parti_politique (TEXT), parti_politique_norm (TEXT)
+   - nombre_sieges (INTEGER) : Nombre d'élus du parti.
+   - total_voix_elus (INTEGER) : Voix cumulées de ses élus.
+
+5. TABLE 'stats_voix_partis_regions' (Voix par parti et par région, pré-calculées) :
+   - region_nom (TEXT), region_nom_norm (TEXT)
+   - parti_politique (TEXT), parti_politique_norm (TEXT)
+   - total_voix (INTEGER) : Voix du parti dans la région.
+   - nombre_candidats (INTEGER), nombre_elus (INTEGER)
+
+'vue_elus_uniquement', 'vue_stats_regionales' et les tables 'stats_*' sont pré-calculées au chargement :
+préfère-les aux GROUP BY sur 'vue_resultats_detailles' pour les sièges, la participation et les voix par parti.
+Rang, marge et part régionale sont pré-calculés : N'UTILISE PAS de fonctions de fenêtre (RANK, OVER) ni d'auto-jointure
+pour classer les candidats d'une circonscription ou calculer un écart (ex: second = rang_circonscription = 2).
+
+"""
+
+
+def sql_rules(similar_context: str = "", error_feedback: str = "", resolved_entities: str = "",
+              include_regions: bool = True) -> str:
+    """
+    Consignes de syntaxe et de recherche, entités résolues et exemples.
+    include_regions=False : la liste des régions figure déjà dans un bloc partagé du prompt.
+    """
+    regions_line = f"Voici les regions de la cote d'ivoire : [{format_region_list()}]\n" if include_regions else ""
+    return f"""--- CONSIGNES DE SYNTAXE ---
+- TEXT : Utilise 'guillemets simples' ; filtre exact si l'entité est résolue, sinon LIKE avec % (ex: region_nom_norm LIKE '%abidjan%').
 - INTEGER/REAL : Pas de guillemets (ex: score_voix > 1000).
 - SQL PUR : Pas de texte explicatif, pas de blocs Markdown (```).
 - RÈGLES DE RECHERECHE INTELLIGENTE (IMPORTANT) ---
@@ -94,65 +201,59 @@ De nombreuses villes ont deux circonscriptions : une 'COMMUNE' et une 'SOUS-PRÉ
 3. PRÉCISION SOUS-PRÉFECTURE : Si l'utilisateur dit "S/P", "SP", "Village" ou "Sous-préfecture", cherche :
    WHERE nom_circonscription_norm LIKE '%agboville%prefecture%'
    
-"N'utilise jamais l'opérateur '=' pour les noms de lieux ou de personnes. Utilise toujours l'opérateur 'LIKE' avec des jokers '%' de chaque côté (ex: LIKE '%nom%') sur les colonnes suffixées par '_norm
+ENTITÉS RÉSOLUES : quand la section "ENTITÉS RÉSOLUES" donne un filtre pour un lieu, un parti ou un candidat,
+utilise EXACTEMENT ce filtre ('=' ou IN sur les valeurs exactes de la colonne _norm) : il exploite les index.
+Tu peux seulement retirer des valeurs de la liste si la question précise "Commune" ou "Sous-préfecture".
+Pour un nom NON résolu, n'utilise jamais '=' : utilise 'LIKE' avec des jokers '%' de chaque côté (ex: LIKE '%nom%') sur les colonnes suffixées par '_norm'.
 1. SUPPRESSION DES POINTS : "R.H.D.P." ou  devient "rhdp" ou "rdr". Ne jamais inclure de points dans le SQL.
 "PPA-CI" ou "PDCI-RDA" devient "ppa-ci" ou "pdci-rda".
 3. MINUSCULES : Transforme tout en minuscules (ex: "Abidjan" -> "abidjan").
-Voici les regions de la cote d'ivoire : [
-'agneby-tiassa' 'bafing' 'belier' 'bere' 'bounkani' 'cavally'
- "district autonome d'abidjan" 'district autonome de yamoussoukro' 'folon'
- 'gbeke' 'gbokle' 'goh' 'gontougo' 'grands ponts' 'guemon' 'hambol' 
- 'haut-sassandra' 'haut- sassandra' 'iffou' 'indenie-djuablin'      
- 'kabadougou' 'la me' 'loh-djiboua' 'marahoue' 'moronou' 'nawa' "n'zi"
- 'poro' 'san-pedro' 'sud-comoe' 'tonkpi' 'worodougou']
- on dit generalement abidjan au lieu de district autonome d'abidjan et abidjan est une region
-Si une question porte sur une ville ou une circonscription sans précision (ex: juste 'Tiapoum' ou 'Agboville'), sélectionne TOUJOURS la colonne nom_circonscription dans ton SQL. Cela permettra de distinguer les résultats si plusieurs entités existent (Commune, Sous-préfecture, etc.). Utilise LIKE '%terme%' pour attraper toutes les variantes
+{regions_line} on dit generalement abidjan au lieu de district autonome d'abidjan et abidjan est une region
+Si une question porte sur une ville ou une circonscription sans précision (ex: juste 'Tiapoum' ou 'Agboville'), sélectionne TOUJOURS la colonne nom_circonscription dans ton SQL. Cela permettra de distinguer les résultats si plusieurs entités existent (Commune, Sous-préfecture, etc.). Sans entité résolue, utilise LIKE '%terme%' pour attraper toutes les variantes
+
+--- ENTITÉS RÉSOLUES (valeurs exactes de la base) ---
+{resolved_entities if resolved_entities else "Aucune entité reconnue : utilise LIKE '%terme%'."}
 {error_feedback}
 
 CONTEXTE DE RÉFÉRENCE :
 {similar_context if similar_context else "Aucun exemple, suis le schéma à la lettre."}
 """
 
-    human_message = f"""
-QUESTION UTILISATEUR : "{user_query}"
-VALEUR DE RECHERCHE NETTOYÉE : "{normalized_query}"
-TYPE DE REQUÊTE : {query_nature}
 
-Requête SQLite :
-"""
+def sql_update(sql_query: str) -> dict:
+    """Requête paramétrée (valeurs en bindings) : même forme -> même instruction préparée."""
+    shape, params = parameterize_sql(sql_query)
+    if params:
+        print(f"  → Paramètres : {params}")
+    return {"sql_query": shape, "sql_params": params}
 
-    # --- 6. EXÉCUTION ---
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", human_message)
-    ])
 
-    try:
-        formatted_prompt = prompt.format()
-        response = llm_client.invoke(formatted_prompt)
-
-        # Extraction propre du contenu (gestion objet vs string)
-        if isinstance(response, str):
-            raw_sql = response.strip()
-        elif hasattr(response, 'content'):
-            raw_sql = response.content.strip()
-        else:
-            raw_sql = str(response).strip()
-        
-        clean_sql = _clean_sql_output(raw_sql)
-        print(f"\n[Generate SQL] SQL produit : {clean_sql}")
-
-        return Command(
-            update={"sql_query": clean_sql},
-            goto="verify_sql"
-        )
+def _sql_command(response) -> Command[Literal["verify_sql"]]:
+    """Extrait le SQL de la réponse du LLM et passe à la vérification."""
+    # Extraction propre du contenu (gestion objet vs string)
+    if isinstance(response, str):
+        raw_sql = response.strip()
+    elif hasattr(response, 'content'):
+        raw_sql = response.content.strip()
+    else:
+        raw_sql = str(response).strip()
+    
+    clean_sql = _clean_sql_output(raw_sql)
+    print(f"\n[Generate SQL] SQL produit : {clean_sql}")
+
+    return Command(
+        update=sql_update(clean_sql),
+        goto="verify_sql"
+    )
+
+
+def _sql_error_command(e: Exception) -> Command[Literal["verify_sql"]]:
+    print(f"  ✗ [Error] : {str(e)}")
+    return Command(
+        update={"sql_query": None, "sql_params": None, "errors": [str(e)]},
+        goto="verify_sql"
+    )
 
-    except Exception as e:
-        print(f"  ✗ [Error] : {str(e)}")
-        return Command(
-            update={"sql_query": None, "errors": [str(e)]},
-            goto="verify_sql"
-        )
 
 def _clean_sql_output(text: str) -> str:
     """Nettoie le résultat pour ne garder que le SELECT."""
@@ -1,15 +1,37 @@
 # src/agent/nodes/generate_chart.py
+import asyncio
+import os
 
-import matplotlib.pyplot as plt
-import io
 import base64
+import re
+import numpy as np
 from langgraph.types import Command
 from langgraph.graph import END
 from typing import Literal, List, Dict
 
 from ..state import AgentState
+from ..chart_renderer import PLOTLY_MIME, plotly_figure, render_chart
+from src.database.result_set import ResultSet
 from langsmith import traceable
 
+# "plotly" : spécification JSON rendue dans le navigateur (st.plotly_chart) ; "png" : image matplotlib
+CHART_BACKEND = os.getenv("CHART_BACKEND", "plotly")
+
+# Taille maximale d'un graphique, quel que soit le nombre de lignes
+MAX_CATEGORIES = 20       # barres (la queue est regroupée dans "Autres")
+MAX_PIE_SLICES = 8
+HISTOGRAM_MAX_BINS = 30
+MAX_LINE_POINTS = 500
+OTHERS_LABEL = "Autres"
+OTHERS_MEDIAN_LABEL = "Autres (médiane)"
+
+# Colonnes dont la somme a un sens (comptages, voix) : seules celles-ci sont sommées dans "Autres".
+# Taux, pourcentages, parts, marges ou rangs : la queue est résumée par sa médiane.
+# Mots entiers du nom de colonne (séparés par "_", espace, parenthèse) : "part" ne reconnaît ni "parti" ni "departement".
+_ADDITIVE_COLUMN = re.compile(r"(?:^|[^a-z0-9])(?:voix|votants|inscrits|exprimes|sieges|elus|candidats|bulletins|"
+                              r"suffrages|nombre|nb|total|effectif|count|sum|somme)(?![a-z0-9])")
+_NON_ADDITIVE_COLUMN = re.compile(r"(?:^|[^a-z0-9])(?:taux|pourcentage|part|marge|rang|moyen|moyenne|median|mediane|"
+                                  r"ratio|pct|percent|avg)s?(?![a-z0-9])")
 
 
 @traceable(name="determine_chart_intent")
@@ -64,11 +86,15 @@ def generate_chart_node(state: AgentState) -> Command[Literal["generate_final_an
             chart_data = _create_bar_chart(data)
         elif chart_type == "pie":
             chart_data = _create_pie_chart(data)
-        elif chart_type == "histogram":
-            chart_data = _create_bar_chart(data) # Souvent similaire en SQL simple
+        elif chart_type in ("histogram", "line"):
+            chart_data = _create_bar_chart(data, chart_type)
         else:
             # Par défaut, on tente un bar chart si le type est inconnu
             chart_data = _create_bar_chart(data)
+
+        if state.get('sql_truncated'):
+            # Le graphique ne montre qu'un extrait : l'UI l'indique sous l'image
+            chart_data["note"] = f"{len(data)} premières lignes sur {state.get('sql_total_rows')}"
             
         return Command(
             update={
@@ -87,79 +113,148 @@ def generate_chart_node(state: AgentState) -> Command[Literal["generate_final_an
         )
 
 
-def _prepare_data_for_plotting(data: List[Dict]):
+def _prepare_data_for_plotting(data: ResultSet, chart_type: str = "bar"):
     """
     Essaie de deviner intelligemment qui est X (labels) et qui est Y (valeurs).
-    Heuristique : 
-    - X = Première colonne de type texte trouvée.
-    - Y = Première colonne de type nombre trouvée.
+    Heuristique (sur les types de colonnes, sans parcourir les lignes) :
+    - X = Première colonne de type texte trouvée (à défaut, la première colonne).
+    - Y = Première colonne de type nombre trouvée, autre que X (ex. (annee, voix) -> voix par année).
+    Puis réduction vectorisée selon le type, pour une taille de graphique constante :
+    - bar / pie : au-delà de N catégories, la queue est regroupée dans "Autres"
+    - histogram : vraies classes (np.histogram) sur la colonne numérique
+    - line : série sous-échantillonnée à MAX_LINE_POINTS points
     """
     if not data: return None, None, None, None
     
-    keys = list(data[0].keys())
-    
-    label_key = None
-    value_key = None
+    keys = data.columns
     
     # Recherche heuristique
-    for k in keys:
-        val = data[0][k]
-        if isinstance(val, str) and not label_key:
-            label_key = k
-        elif isinstance(val, (int, float)) and not value_key:
-            value_key = k
-            
+    numeric_keys = [k for k, kind in zip(keys, data.types) if kind in ("integer", "real")]
+    label_key = next((k for k, kind in zip(keys, data.types) if kind == "text"), keys[0])
+    value_key = next((k for k in numeric_keys if k != label_key), None)
+
     # Fallback si on ne trouve pas
-    if not label_key: label_key = keys[0]
     if not value_key and len(keys) > 1: value_key = keys[1]
+    # Une seule colonne numérique : sa propre distribution (histogramme)
+    if not value_key and label_key in numeric_keys: value_key = label_key
+    if not value_key: return [str(label) for label in data.values(label_key)], None, label_key, None
     
-    # Extraction des listes
-    labels = [str(row[label_key]) for row in data]
-    values = [row[value_key] for row in data]
-    
-    return labels, values, label_key, value_key
+    # Extraction des colonnes (tableaux, pas de dict par ligne)
+    values = _as_numeric(data.column(value_key))
 
-def _create_bar_chart(data: List[Dict]) -> Dict:
-    """Génère un Barchart et renvoie l'image en base64."""
-    labels, values, x_label, y_label = _prepare_data_for_plotting(data)
-    
-    if not values: raise ValueError("Pas de données numériques trouvées pour le graphique.")
+    if chart_type == "histogram" and (len(values) > MAX_CATEGORIES or "text" not in data.types):
+        labels, counts = _histogram(values)
+        return labels, counts, value_key, "effectif"
 
-    plt.figure(figsize=(10, 6))
+    labels = np.asarray(data.values(label_key), dtype=object).astype(str)
+    if chart_type == "line":
+        labels, values = _downsample(labels, values, MAX_LINE_POINTS)
+    else:
+        labels, values = _fold_tail(labels, values, MAX_PIE_SLICES if chart_type == "pie" else MAX_CATEGORIES,
+                                    additive=is_additive(value_key))
     
-    # Création du bar chart
-    bars = plt.bar(labels, values, color='#4CAF50')
+    return labels.tolist(), values, label_key, value_key
+
+
+def _as_numeric(column: np.ndarray) -> np.ndarray:
+    """Colonne numérique en float (NULL -> NaN) si elle n'est pas déjà int64/float64."""
+    if column.dtype != object:
+        return column
+    try:
+        return np.array(column, dtype=np.float64)
+    except (TypeError, ValueError):
+        return column
+
+
+def is_additive(column: str) -> bool:
+    """Vrai si la colonne se somme (voix, votants, sièges...) ; faux pour un taux, une part, une marge ou inconnue."""
+    name = column.lower()
+    return bool(_ADDITIVE_COLUMN.search(name)) and not _NON_ADDITIVE_COLUMN.search(name)
+
+
+def _fold_tail(labels: np.ndarray, values: np.ndarray, max_categories: int, additive: bool = True):
+    """
+    Garde les max_categories - 1 plus grandes valeurs (dans l'ordre d'origine) et regroupe le reste :
+    somme dans "Autres" pour une colonne additive, médiane dans "Autres (médiane)" sinon.
+    """
+    if len(values) <= max_categories or values.dtype == object:
+        return labels, values
+    ranking = np.nan_to_num(values, nan=-np.inf)
+    keep = np.sort(np.argpartition(-ranking, max_categories - 1)[:max_categories - 1])
+    rest = np.ones(len(values), dtype=bool)
+    rest[keep] = False
+    if additive:
+        return np.append(labels[keep], OTHERS_LABEL), np.append(values[keep], np.nansum(values[rest]))
+    tail = values[rest].astype(np.float64)
+    median = np.nanmedian(tail) if np.isfinite(tail).any() else np.nan
+    return np.append(labels[keep], OTHERS_MEDIAN_LABEL), np.append(values[keep].astype(np.float64), median)
+
+
+def _histogram(values: np.ndarray):
+    """Classes d'effectifs : règle de Sturges, bornée à HISTOGRAM_MAX_BINS."""
+    finite = values[np.isfinite(values)] if values.dtype != object else np.array([], dtype=np.float64)
+    if not len(finite): return [], np.array([], dtype=np.int64)
+    bins = min(HISTOGRAM_MAX_BINS, int(np.ceil(np.log2(len(finite)))) + 1)
+    counts, edges = np.histogram(finite, bins=bins)
+    labels = [f"{lo:,.4g} – {hi:,.4g}".replace(",", " ") for lo, hi in zip(edges[:-1], edges[1:])]
+    return labels, counts
+
+
+def _downsample(labels: np.ndarray, values: np.ndarray, max_points: int):
+    """Points régulièrement espacés (premier et dernier gardés)."""
+    if len(values) <= max_points:
+        return labels, values
+    idx = np.unique(np.linspace(0, len(values) - 1, max_points).round().astype(np.int64))
+    return labels[idx], values[idx]
+
+def _bar_spec(data: ResultSet, chart_type: str = "bar") -> Dict:
+    """Spécification d'un Barchart (données seules, dessinée par chart_renderer)."""
+    labels, values, x_label, y_label = _prepare_data_for_plotting(data, chart_type)
     
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
-    plt.title(f"{y_label} par {x_label}")
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    if values is None or not len(values): raise ValueError("Pas de données numériques trouvées pour le graphique.")
+
+    return {
+        "kind": "line" if chart_type == "line" else "bar",
+        "labels": labels,
+        "values": values.tolist(),
+        "x_label": x_label,
+        "y_label": y_label,
+        "title": f"Distribution de {x_label}" if chart_type == "histogram" else f"{y_label} par {x_label}",
+    }
+
+def _pie_spec(data: ResultSet) -> Dict:
+    """Spécification d'un Piechart."""
+    labels, values, _, _ = _prepare_data_for_plotting(data, "pie")
     
-    # Sauvegarde en mémoire
-    return _fig_to_base64(plt)
+    if values is None or not len(values): raise ValueError("Pas de données numériques.")
+
+    return {"kind": "pie", "labels": labels, "values": values.tolist()}
 
-def _create_pie_chart(data: List[Dict]) -> Dict:
+def _create_bar_chart(data: ResultSet, chart_type: str = "bar") -> Dict:
+    """Génère un Barchart, un histogramme ou une courbe (figure Plotly, ou image base64 si CHART_BACKEND = "png")."""
+    return _build_chart(chart_type, data, lambda d: _bar_spec(d, chart_type))
+
+def _create_pie_chart(data: ResultSet) -> Dict:
     """Génère un Piechart."""
-    labels, values, _, _ = _prepare_data_for_plotting(data)
-    
-    if not values: raise ValueError("Pas de données numériques.")
+    return _build_chart("pie", data, _pie_spec)
 
-    plt.figure(figsize=(8, 8))
-    plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=140)
-    plt.axis('equal') 
-    
-    return _fig_to_base64(plt)
-
-def _fig_to_base64(plt_obj) -> Dict:
-    """Convertit la figure Matplotlib en string base64 pour l'envoi."""
-    img = io.BytesIO()
-    plt_obj.savefig(img, format='png')
-    img.seek(0)
-    b64_string = base64.b64encode(img.read()).decode('utf-8')
-    plt_obj.close()
-    
+def _build_chart(chart_type: str, data: ResultSet, build_spec) -> Dict:
+    if CHART_BACKEND == "png":
+        return _png_chart(chart_type, data, build_spec)
+    return {
+        "mime_type": PLOTLY_MIME,
+        "figure": plotly_figure(build_spec(data))
+    }
+
+def _png_chart(chart_type: str, data: ResultSet, build_spec) -> Dict:
+    """Rendu (pool de processus + cache de rendu) puis encodage base64 pour l'envoi."""
+    png = render_chart(chart_type, data, lambda: build_spec(data))
     return {
         "mime_type": "image/png",
-        "data": b64_string
-    }
\ No newline at end of file
+        "data": base64.b64encode(png).decode('utf-8')
+    }
+
+
+async def agenerate_chart_node(state: AgentState) -> Command[Literal["generate_final_answer"]]:
+    """Version asynchrone : le rendu matplotlib (CPU) tourne dans un thread."""
+    return await asyncio.to_thread(generate_chart_node, state)
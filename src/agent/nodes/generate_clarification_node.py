@@ -2,7 +2,8 @@
 from langgraph.types import Command
 from langgraph.graph import END
 
-from ..llm_client import LLMClient
+from ..llm_client import get_llm_client
+from ..gazetteer import format_region_list
 from langsmith import traceable
 
 
@@ -12,9 +13,33 @@ def generate_clarification_node(state: AgentState) -> Command:
     """
     Utilise un LLM pour rédiger une question de clarification personnalisée.
     """
-    # On instancie le client (Mistral)
-    llm_client = LLMClient() 
+    # Client partagé (Mistral)
+    llm_client = get_llm_client()
     
+    # Appel à Mistral
+    response = llm_client.invoke(_build_clarification_prompt(state))
+    
+    return Command(
+        update={"final_answer": response.content},
+        goto=END
+    )
+
+
+@traceable(name="clarification")
+async def agenerate_clarification_node(state: AgentState) -> Command:
+    """Version asynchrone de generate_clarification_node."""
+    llm_client = get_llm_client()
+    response = await llm_client.ainvoke(_build_clarification_prompt(state))
+
+    return Command(
+        update={"final_answer": response.content},
+        goto=END
+    )
+
+
+def _build_clarification_prompt(state: AgentState) -> str:
+    """Prompt de clarification à partir de la question et du raisonnement du classifieur."""
+
     user_query = state.get("user_query")
     # On récupère le raisonnement de la classification précédente
     classification = state.get("classification")
@@ -49,6 +74,7 @@ TABLES :
    - score_voix (INT)
    - pourcentage_voix (FLOAT)
    - est_elu (BOOL)
+   - rang_circonscription (INT), marge_voix (INT), marge_pourcentage (FLOAT), part_voix_regionale (FLOAT) : pré-calculés
 
 VUES DISPONIBLES :
 - vue_resultats_detailles : jointure complète candidats + circonscriptions
@@ -87,19 +113,8 @@ EXEMPLES DE QUESTIONS HORS SCOPE :
     
     RECO : Ne sois pas robotique. Utilise le contexte de sa question. Réponds en français
     ne donne que la reponse, ne soit pas trop bavard,CONTENTE TOI DE DEMANDER JUSTE LA CLARIFICATION.
-    Voici les regions de la cote d'ivoire : [   "district autonome d'abidjan" 'district autonome de yamoussoukro' 'folon'
- 'gbeke' 'gbokle' 'goh' 'gontougo' 'grands ponts' 'guemon' 'hambol' 
- 'haut-sassandra' 'haut- sassandra' 'iffou' 'indenie-djuablin'      
- 'kabadougou' 'la me' 'loh-djiboua' 'marahoue' 'moronou' 'nawa' "n'zi"
- 'poro' 'san-pedro' 'sud-comoe' 'tonkpi' 'worodougou'
- on dit generalement abidjan au lieu de district autonome d'abidjan]
+    Voici les regions de la cote d'ivoire : [{format_region_list()}]
+    on dit generalement abidjan au lieu de district autonome d'abidjan
   
     """
-    
-    # Appel à Mistral
-    response = llm_client.invoke(prompt)
-    
-    return Command(
-        update={"final_answer": response.content},
-        goto=END
-    )
\ No newline at end of file
+    return prompt
@@ -4,13 +4,13 @@ from langgraph.types import Command
 from langgraph.graph import END 
 from langchain_core.prompts import ChatPromptTemplate
 from ..state import AgentState
-from ..llm_client import LLMClient
+from ..llm_client import get_llm_client
+from ..gazetteer import format_region_list
 from typing import List, Dict, Any
+from src.database.result_set import ResultSet
 from langsmith import traceable
 
 
-# Initialisation du client LLM
-llm_client = LLMClient()
 @traceable(name="generate_final_answer")
 def generate_final_answer_node(state: AgentState) -> Command:
     """
@@ -19,20 +19,43 @@ def generate_final_answer_node(state: AgentState) -> Command:
     """
     
     # 1. Récupération sécurisée des données
+    if not state.get('sql_results', []):
+        return _no_results_command()
+
+    try:
+        # 2. Appel LLM
+        response = get_llm_client().invoke(_build_answer_prompt(state))
+        return _answer_command(response)
+
+    except Exception as e:
+        return _answer_error_command(e)
+
+
+@traceable(name="generate_final_answer")
+async def agenerate_final_answer_node(state: AgentState) -> Command:
+    """Version asynchrone de generate_final_answer_node."""
+    if not state.get('sql_results', []):
+        return _no_results_command()
+
+    try:
+        response = await get_llm_client().ainvoke(_build_answer_prompt(state))
+        return _answer_command(response)
+
+    except Exception as e:
+        return _answer_error_command(e)
+
+
+def _build_answer_prompt(state: AgentState) -> str:
+    """Prompt de présentation des résultats SQL."""
     user_query = state.get('user_query', "")
     sql_results = state.get('sql_results', [])
-    
-    if not sql_results:
-        return Command(
-            update={"final_answer": "Aucun résultat trouvé pour cette recherche.,veuillez reformulez"},
-            goto=END
-        )
 
     # 2. Formatage des données pour le LLM
     formatted_data = _format_results_to_markdown(sql_results)
+    truncation_note = _truncation_note(state)
     
     # 3. Prompt orienté "Présentation Claire"
-    system_prompt = """
+    system_prompt = f"""
 TU ES UN ASSISTANT ÉLECTORAL EXPERT. 
 Ton rôle est de présenter les résultats des législatives ivoiriennes de façon très structurée et facile à lire.
 
@@ -52,12 +75,7 @@ Exemple de structure attendue :
 - **Agboville Commune** : Le gagnant est **NOM** (**PARTI**).
 - **Agboville Sous-Préfecture** : L'élu est **NOM** (**PARTI**)."
 evite de faire des phrases trop longues
-Voici les regions de la cote d'ivoire : 
- "district autonome d'abidjan" 'district autonome de yamoussoukro' 'folon'
- 'gbeke' 'gbokle' 'goh' 'gontougo' 'grands ponts' 'guemon' 'hambol' 
- 'haut-sassandra' 'haut- sassandra' 'iffou' 'indenie-djuablin'      
- 'kabadougou' 'la me' 'loh-djiboua' 'marahoue' 'moronou' 'nawa' "n'zi"
- 'poro' 'san-pedro' 'sud-comoe' 'tonkpi' 'worodougou'
+Voici les regions de la cote d'ivoire : [{format_region_list()}]
  on dit generalement abidjan au lieu de district autonome d'abidjan
  
 """
@@ -66,6 +84,7 @@ Voici les regions de la cote d'ivoire :
 QUESTION : "{user_query}"
 DONNÉES SQL :
 {formatted_data}
+{truncation_note}
 Présente ces résultats de façon claire pour l'interlocuteur 
 Ne parle surtout pas assez.Evite les longs textes
 EVITE de mettre des notes à la fin de tes messages : notes:....
@@ -77,39 +96,56 @@ EVITE de mettre des notes à la fin de tes messages : notes:....
         ("system", system_prompt),
         ("human", human_message)
     ])
+    return prompt.format()
 
-    try:
-        # 4. Appel LLM
-        formatted_prompt = prompt.format()
-        response = llm_client.invoke(formatted_prompt)
-        
-        # Gestion du type de réponse
-        if isinstance(response, str):
-            final_text = response.strip()
-        elif hasattr(response, 'content'):
-            final_text = response.content.strip()
-        else:
-            final_text = str(response).strip()
-
-        return Command(
-            update={"final_answer": final_text},
-            goto=END
-        )
 
-    except Exception as e:
-        print(f"  ✗ [Error] : {e}")
-        return Command(
-            update={"final_answer": "Erreur lors de la mise en forme des résultats."},
-            goto=END
-        )
+def _answer_command(response) -> Command:
+    # Gestion du type de réponse
+    if isinstance(response, str):
+        final_text = response.strip()
+    elif hasattr(response, 'content'):
+        final_text = response.content.strip()
+    else:
+        final_text = str(response).strip()
+
+    return Command(
+        update={"final_answer": final_text},
+        goto=END
+    )
+
+
+def _no_results_command() -> Command:
+    return Command(
+        update={"final_answer": "Aucun résultat trouvé pour cette recherche.,veuillez reformulez"},
+        goto=END
+    )
+
+
+def _answer_error_command(e: Exception) -> Command:
+    print(f"  ✗ [Error] : {e}")
+    return Command(
+        update={"final_answer": "Erreur lors de la mise en forme des résultats."},
+        goto=END
+    )
+
+
+def _truncation_note(state: AgentState) -> str:
+    """Signale au LLM que les lignes reçues ne sont qu'un extrait (pas de total calculé sur l'extrait)."""
+    if not state.get('sql_truncated'):
+        return ""
+    total = state.get('sql_total_rows')
+    bound = "" if state.get('sql_total_exact', True) else "plus de "
+    return (f"ATTENTION : extrait de {len(state.get('sql_results', []))} lignes sur {bound}{total}. "
+            "Ne calcule pas de total ou de moyenne sur cet extrait ; indique que la liste est partielle.")
+
 
-def _format_results_to_markdown(results: List[Dict]) -> str:
+def _format_results_to_markdown(results: ResultSet) -> str:
     """Crée un tableau simple pour que le LLM lise les données."""
     if not results: return "Vide."
-    headers = list(results[0].keys())
+    headers = results.columns
     header_line = "| " + " | ".join(headers) + " |"
     separator = "| " + " | ".join(["---"] * len(headers)) + " |"
     lines = [header_line, separator]
-    for row in results[:15]:
-        lines.append("| " + " | ".join(str(row.get(h, "")) for h in headers) + " |")
+    for row in results.iter_rows(limit=15):
+        lines.append("| " + " | ".join(str(value) for value in row) + " |")
     return "\n".join(lines)
\ No newline at end of file
@@ -61,53 +61,50 @@ def load_knowledge_base():
     return _BM25_MODEL, _EXAMPLES_DATA
 
 
+def build_examples_context(user_query: str) -> str:
+    """Texte des 2 exemples few-shot les plus proches de la question (BM25)."""
+    bm25, examples = load_knowledge_base()
+
+    if not (bm25 and examples):
+        return "Erreur technique (Base vide)."
+
+    tokenized_query = preprocess(user_query)
+    if not tokenized_query:
+        return "Aucun mot-clé pertinent détecté."
+
+    doc_scores = bm25.get_scores(tokenized_query)
+    top_indexes = sorted(range(len(doc_scores)), key=lambda i: doc_scores[i], reverse=True)[:2]
+
+    context_text = ""
+    found_count = 0
+
+    for idx in top_indexes:
+        score = doc_scores[idx]
+
+        if score > 0.5:
+            ex = examples[idx]
+            context_text += f"--- EXEMPLE SIMILAIRE (Score: {score:.2f}) ---\n"
+            context_text += f"Question : {ex['question']}\n"
+            context_text += f"Raisonnement : {ex['explication']}\n"
+            context_text += f"SQL : {ex['sql_query']}\n\n"
+            found_count += 1
+
+    if found_count == 0:
+        print("  ℹ Aucun exemple assez proche trouvé.")
+        return "Pas d'exemples pertinents disponibles."
+
+    print(f"  ✓ {found_count} exemple(s) trouvé(s) et injecté(s).")
+    return context_text
+
+
 @traceable(name="retrieve_similar_example_sql")
 def retrieve_similar_examples(state: AgentState) -> Command[Literal["generate_sql"]]:
     """
     Nœud du graphe : Trouve les 2 meilleurs exemples SQL pour aider le LLM.
     """
     print("\n--- RECHERCHE EXEMPLES (BM25) ---")
-    
-    user_query = state['user_query']
-    bm25, examples = load_knowledge_base()
-    
-    context_text = ""
-    
-    if bm25 and examples:
-        tokenized_query = preprocess(user_query)
-        
-        if not tokenized_query:
-            return Command(
-                update={"similar_examples_context": "Aucun mot-clé pertinent détecté."},
-                goto="generate_sql"
-            )
-
-        doc_scores = bm25.get_scores(tokenized_query)
-        top_indexes = sorted(range(len(doc_scores)), key=lambda i: doc_scores[i], reverse=True)[:2]
-        
-        found_count = 0
-        
-        for idx in top_indexes:
-            score = doc_scores[idx]
-            
-            if score > 0.5:
-                ex = examples[idx]
-                context_text += f"--- EXEMPLE SIMILAIRE (Score: {score:.2f}) ---\n"
-                context_text += f"Question : {ex['question']}\n"
-                context_text += f"Raisonnement : {ex['explication']}\n"
-                context_text += f"SQL : {ex['sql_query']}\n\n"
-                found_count += 1
-        
-        if found_count == 0:
-            print("  ℹ Aucun exemple assez proche trouvé.")
-            context_text = "Pas d'exemples pertinents disponibles."
-        else:
-            print(f"  ✓ {found_count} exemple(s) trouvé(s) et injecté(s).")
-            
-    else:
-        context_text = "Erreur technique (Base vide)."
 
     return Command(
-        update={"similar_examples_context": context_text},
+        update={"similar_examples_context": build_examples_context(state['user_query'])},
         goto="generate_sql"
     )
@@ -0,0 +1,139 @@
+# src/agent/nodes/speculative_classify.py
+import asyncio
+import re
+import threading
+from typing import Literal, Dict, Any, Optional
+
+from langgraph.types import Command
+from langsmith import traceable
+
+from ..state import AgentState, UserQueryClassification
+from .classify_intent_sql import classify_intent_node, aclassify_intent_node
+from .generate_adapte_sql import agenerate_sql_query_node
+from .sql_templates import deferred_template_stats, record_template_outcomes
+from .retrieve_similar_sql import build_examples_context
+from .fast_intent_rules import _RANKING
+from src.ingestion.clean_data import ElectionDataCleaner
+
+
+SpeculativeRoute = Literal[
+    "verify_sql", "recherche_similaire", "generate_clarification", "reponse_hors_sujet", "reponse_politique"
+]
+
+# Nature supposée pendant la spéculation (la classification n'est pas encore connue)
+_COMPARISON = re.compile(r"\b(compare[rz]?|comparaison|versus|vs|difference|entre)\b")
+_AGGREGATION = re.compile(r"\b(combien|total|totale|nombre|moyenne|somme|par (parti|region|circonscription)s?)\b")
+
+# Boucle asyncio dédiée : la génération spéculative y tourne en tâche, ce qui permet de
+# l'annuler réellement (requête HTTP interrompue) quand la question n'est pas autorisée.
+# Coût résiduel : les tokens déjà envoyés / produits avant l'annulation restent facturés.
+_SPECULATION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _speculation_loop() -> asyncio.AbstractEventLoop:
+    """Boucle de fond créée au premier appel spéculatif synchrone."""
+    global _SPECULATION_LOOP
+    with _LOOP_LOCK:
+        if _SPECULATION_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="speculative_sql", daemon=True).start()
+            _SPECULATION_LOOP = loop
+        return _SPECULATION_LOOP
+
+
+def guess_query_nature(user_query: str) -> str:
+    """Nature la plus probable, déduite des mots de la question (comme le ferait la classification)."""
+    text = ElectionDataCleaner.normalize_search_text(user_query)
+    if _COMPARISON.search(text):
+        return "comparison"
+    if _RANKING.search(text):
+        return "ranking"
+    if _AGGREGATION.search(text):
+        return "aggregation"
+    return "simple_retrieval"
+
+
+async def _aspeculative_sql(state: AgentState) -> Dict[str, Any]:
+    """Exemples BM25 + génération SQL, exécutés comme si la question était autorisée."""
+    query_nature = guess_query_nature(state['user_query'])
+    assumed = UserQueryClassification(request_validity="allowed", query_nature=query_nature,
+                                      reasoning_summary="Hypothèse de la génération spéculative")
+    examples_context = build_examples_context(state['user_query'])
+    # Statistiques des templates comptées seulement si ce SQL est retenu (sinon le chemin normal les compte)
+    with deferred_template_stats() as template_outcomes:
+        command = await agenerate_sql_query_node({**state, "classification": assumed,
+                                                  "similar_examples_context": examples_context, "errors": []})
+    return {"similar_examples_context": examples_context, "query_nature": query_nature,
+            "template_outcomes": template_outcomes, **command.update}
+
+
+@traceable(name="intent_classification_speculative")
+def speculative_classify_node(state: AgentState) -> Command[SpeculativeRoute]:
+    """
+    Mode spéculatif : la génération SQL démarre en même temps que la classification.
+    Le SQL n'est gardé que si la question est classée 'allowed' avec la nature supposée ;
+    sinon la génération est annulée (ou son résultat jeté si elle a déjà abouti).
+    """
+    sql_future = asyncio.run_coroutine_threadsafe(_aspeculative_sql(state), _speculation_loop())
+    classification_command = classify_intent_node(state)
+
+    if classification_command.goto != "recherche_similaire":
+        # Abandon : la tâche est annulée dans la boucle de fond (appel LLM interrompu)
+        sql_future.cancel()
+        print(f"[Speculative] SQL spéculatif abandonné (route : {classification_command.goto})")
+        return classification_command
+
+    try:
+        speculative = sql_future.result()
+    except Exception as e:
+        print(f"[Speculative] Échec de la génération spéculative : {e}")
+        speculative = None
+
+    return _merge_speculation(classification_command, speculative)
+
+
+@traceable(name="intent_classification_speculative")
+async def aspeculative_classify_node(state: AgentState) -> Command[SpeculativeRoute]:
+    """Version asynchrone de speculative_classify_node (tâches asyncio au lieu de threads)."""
+    sql_task = asyncio.ensure_future(_aspeculative_sql(state))
+    classification_command = await aclassify_intent_node(state)
+
+    if classification_command.goto != "recherche_similaire":
+        sql_task.cancel()
+        print(f"[Speculative] SQL spéculatif abandonné (route : {classification_command.goto})")
+        return classification_command
+
+    try:
+        speculative = await sql_task
+    except Exception as e:
+        print(f"[Speculative] Échec de la génération spéculative : {e}")
+        speculative = None
+
+    return _merge_speculation(classification_command, speculative)
+
+
+def _merge_speculation(classification_command: Command, speculative: Optional[Dict[str, Any]]) -> Command[SpeculativeRoute]:
+    """Question autorisée : on saute la recherche d'exemples et la génération, déjà faites."""
+    if not speculative or speculative.get("errors") or not speculative.get("sql_query"):
+        # Pas de SQL exploitable : chemin séquentiel classique
+        return classification_command
+
+    # Le SQL a été généré pour une autre nature que celle retenue : le prompt aurait différé
+    classification = classification_command.update.get("classification")
+    if classification is not None and classification.query_nature != speculative.get("query_nature"):
+        print(f"[Speculative] Nature supposée '{speculative.get('query_nature')}' ≠ "
+              f"'{classification.query_nature}' -> génération séquentielle.")
+        return classification_command
+
+    print("[Speculative] SQL spéculatif retenu -> vérification.")
+    record_template_outcomes(speculative.get("template_outcomes", []))
+    return Command(
+        update={
+            **classification_command.update,
+            "similar_examples_context": speculative["similar_examples_context"],
+            "sql_query": speculative["sql_query"],
+            "sql_params": speculative.get("sql_params"),
+        },
+        goto="verify_sql"
+    )
@@ -0,0 +1,218 @@
+# src/agent/nodes/sql_templates.py
+import contextvars
+import re
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Tuple
+
+from .fast_intent_rules import is_deferred, _PARTICIPATION, _SEATS, _WINNER, _RANKING
+from ..gazetteer import extract_entities, sql_filter
+from src.ingestion.clean_data import ElectionDataCleaner
+
+
+# --- PATTERNS (question normalisée : minuscules, sans accents ni ponctuation) ---
+_PER_PARTY = re.compile(r"\bpar partis?\b|\bchaque parti\b")
+_PER_REGION = re.compile(r"\bpar regions?\b|\bchaque region\b")
+_TOP_N = re.compile(r"\btop (\d{1,3})\b|\b(\d{1,3}) (premiers|meilleurs|plus gros|plus grands)\b")
+_SCORES = re.compile(r"\b(scores?|voix|candidats?)\b")
+_PARTIES = re.compile(r"\bpartis?\b")
+# Ordre inverse ou période : les templates ne savent que "les plus votés", toutes années confondues
+_UNSUPPORTED = re.compile(
+    r"\bmoins\b|\bplus (faibles?|bas|basses?|petits?|petites?)\b|\b(derniers?|dernieres?|pires?|minimum|min)\b"
+    r"|\b(19|20)\d{2}\b|\b(annee|annees|an)\b"
+)
+# Précision commune / ville / sous-préfecture : le gazetteer l'ignore ("korhogo commune" = toutes les
+# circonscriptions de Korhogo, "abidjan commune" = la région), seul le LLM peut en tenir compte
+_PLACE_QUALIFIER = re.compile(r"\b(communes?|villes?|villages?|sous prefectures?|prefectures?)\b")
+# Question de comptage : "combien d'élus à Bouaké" attend un nombre, pas la liste des élus
+_COUNT = re.compile(r"\b(combien|nombre)\b")
+# Classement à l'intérieur d'un lieu (ex. circonscriptions d'une région par participation)
+_PARTICIPATION_RANKING = re.compile(r"\b(circonscriptions|meilleurs?|premiers?|plus)\b")
+
+DEFAULT_TOP_N = 10
+MAX_TOP_N = 100
+
+_STATS = {"hits": 0, "misses": 0}
+_STATS_LOCK = threading.Lock()
+# Issues mises en attente au lieu d'être comptées (génération spéculative, cf. deferred_template_stats)
+_DEFERRED_OUTCOMES: contextvars.ContextVar[Optional[List[Optional[str]]]] = contextvars.ContextVar(
+    "sql_template_deferred_outcomes", default=None
+)
+
+
+def _place_filter(entities: Dict[str, Dict[str, List[str]]]) -> Optional[str]:
+    """Clause WHERE du lieu cité (une seule région ou une seule circonscription)."""
+    regions = entities["region"]
+    circos = entities["circonscription"]
+    if regions:
+        (values,) = regions.values()
+        return sql_filter("region", values)
+    if circos:
+        (values,) = circos.values()
+        return sql_filter("circonscription", values)
+    return None
+
+
+def _top_n(text: str) -> Optional[int]:
+    match = _TOP_N.search(text)
+    if not match:
+        return None
+    n = int(match.group(1) or match.group(2))
+    return n if 0 < n <= MAX_TOP_N else None
+
+
+# --- TEMPLATES ---
+# Chaque template reçoit la question normalisée et les entités, et renvoie le SQL ou None.
+
+def _seats_per_party(text, entities, place, party) -> Optional[str]:
+    if not _SEATS.search(text):
+        return None
+    if party is None and not place and _PER_PARTY.search(text):
+        return "SELECT parti_politique, nombre_sieges FROM stats_sieges_partis ORDER BY nombre_sieges DESC"
+    if party is None:
+        # "Combien d'élus / de sièges à Bouaké" : élus du lieu, tous partis
+        if place and _COUNT.search(text):
+            return f"SELECT COUNT(*) AS nombre_sieges FROM vue_elus_uniquement WHERE {place}"
+        return None
+    if not place:
+        return f"SELECT SUM(nombre_sieges) AS nombre_sieges FROM stats_sieges_partis WHERE {sql_filter('parti', party)}"
+    return f"SELECT COUNT(*) AS nombre_sieges FROM vue_elus_uniquement WHERE {sql_filter('parti', party)} AND {place}"
+
+
+def _winner_per_constituency(text, entities, place, party) -> Optional[str]:
+    if not (_WINNER.search(text) and place and party is None) or _COUNT.search(text):
+        return None
+    return (
+        "SELECT nom_circonscription, nom_liste_candidat, parti_politique, score_voix "
+        f"FROM vue_elus_uniquement WHERE {place} ORDER BY nom_circonscription"
+    )
+
+
+def _participation(text, entities, place, party) -> Optional[str]:
+    if not _PARTICIPATION.search(text) or party is not None:
+        return None
+    # Les templates ne renvoient qu'un agrégat ou le classement des régions
+    if _RANKING.search(text) or _PARTICIPATION_RANKING.search(text):
+        return None
+    if entities["region"]:
+        return (
+            "SELECT region_nom, total_inscrits, total_votants, taux_participation_regional "
+            f"FROM vue_stats_regionales WHERE {place}"
+        )
+    if entities["circonscription"]:
+        return (
+            "SELECT nom_circonscription, inscrits, votants, taux_participation "
+            f"FROM circonscriptions WHERE {place}"
+        )
+    if _PER_REGION.search(text):
+        return (
+            "SELECT region_nom, total_inscrits, total_votants, taux_participation_regional "
+            "FROM vue_stats_regionales ORDER BY taux_participation_regional DESC"
+        )
+    return None
+
+
+def _top_scores(text, entities, place, party) -> Optional[str]:
+    n = _top_n(text)
+    # "Top 3 des partis" classe des partis, pas des candidats
+    if n is None or not _SCORES.search(text) or _PARTIES.search(text):
+        return None
+    conditions = ([place] if place else []) + ([sql_filter("parti", party)] if party else [])
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return (
+        "SELECT nom_liste_candidat, parti_politique, nom_circonscription, score_voix, pourcentage_voix "
+        f"FROM vue_resultats_detailles{where} ORDER BY score_voix DESC LIMIT {n}"
+    )
+
+
+# Ordre = priorité : le premier template qui répond l'emporte
+_TEMPLATES = [
+    ("top_scores", _top_scores),
+    ("participation", _participation),
+    ("seats_per_party", _seats_per_party),
+    ("winner_per_constituency", _winner_per_constituency),
+]
+
+
+def _record(name: Optional[str]) -> None:
+    with _STATS_LOCK:
+        _STATS["hits" if name else "misses"] += 1
+        total = _STATS["hits"] + _STATS["misses"]
+        rate = _STATS["hits"] / total
+    status = f"template '{name}'" if name else "aucun template -> LLM"
+    print(f"[SQL Templates] {status} (taux de templates : {rate:.0%} sur {total} questions)")
+
+
+def record_template_outcomes(outcomes: List[Optional[str]]) -> None:
+    """Compte des issues mises en attente (nom du template ou None), une fois leur SQL retenu."""
+    for name in outcomes:
+        _record(name)
+
+
+@contextmanager
+def deferred_template_stats():
+    """
+    Dans ce bloc (et les tâches asyncio qu'il crée), les issues des templates sont mises dans la liste
+    renvoyée au lieu d'être comptées : un SQL spéculatif jeté ne fausse pas le taux de templates.
+    """
+    outcomes: List[Optional[str]] = []
+    token = _DEFERRED_OUTCOMES.set(outcomes)
+    try:
+        yield outcomes
+    finally:
+        _DEFERRED_OUTCOMES.reset(token)
+
+
+def get_template_stats() -> Dict[str, float]:
+    """Compteurs des templates : appels LLM de génération SQL évités = hits."""
+    with _STATS_LOCK:
+        total = _STATS["hits"] + _STATS["misses"]
+        return {
+            "hits": _STATS["hits"],
+            "misses": _STATS["misses"],
+            "hit_rate": _STATS["hits"] / total if total else 0.0,
+        }
+
+
+def reset_template_stats() -> None:
+    with _STATS_LOCK:
+        _STATS["hits"] = 0
+        _STATS["misses"] = 0
+
+
+def _match_template(user_query: str) -> Optional[Tuple[str, str]]:
+    text = ElectionDataCleaner.normalize_search_text(user_query)
+    # is_deferred couvre aussi les négations ("n'ont pas été élus", "sièges perdus")
+    if not text or is_deferred(text) or _UNSUPPORTED.search(text) or _PLACE_QUALIFIER.search(text):
+        return None
+
+    entities = extract_entities(text)
+    if entities is None:
+        return None
+
+    # Un seul lieu et un seul parti au maximum : au-delà, c'est une comparaison
+    if len(entities["region"]) + len(entities["circonscription"]) > 1 or len(entities["parti"]) > 1:
+        return None
+
+    place = _place_filter(entities)
+    party = next(iter(entities["parti"].values()), None)
+
+    for name, template in _TEMPLATES:
+        sql = template(text, entities, place, party)
+        if sql:
+            return name, sql
+    return None
+
+
+def render_sql_template(user_query: str) -> Optional[Tuple[str, str]]:
+    """
+    Génère le SQL des questions fréquentes sans appel LLM.
+    Renvoie (nom du template, requête) ou None si aucun template ne s'applique sans ambiguïté.
+    """
+    match = _match_template(user_query)
+    deferred = _DEFERRED_OUTCOMES.get()
+    if deferred is not None:
+        deferred.append(match[0] if match else None)
+    else:
+        _record(match[0] if match else None)
+    return match
@@ -1,28 +1,24 @@
 # src/agent/nodes/verify_sql.py
+import asyncio
 import sqlite3
-import re
 from typing import Literal
 from langgraph.types import Command
-from pathlib import Path
 from ..state import AgentState
+from src.database.authorizer import ALLOWED_OBJECTS, pop_denial
+from src.database.governor import QueryAborted
+from .execute_sql import fetch_results
 from langsmith import traceable
 
 
-current_dir = Path(__file__).resolve().parent
-project_root = current_dir.parent.parent.parent
-DB_PATH = project_root / "data" / "processed" / "elections.db"
-
-ALLOWED_OBJECTS = [
-    "vue_resultats_detailles", 
-    "vue_elus_uniquement", 
-    "vue_stats_regionales",
-    "circonscriptions", 
-    "candidats"
-]
-
 @traceable(name="sql_verification")
 def verify_sql_node(state: AgentState) -> Command[Literal["execute_sql", "generate_sql", "reponse_hors_sujet"]]:
+    """
+    Valide la requête en l'exécutant sous l'autorisateur SQLite (SELECT uniquement, objets de
+    ALLOWED_OBJECTS) : une seule préparation sur une connexion du pool, les lignes sont transmises
+    à execute_sql. Les refus et erreurs SQLite repartent vers la génération.
+    """
     query = state['sql_query']
+    params = state.get('sql_params') or {}
     
     if not query:
         return Command(
@@ -30,41 +26,26 @@ def verify_sql_node(state: AgentState) -> Command[Literal["execute_sql", "genera
             goto="generate_sql"
         )
 
-    print(f"\n[Verify SQL] Analyse de : {query}")
+    print(f"\n[Verify SQL] Analyse de : {query} {params}")
 
-    # 1. FILTRE DE SÉCURITÉ
-    forbidden_pattern = r"\b(DROP|DELETE|INSERT|UPDATE|ALTER|TRUNCATE|GRANT|REVOKE|PRAGMA|VACUUM)\b"
-    if re.search(forbidden_pattern, query, re.IGNORECASE):
-        msg = "SÉCURITÉ : Tentative de modification de la base interdite (DROP/DELETE...)."
-        print(f"  ✗ {msg}")
-        return _gerer_erreur(state, msg)
-
-    # 2. VÉRIFICATION DES TABLES
-    tables_found = re.findall(r'\b(?:FROM|JOIN)\s+([a-zA-Z0-9_]+)', query, re.IGNORECASE)
-    
-    for table in tables_found:
-        clean_table = table.strip('"').strip("'").strip().lower()
-        
-        if clean_table not in [t.lower() for t in ALLOWED_OBJECTS] and not clean_table.startswith("("):
-            if clean_table.upper() not in ["SELECT", "WHERE", "VALUES", "UNNEST"]:
-                msg = f"HALLUCINATION : La table '{clean_table}' n'existe pas."
-                print(f"   {msg}")
-                return _gerer_erreur(state, msg)
-
-    # 3. VALIDATION SYNTAXIQUE
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"EXPLAIN QUERY PLAN {query}")
-            
-        print("   Syntaxe et Schéma valides.")
-        return Command(goto="execute_sql")
-
+        result = fetch_results(query, params)
+    except QueryAborted as e:
+        # Requête trop coûteuse (échéance ou budget VM) : on redemande une requête plus sélective
+        error_msg = str(e)
+        print(f"   {error_msg}")
+        return _gerer_erreur(state, error_msg)
     except sqlite3.Error as e:
-        error_msg = f"ERREUR SYNTAXE SQLITE : {str(e)}"
+        error_msg = pop_denial() or f"ERREUR SYNTAXE SQLITE : {str(e)}"
         print(f"   {error_msg}")
         return _gerer_erreur(state, error_msg)
 
+    print("   Syntaxe, schéma et autorisations valides.")
+    return Command(
+        update=result.state_update(),
+        goto="execute_sql"
+    )
+
 
 def _gerer_erreur(state: AgentState, new_error: str) -> Command[Literal["generate_sql", "reponse_hors_sujet"]]:
     """
@@ -88,7 +69,13 @@ def _gerer_erreur(state: AgentState, new_error: str) -> Command[Literal["generat
     return Command(
         update={
             "errors": [new_error],  
-            "sql_query": None
+            "sql_query": None,
+            "sql_params": None
         },
         goto="generate_sql"
     )
+
+
+async def averify_sql_node(state: AgentState) -> Command[Literal["execute_sql", "generate_sql", "reponse_hors_sujet"]]:
+    """Version asynchrone : la validation SQLite tourne dans un thread."""
+    return await asyncio.to_thread(verify_sql_node, state)
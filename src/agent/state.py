@@ -6,6 +6,8 @@ import operator
 # On garde celui-là en BaseModel car c'est une sortie de LLM
 from pydantic import BaseModel, Field
 
+from src.database.result_set import ResultSet
+
 class UserQueryClassification(BaseModel):
     request_validity: Literal["allowed", "out_of_scope", "policy_violation","ambiguous"]
     query_nature: Literal["simple_retrieval", "ranking", "aggregation", "comparison"]
@@ -13,12 +15,25 @@ class UserQueryClassification(BaseModel):
     chart_type: Optional[Literal["bar", "histogram", "pie", "line", "map"]] = None
     reasoning_summary: str=""
 
+class ClassificationWithSQL(UserQueryClassification):
+    """Sortie du mode combiné : la classification et le SQL en un seul appel LLM."""
+    sql_query: Optional[str] = Field(
+        default=None,
+        description="Requête SQLite brute si request_validity vaut 'allowed', sinon null."
+    )
+
 # ON CHANGE AgentState EN TypedDict
 class AgentState(TypedDict):
     user_query: str
     classification: Optional[UserQueryClassification]
     sql_query: Optional[str]
-    sql_results: Optional[List[Dict]]
+    # Valeurs des paramètres nommés de sql_query (:colonne) ; la forme seule sert de requête préparée
+    sql_params: Optional[Dict]
+    sql_results: Optional[ResultSet]  # colonnes (noms/types une fois) ; .to_pandas(), .to_json()
+    # Résultat borné (MAX_RESULT_ROWS) : total compté sans matérialiser les lignes au-delà
+    sql_truncated: bool
+    sql_total_rows: Optional[int]
+    sql_total_exact: bool
     chart_generated: bool
     similar_examples_context: str
     chart_data: Optional[Dict]
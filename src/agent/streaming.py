@@ -0,0 +1,65 @@
+# src/agent/streaming.py
+from typing import Dict, Any, Iterator, AsyncIterator
+
+# Nœuds dont les tokens LLM sont relayés à l'interface (les autres produisent du SQL / JSON)
+STREAMED_NODES = {"generate_final_answer", "generate_clarification"}
+
+
+def merge_update(state: Dict[str, Any], update: Dict[str, Any]) -> None:
+    """Applique la mise à jour d'un nœud à l'état cumulé (errors est additif, comme dans AgentState)."""
+    for key, value in update.items():
+        if key == "errors":
+            state["errors"] = list(state.get("errors") or []) + list(value or [])
+        else:
+            state[key] = value
+
+
+def _node_events(chunk: Dict[str, Any], final_state: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    for node, update in chunk.items():
+        update = update or {}
+        merge_update(final_state, update)
+        yield {"type": "node", "node": node, "update": update}
+
+
+def _token_event(chunk) -> Dict[str, Any]:
+    message, metadata = chunk
+    content = getattr(message, "content", None)
+    if metadata.get("langgraph_node") in STREAMED_NODES and isinstance(content, str) and content:
+        return {"type": "token", "node": metadata["langgraph_node"], "text": content}
+    return None
+
+
+def stream_agent_events(agent, initial_state: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Exécute l'agent en streaming et produit des événements simples pour l'UI :
+    - {"type": "node", "node": ..., "update": {...}} dès qu'un nœud termine
+    - {"type": "token", "node": ..., "text": ...} pour chaque token de la réponse finale
+    - {"type": "done", "state": {...}} avec l'état final cumulé
+    """
+    final_state = dict(initial_state)
+
+    for mode, chunk in agent.stream(initial_state, stream_mode=["updates", "messages"]):
+        if mode == "updates":
+            yield from _node_events(chunk, final_state)
+        elif mode == "messages":
+            event = _token_event(chunk)
+            if event:
+                yield event
+
+    yield {"type": "done", "state": final_state}
+
+
+async def astream_agent_events(agent, initial_state: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Version asynchrone de stream_agent_events (graphe construit avec async_mode=True)."""
+    final_state = dict(initial_state)
+
+    async for mode, chunk in agent.astream(initial_state, stream_mode=["updates", "messages"]):
+        if mode == "updates":
+            for event in _node_events(chunk, final_state):
+                yield event
+        elif mode == "messages":
+            event = _token_event(chunk)
+            if event:
+                yield event
+
+    yield {"type": "done", "state": final_state}
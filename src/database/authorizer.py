@@ -0,0 +1,127 @@
+# db/authorizer.py
+
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import FrozenSet, Optional
+
+from .schema import FTS_COLUMNS, MATERIALIZED_ROLLUPS
+
+# Objets que le SQL généré peut lire (tables de base, vue de jointure, agrégats matérialisés)
+ALLOWED_OBJECTS = frozenset(
+    ["circonscriptions", "candidats", "vue_resultats_detailles", *MATERIALIZED_ROLLUPS]
+)
+
+# Index FTS5 (et leurs tables internes "<fts>_idx", "<fts>_config"...) utilisés par la réécriture des LIKE
+_FTS_TABLES = frozenset(table for table, _ in FTS_COLUMNS.values())
+
+# Catalogue : lu (et "déclaré") par FTS5 à la première ouverture d'une table virtuelle sur la connexion
+_CATALOG = frozenset(["sqlite_master", "sqlite_schema"])
+
+_ALWAYS_ALLOWED = frozenset([sqlite3.SQLITE_SELECT, sqlite3.SQLITE_RECURSIVE])
+
+_FORBIDDEN_FUNCTIONS = frozenset(["load_extension"])
+
+# Codes d'action de l'autorisateur (les autres constantes SQLITE_* - limites, codes d'erreur - ont les mêmes valeurs)
+_ACTIONS = (
+    "CREATE_INDEX", "CREATE_TABLE", "CREATE_TEMP_INDEX", "CREATE_TEMP_TABLE", "CREATE_TEMP_TRIGGER",
+    "CREATE_TEMP_VIEW", "CREATE_TRIGGER", "CREATE_VIEW", "DELETE", "DROP_INDEX", "DROP_TABLE",
+    "DROP_TEMP_INDEX", "DROP_TEMP_TABLE", "DROP_TEMP_TRIGGER", "DROP_TEMP_VIEW", "DROP_TRIGGER",
+    "DROP_VIEW", "INSERT", "PRAGMA", "READ", "SELECT", "TRANSACTION", "UPDATE", "ATTACH", "DETACH",
+    "ALTER_TABLE", "REINDEX", "ANALYZE", "CREATE_VTABLE", "DROP_VTABLE", "FUNCTION", "SAVEPOINT",
+    "RECURSIVE",
+)
+_ACTION_NAMES = {getattr(sqlite3, f"SQLITE_{name}"): name for name in _ACTIONS if hasattr(sqlite3, f"SQLITE_{name}")}
+
+# Raison du dernier refus, par thread (l'autorisateur est appelé dans le thread qui prépare la requête)
+_LAST_DENIAL = threading.local()
+
+# Noms des CTE de la requête en cours de préparation, par thread (cf. declared_ctes)
+_QUERY_CTES = threading.local()
+
+_LITERAL_OR_COMMENT = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+_WITH = re.compile(r"\bWITH\s+(?:RECURSIVE\s+)?", re.IGNORECASE)
+_CTE_HEAD = re.compile(
+    r'\s*("[^"]+"|\[[^\]]+\]|`[^`]+`|\w+)\s*(?:\([^()]*\))?\s*AS\s+(?:NOT\s+)?(?:MATERIALIZED\s+)?\(',
+    re.IGNORECASE,
+)
+
+
+def cte_names(query: str) -> FrozenSet[str]:
+    """Noms (en minuscules) des CTE déclarés dans les clauses WITH de la requête, sous-requêtes comprises."""
+    text = _LITERAL_OR_COMMENT.sub(lambda m: " " * len(m.group()), query)
+    names = set()
+    for with_match in _WITH.finditer(text):
+        pos = with_match.end()
+        while True:
+            head = _CTE_HEAD.match(text, pos)
+            if head is None:
+                break
+            names.add(head.group(1).strip('"[]`').lower())
+            # Saut du corps du CTE (parenthèses équilibrées), puis CTE suivant après une virgule
+            depth, pos = 1, head.end()
+            while pos < len(text) and depth:
+                depth += {"(": 1, ")": -1}.get(text[pos], 0)
+                pos += 1
+            comma = re.match(r"\s*,", text[pos:])
+            if comma is None:
+                break
+            pos += comma.end()
+    return frozenset(names)
+
+
+@contextmanager
+def declared_ctes(query: str):
+    """Déclare à l'autorisateur les CTE de la requête préparée dans ce bloc (lecture d'un CTE récursif par lui-même)."""
+    _QUERY_CTES.names = cte_names(query)
+    try:
+        yield
+    finally:
+        _QUERY_CTES.names = frozenset()
+
+
+def _readable(table: Optional[str], column: Optional[str], db_name: Optional[str]) -> bool:
+    if table is None:
+        return False
+    table = table.lower()
+    # Lecture d'un CTE (récursif) déclaré par la requête : SQLite ne la rattache à aucune base ni colonne
+    if db_name is None and column == "" and table in getattr(_QUERY_CTES, "names", frozenset()):
+        return True
+    if table in ALLOWED_OBJECTS or table in _CATALOG:
+        return True
+    return any(table == fts or table.startswith(f"{fts}_") for fts in _FTS_TABLES)
+
+
+def select_only_authorizer(action: int, arg1: Optional[str], arg2: Optional[str],
+                           db_name: Optional[str], source: Optional[str]) -> int:
+    """
+    Autorisateur SQLite (appelé à la préparation de chaque requête) : SELECT uniquement,
+    sur les objets autorisés. Toute autre opération fait échouer la préparation.
+    """
+    if action in _ALWAYS_ALLOWED:
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_READ and _readable(arg1, arg2, db_name):
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_FUNCTION and (arg2 or "").lower() not in _FORBIDDEN_FUNCTIONS:
+        return sqlite3.SQLITE_OK
+    # Internes FTS5 : lecture de data_version et déclaration de la table virtuelle (connexion en lecture seule)
+    if action == sqlite3.SQLITE_PRAGMA and arg1 == "data_version" and arg2 is None:
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_UPDATE and (arg1 or "").lower() in _CATALOG:
+        return sqlite3.SQLITE_OK
+
+    if action == sqlite3.SQLITE_READ:
+        _LAST_DENIAL.reason = f"HALLUCINATION : La table '{arg1}' n'est pas autorisée."
+    else:
+        target = arg2 if action == sqlite3.SQLITE_FUNCTION else arg1
+        name = _ACTION_NAMES.get(action, str(action))
+        _LAST_DENIAL.reason = f"SÉCURITÉ : Opération interdite ({name}{f' {target}' if target else ''}), SELECT uniquement."
+    return sqlite3.SQLITE_DENY
+
+
+def pop_denial() -> Optional[str]:
+    """Raison du dernier refus de l'autorisateur dans ce thread (puis oubliée)."""
+    reason = getattr(_LAST_DENIAL, "reason", None)
+    _LAST_DENIAL.reason = None
+    return reason
@@ -1,7 +1,11 @@
 # db/connection.py
 
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
 
 class DatabaseConnection:
     """
@@ -9,14 +13,20 @@ class DatabaseConnection:
     Gère uniquement l'ouverture de la connexion (avec sécurité Read-Only si demandé).
     """
 
-    def __init__(self, db_path: str = "elections.db", read_only: bool = True):
+    def __init__(self, db_path: str = "elections.db", read_only: bool = True, pooled: bool = False,
+                 authorizer: Optional[Callable] = None):
         """
         Args:
             db_path: Chemin vers le fichier .db
             read_only: Si True, la connexion sera verrouillée en lecture seule.
+            pooled: Si True, borrow() emprunte une connexion chaude au pool partagé
+                (lecture seule uniquement).
+            authorizer: Autorisateur SQLite installé sur la connexion (validation à la préparation).
         """
         self.db_path = Path(db_path).resolve()
         self.read_only = read_only
+        self.pooled = pooled and read_only
+        self.authorizer = authorizer
 
         if not self.db_path.exists():
             print(f" Attention : Le fichier base de données '{self.db_path.name}' n'existe pas encore.")
@@ -35,5 +45,151 @@ class DatabaseConnection:
         
         # Configuration pour récupérer les résultats comme des dictionnaires (accès par nom de colonne)
         conn.row_factory = sqlite3.Row
+        if self.authorizer is not None:
+            conn.set_authorizer(self.authorizer)
         
-        return conn
\ No newline at end of file
+        return conn
+
+    @contextmanager
+    def borrow(self) -> Iterator[sqlite3.Connection]:
+        """
+        Fournit une connexion le temps d'un bloc 'with'.
+        En mode pool, la connexion est rendue au pool au lieu d'être fermée.
+        """
+        if self.pooled:
+            with get_shared_pool(str(self.db_path), self.authorizer).connection() as conn:
+                yield conn
+            return
+
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def file_signature(self) -> tuple:
+        """
+        Signature du fichier .db (inode, taille, date de modification).
+        Change à chaque ré-ingestion : sert à invalider les caches.
+        """
+        try:
+            stat = self.db_path.stat()
+        except FileNotFoundError:
+            return (None, None, None)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class ConnectionPool:
+    """
+    Pool de connexions SQLite en lecture seule ('mode=ro&immutable=1').
+
+    Les connexions restent ouvertes entre les requêtes (schéma déjà parsé,
+    cache de pages et de requêtes préparées chaud). Chaque connexion n'est
+    utilisée que par un seul thread à la fois ; le pool est rouvert
+    automatiquement si le fichier .db change (ré-ingestion).
+
+    L'autorisateur éventuel est installé une fois pour toutes à l'ouverture :
+    le changer expirerait les requêtes préparées en cache.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_size: int = 8,
+        cached_statements: int = 256,
+        cache_size_kib: int = 16 * 1024,
+        mmap_size: int = 256 * 1024 * 1024,
+        authorizer: Optional[Callable] = None,
+    ):
+        self.db = DatabaseConnection(db_path, read_only=True)
+        self.max_size = max_size
+        self.cached_statements = cached_statements
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self.authorizer = authorizer
+
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._signature = self.db.file_signature()
+
+    def _open(self) -> sqlite3.Connection:
+        uri = f"{self.db.db_path.as_uri()}?mode=ro&immutable=1"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA query_only = 1")
+        if self.authorizer is not None:
+            conn.set_authorizer(self.authorizer)
+        return conn
+
+    def _refresh_signature(self) -> tuple:
+        """Vide le pool si le fichier a changé depuis l'ouverture des connexions."""
+        signature = self.db.file_signature()
+        with self._lock:
+            if signature != self._signature:
+                print("[Connection Pool] Base modifiée -> connexions réouvertes.")
+                self._drain()
+                self._signature = signature
+            return self._signature
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                _, conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Emprunte une connexion (bloque si max_size connexions sont déjà prêtées)."""
+        signature = self._refresh_signature()
+        self._slots.acquire()
+        conn = None
+        try:
+            try:
+                conn_signature, conn = self._idle.get_nowait()
+                if conn_signature != signature:
+                    conn.close()
+                    conn = None
+            except queue.Empty:
+                pass
+
+            if conn is None:
+                conn = self._open()
+
+            yield conn
+        finally:
+            if conn is not None:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put((signature, conn))
+            self._slots.release()
+
+    def close_all(self) -> None:
+        with self._lock:
+            self._drain()
+
+
+_POOLS: Dict[Tuple[str, Optional[Callable]], ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_shared_pool(db_path: str, authorizer: Optional[Callable] = None) -> ConnectionPool:
+    """Pool unique par fichier .db (et par autorisateur) pour tout le processus."""
+    path = str(Path(db_path).resolve())
+    key = (path, authorizer)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ConnectionPool(path, authorizer=authorizer)
+            _POOLS[key] = pool
+        return pool
@@ -0,0 +1,126 @@
+# db/governor.py
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+# Limites par requête (surchargeables par variables d'environnement)
+DEADLINE_S = float(os.getenv("SQL_DEADLINE_S", "3"))
+MAX_VM_STEPS = int(os.getenv("SQL_MAX_VM_STEPS", "50000000"))  # ~0,5 s de VM SQLite sur cette machine
+CHECK_EVERY = 10_000  # instructions VM entre deux appels du progress handler
+
+
+class QueryBudget:
+    """Compteurs d'une requête gouvernée : instructions VM consommées, échéance, cause d'arrêt."""
+
+    def __init__(self, deadline_s: float, max_vm_steps: int):
+        self.deadline_s = deadline_s
+        self.max_vm_steps = max_vm_steps
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline_s
+        self.vm_steps = 0
+        self.tripped: Optional[str] = None  # "deadline" | "vm_steps"
+
+    def _tick(self) -> int:
+        """Progress handler SQLite : une valeur non nulle interrompt la requête."""
+        self.vm_steps += CHECK_EVERY
+        if self.vm_steps > self.max_vm_steps:
+            self.tripped = "vm_steps"
+            return 1
+        if time.monotonic() > self.deadline:
+            self.tripped = "deadline"
+            return 1
+        return 0
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.monotonic() - self.started
+
+
+class QueryAborted(sqlite3.OperationalError):
+    """Requête interrompue par le gouverneur (message destiné au retry de la génération SQL)."""
+
+    def __init__(self, budget: QueryBudget):
+        self.reason = budget.tripped
+        self.elapsed_s = budget.elapsed_s
+        self.vm_steps = budget.vm_steps
+        if self.reason == "vm_steps":
+            detail = f"plus de {budget.max_vm_steps:,} instructions".replace(",", " ")
+        else:
+            detail = f"plus de {budget.deadline_s:g} s"
+        super().__init__(
+            f"REQUÊTE INTERROMPUE : {detail} (jointure sans condition ou CTE récursive ?). "
+            "Ajoute des conditions de jointure, des filtres ou un LIMIT."
+        )
+
+
+class _Watchdog:
+    """
+    Thread unique qui appelle Connection.interrupt() à l'échéance.
+    Filet de sécurité quand le progress handler n'est pas appelé assez souvent
+    (une seule instruction VM longue : tri, fonction coûteuse...).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._watched: Dict[int, Tuple[float, sqlite3.Connection, QueryBudget]] = {}
+        self._tokens = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, conn: sqlite3.Connection, budget: QueryBudget) -> int:
+        with self._cond:
+            token = next(self._tokens)
+            self._watched[token] = (budget.deadline, conn, budget)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sql_watchdog", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return token
+
+    def unwatch(self, token: int) -> None:
+        # Sous le verrou : aucune interruption ne peut partir après la fin de la requête
+        with self._cond:
+            self._watched.pop(token, None)
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for token, (deadline, conn, budget) in list(self._watched.items()):
+                    if deadline <= now:
+                        budget.tripped = budget.tripped or "deadline"
+                        conn.interrupt()
+                        del self._watched[token]
+                timeout = min((d for d, _, _ in self._watched.values()), default=None)
+                self._cond.wait(None if timeout is None else max(timeout - now, 0.001))
+
+
+_WATCHDOG = _Watchdog()
+
+
+@contextmanager
+def governed(conn: sqlite3.Connection, deadline_s: float = None, max_vm_steps: int = None) -> Iterator[QueryBudget]:
+    """
+    Exécute le bloc sous une échéance et un budget d'instructions VM.
+    Les curseurs ouverts dans le bloc doivent y être fermés (l'interruption vise la connexion).
+    Lève QueryAborted si une limite est atteinte.
+    """
+    budget = QueryBudget(
+        DEADLINE_S if deadline_s is None else deadline_s,
+        MAX_VM_STEPS if max_vm_steps is None else max_vm_steps,
+    )
+    conn.set_progress_handler(budget._tick, CHECK_EVERY)
+    token = _WATCHDOG.watch(conn, budget)
+    try:
+        yield budget
+    except sqlite3.OperationalError as e:
+        if budget.tripped and not isinstance(e, QueryAborted):
+            raise QueryAborted(budget) from e
+        raise
+    finally:
+        _WATCHDOG.unwatch(token)
+        conn.set_progress_handler(None, CHECK_EVERY)
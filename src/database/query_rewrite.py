@@ -0,0 +1,106 @@
+# db/query_rewrite.py
+
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .schema import FTS_COLUMNS
+
+# <colonne> LIKE '<motif>' (ou :paramètre) ; la colonne peut être qualifiée (ci.region_nom_norm)
+_LIKE_PREDICATE = re.compile(
+    r"(?P<not>\bNOT\s+)?"
+    r"(?P<column>\b(?:[A-Za-z_][A-Za-z0-9_]*\.)?(?P<name>[A-Za-z_][A-Za-z0-9_]*))"
+    r"\s+LIKE\s+"
+    r"(?P<pattern>'(?:[^']|'')*'|:(?P<param>[A-Za-z_][A-Za-z0-9_]*))"
+    r"(?P<escape>\s+ESCAPE\b)?",
+    re.IGNORECASE,
+)
+
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+
+# Ligne d'EXPLAIN QUERY PLAN qui parcourt toute la table : "SCAN c", ou "SCAN c USING [COVERING] INDEX ix"
+# (parcours complet de l'index, sans contrainte : seul "SEARCH ..." en pose une). Les tables FTS
+# ("SCAN f VIRTUAL TABLE INDEX ...") ne sont pas concernées.
+_FULL_SCAN = re.compile(r"^SCAN (?P<table>\w+)(?: USING (?:COVERING )?INDEX \w+)?$")
+
+# Tables FTS présentes, par signature de fichier (la base est en lecture seule)
+_AVAILABLE: Dict[Tuple, Set[str]] = {}
+_AVAILABLE_LOCK = threading.Lock()
+
+
+def available_fts_tables(conn: sqlite3.Connection, signature: Optional[Tuple] = None) -> Set[str]:
+    """Tables FTS5 présentes dans la base (mis en cache par signature du fichier)."""
+    if signature is not None:
+        with _AVAILABLE_LOCK:
+            if signature in _AVAILABLE:
+                return _AVAILABLE[signature]
+
+    wanted = {table for table, _ in FTS_COLUMNS.values()}
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    tables = {row[0] for row in rows} & wanted
+
+    if signature is not None:
+        with _AVAILABLE_LOCK:
+            _AVAILABLE.clear()
+            _AVAILABLE[signature] = tables
+    return tables
+
+
+def _inside_literal(query: str, position: int) -> bool:
+    return any(m.start() < position < m.end() for m in _LITERAL_PATTERN.finditer(query))
+
+
+def rewrite_like_to_fts(query: str, fts_tables: Set[str], params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Remplace `col_norm LIKE '%terme%'` par une recherche dans l'index FTS5 (trigrammes) :
+
+        col_norm IN (SELECT col_norm FROM fts_table WHERE col_norm LIKE '%terme%')
+
+    Le LIKE interne est servi par l'index trigramme (même sémantique que le LIKE d'origine),
+    et le IN externe peut utiliser l'index B-tree de la colonne au lieu d'un parcours complet.
+    Les prédicats NOT LIKE / ESCAPE et les motifs sans joker initial sont laissés tels quels.
+    Un motif paramétré (:nom) est jugé sur sa valeur dans params ; le paramètre est réutilisé tel quel.
+    """
+    if not fts_tables:
+        return query
+
+    def _replace(match: re.Match) -> str:
+        name = match.group("name").lower()
+        pattern = match.group("pattern")
+        if match.group("not") or match.group("escape") or name not in FTS_COLUMNS:
+            return match.group(0)
+        if match.group("param"):
+            value = (params or {}).get(match.group("param"))
+            if not isinstance(value, str) or not value.startswith("%"):
+                return match.group(0)
+        elif not pattern.startswith("'%"):
+            return match.group(0)
+        if _inside_literal(query, match.start()):
+            return match.group(0)
+
+        fts_table, _ = FTS_COLUMNS[name]
+        if fts_table not in fts_tables:
+            return match.group(0)
+
+        return (
+            f"{match.group('column')} IN "
+            f"(SELECT {name} FROM {fts_table} WHERE {name} LIKE {pattern})"
+        )
+
+    return _LIKE_PREDICATE.sub(_replace, query)
+
+
+def full_table_scans(conn: sqlite3.Connection, query: str, allowed: Iterable[str] = ()) -> List[str]:
+    """
+    Tables (ou alias de vue) parcourues entièrement d'après EXPLAIN QUERY PLAN.
+    `allowed` : tables dont le parcours est acceptable (petits agrégats, une ligne par région/parti).
+    """
+    allowed = set(allowed)
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+    scans = []
+    for row in plan:
+        match = _FULL_SCAN.match(row[-1])
+        if match and match.group("table") not in allowed:
+            scans.append(match.group("table"))
+    return scans
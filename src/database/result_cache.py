@@ -0,0 +1,148 @@
+# db/result_cache.py
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Tuple, Any
+
+from .result_set import ResultSet
+
+# Littéraux texte ('...') et identifiants entre guillemets ("...") : jamais modifiés
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_PLACEHOLDER = "\x00{}\x00"
+
+# Fin d'une clause WHERE au niveau 0
+_WHERE_END = re.compile(r" (group by|order by|having|limit|window|union|intersect|except) ")
+
+
+def canonicalize_sql(query: str) -> str:
+    """
+    Forme canonique d'une requête SELECT pour le cache de résultats.
+
+    - mots-clés et identifiants en minuscules (insensibles à la casse en SQLite)
+    - espaces normalisés, points-virgules finaux supprimés
+    - motifs LIKE ASCII en minuscules (LIKE est insensible à la casse ASCII)
+    - conditions d'un WHERE purement conjonctif (AND) triées
+    """
+    literals: List[str] = []
+
+    def _stash(match):
+        literals.append(match.group(0))
+        return _PLACEHOLDER.format(len(literals) - 1)
+
+    text = _LITERAL_PATTERN.sub(_stash, query.strip())
+    text = text.rstrip().rstrip(";").strip()
+    text = " ".join(text.lower().split())
+    text = re.sub(r"\s*([(),=<>!+*/-])\s*", r"\1", text)
+
+    # Motifs LIKE : la casse ASCII n'a pas d'importance
+    for match in re.finditer(r"\blike \x00(\d+)\x00", text):
+        idx = int(match.group(1))
+        if literals[idx].isascii():
+            literals[idx] = literals[idx].lower()
+
+    text = _sort_where_conjuncts(text)
+
+    for idx, literal in enumerate(literals):
+        text = text.replace(_PLACEHOLDER.format(idx), literal)
+    return text
+
+
+def _sort_where_conjuncts(text: str) -> str:
+    """Trie les prédicats d'un WHERE simple : 'a AND b' et 'b AND a' sont équivalents."""
+    start = text.find(" where ")
+    if start == -1 or text.count(" where ") > 1:
+        return text
+
+    body_start = start + len(" where ")
+    end_match = _WHERE_END.search(text, body_start)
+    body_end = end_match.start() if end_match else len(text)
+    body = text[body_start:body_end]
+
+    # Uniquement des AND au niveau 0, sans parenthèses ni BETWEEN
+    if any(token in body for token in ("(", ")", " or ", " between ", " case ")):
+        return text
+
+    conjuncts = sorted(part.strip() for part in body.split(" and "))
+    return text[:body_start] + " and ".join(conjuncts) + text[body_end:]
+
+
+def cache_key(query: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Clé de cache : forme canonique de la requête + valeurs des paramètres (triées par nom)."""
+    key = canonicalize_sql(query)
+    if params:
+        key += "\x00" + json.dumps(params, sort_keys=True, default=str)
+    return key
+
+
+class QueryResultCache:
+    """
+    Cache LRU en mémoire des résultats SQL, borné en nombre d'entrées et en octets.
+    Invalidé automatiquement quand la signature du fichier .db change.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[ResultSet, int, Dict]]" = OrderedDict()
+        self._total_bytes = 0
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def _check_signature(self, signature: Tuple) -> None:
+        if signature != self._signature:
+            if self._entries:
+                print("[Result Cache] Base modifiée -> cache vidé.")
+            self._entries.clear()
+            self._total_bytes = 0
+            self._signature = signature
+
+    def get(self, query: str, signature: Tuple, params: Optional[Dict[str, Any]] = None) -> Optional[ResultSet]:
+        entry = self.get_entry(query, signature, params)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, query: str, signature: Tuple,
+                  params: Optional[Dict[str, Any]] = None) -> Optional[Tuple[ResultSet, Dict[str, Any]]]:
+        """Lignes et métadonnées (troncature, total) stockées avec le résultat."""
+        key = cache_key(query, params)
+        with self._lock:
+            self._check_signature(signature)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            # Pas de copie : les colonnes d'un ResultSet sont en lecture seule
+            return entry[0], dict(entry[2])
+
+    def set(self, query: str, signature: Tuple, results: ResultSet,
+            meta: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None) -> None:
+        key = cache_key(query, params)
+        results = ResultSet.from_json(results)
+        size = results.nbytes
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._check_signature(signature)
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (results, size, dict(meta or {}))
+            self._total_bytes += size
+
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
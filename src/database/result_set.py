@@ -0,0 +1,170 @@
+# db/result_set.py
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Classe de stockage SQLite -> dtype NumPy d'une colonne homogène (sans NULL)
+_NUMERIC_DTYPES = {"integer": np.int64, "real": np.float64}
+
+
+class ResultSet:
+    """
+    Résultat SQL en colonnes : noms, types (classes de stockage SQLite) et un tableau NumPy par colonne.
+
+    Les noms ne sont stockés qu'une fois (pas un dict par ligne). Les colonnes numériques sans NULL
+    sont des tableaux int64/float64, partagés tels quels avec pandas (to_pandas) ; les autres sont
+    des tableaux d'objets Python. Les tableaux sont en lecture seule : le même ResultSet peut être
+    partagé par le cache, l'état du graphe et l'historique de l'UI sans copie défensive.
+    """
+
+    __slots__ = ("columns", "types", "_data")
+
+    def __init__(self, columns: Sequence[str], data: Sequence[np.ndarray], types: Optional[Sequence[str]] = None):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self._data: Tuple[np.ndarray, ...] = tuple(data)
+        for array in self._data:
+            array.flags.writeable = False
+        self.types: Tuple[str, ...] = tuple(types) if types is not None else tuple(_storage_class(a) for a in self._data)
+
+    # --- CONSTRUCTION ---
+    @classmethod
+    def from_rows(cls, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> "ResultSet":
+        """Depuis des tuples (curseur SQLite) : une seule transposition, aucun dict intermédiaire."""
+        if not rows:
+            return cls(columns, [np.empty(0, dtype=object) for _ in columns], ["null"] * len(columns))
+        types, data = [], []
+        for values in zip(*rows):
+            kind = _infer_type(values)
+            types.append(kind)
+            data.append(_to_array(values, kind))
+        return cls(columns, data, types)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "ResultSet":
+        """Depuis une liste de dicts (ancien format, entrées de cache existantes)."""
+        if not records:
+            return cls.empty()
+        columns = list(records[0].keys())
+        return cls.from_rows(columns, [tuple(record.get(c) for c in columns) for record in records])
+
+    @classmethod
+    def empty(cls) -> "ResultSet":
+        return cls((), ())
+
+    @classmethod
+    def from_json(cls, payload: Any) -> Optional["ResultSet"]:
+        """Inverse de to_json ; accepte aussi une liste de dicts et None."""
+        if payload is None or isinstance(payload, ResultSet):
+            return payload
+        if isinstance(payload, list):
+            return cls.from_records(payload)
+        columns, types = payload["columns"], payload["types"]
+        return cls(columns, [_to_array(values, kind) for values, kind in zip(payload["data"], types)], types)
+
+    # --- ACCÈS ---
+    def __len__(self) -> int:
+        return len(self._data[0]) if self._data else 0
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ResultSet):
+            return NotImplemented
+        return self.columns == other.columns and self.to_json()["data"] == other.to_json()["data"]
+
+    def __repr__(self) -> str:
+        return f"ResultSet({len(self)} lignes, colonnes={list(self.columns)})"
+
+    def column(self, name: str) -> np.ndarray:
+        """Tableau (lecture seule) d'une colonne."""
+        return self._data[self.columns.index(name)]
+
+    def values(self, name: str) -> List[Any]:
+        """Valeurs Python d'une colonne (int/float natifs, pas de scalaires NumPy)."""
+        return self.column(name).tolist()
+
+    def iter_rows(self, limit: Optional[int] = None) -> Iterator[Tuple[Any, ...]]:
+        """Lignes sous forme de tuples Python, dans l'ordre de self.columns."""
+        stop = len(self) if limit is None else min(limit, len(self))
+        return zip(*(array[:stop].tolist() for array in self._data))
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Une ligne en dict (affichage, journaux)."""
+        return {name: array[index].item() if isinstance(array[index], np.generic) else array[index]
+                for name, array in zip(self.columns, self._data)}
+
+    def records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Lignes en dicts, pour les appelants qui en ont besoin."""
+        return [dict(zip(self.columns, row)) for row in self.iter_rows(limit)]
+
+    def head(self, n: int) -> "ResultSet":
+        """Les n premières lignes (vues sur les mêmes tableaux)."""
+        return ResultSet(self.columns, [array[:n] for array in self._data], self.types)
+
+    # --- CONVERSIONS ---
+    def to_pandas(self):
+        """DataFrame partageant les colonnes numériques (pas de copie)."""
+        import pandas as pd
+
+        return pd.DataFrame(dict(zip(self.columns, self._data)), columns=list(self.columns), copy=False)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Forme JSON compacte : noms et types une fois, puis une liste de valeurs par colonne."""
+        return {
+            "columns": list(self.columns),
+            "types": list(self.types),
+            "data": [array.tolist() for array in self._data],
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Taille approximative en mémoire (tableaux + chaînes référencées)."""
+        size = 0
+        for array in self._data:
+            size += array.nbytes
+            if array.dtype == object:
+                size += sum(len(v) if isinstance(v, (str, bytes)) else 8 for v in array if v is not None)
+        return size
+
+
+def _infer_type(values: Iterable[Any]) -> str:
+    """Classe de stockage commune d'une colonne : integer, real, text, blob, null ou mixed (NULL compris)."""
+    kinds = set()
+    for value in values:
+        if value is None:
+            kinds.add("null")
+        elif isinstance(value, int):
+            kinds.add("integer")
+        elif isinstance(value, float):
+            kinds.add("real")
+        elif isinstance(value, str):
+            kinds.add("text")
+        else:
+            kinds.add("blob")
+    if kinds == {"integer", "real"}:
+        return "real"
+    if len(kinds) == 1:
+        return kinds.pop()
+    return "mixed"
+
+
+def _to_array(values: Sequence[Any], kind: str) -> np.ndarray:
+    dtype = _NUMERIC_DTYPES.get(kind)
+    if dtype is not None:
+        try:
+            return np.asarray(values, dtype=dtype)
+        except OverflowError:
+            pass  # entier hors int64 : gardé en objet Python
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
+
+
+def _storage_class(array: np.ndarray) -> str:
+    if array.dtype == np.int64:
+        return "integer"
+    if array.dtype == np.float64:
+        return "real"
+    return _infer_type(array.tolist())
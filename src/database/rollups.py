@@ -0,0 +1,49 @@
+# db/rollups.py
+
+import sqlite3
+from typing import List
+
+from .schema import MATERIALIZED_ROLLUPS
+
+
+def materialize_rollups(conn: sqlite3.Connection) -> None:
+    """
+    (Re)crée les agrégats matérialisés et leurs index.
+    À appeler après le chargement des tables de base (remplace les anciennes vues du même nom).
+    """
+    cursor = conn.cursor()
+    for name, rollup in MATERIALIZED_ROLLUPS.items():
+        existing = cursor.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+        if existing:
+            cursor.execute(f"DROP {existing[0].upper()} {name}")
+        cursor.execute(f"CREATE TABLE {name} AS {rollup['select']}")
+        for columns in rollup["indexes"]:
+            index_name = f"ix_{name}_{'_'.join(columns)}"
+            cursor.execute(f"CREATE INDEX {index_name} ON {name} ({', '.join(columns)})")
+
+        count = cursor.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+        print(f"   ✓ {name} : {count} lignes")
+
+
+def check_rollups(conn: sqlite3.Connection) -> List[str]:
+    """
+    Compare chaque table matérialisée au recalcul depuis les tables de base.
+    Renvoie la liste des écarts (vide si tout est cohérent).
+    """
+    problems = []
+    for name, rollup in MATERIALIZED_ROLLUPS.items():
+        select = rollup["select"]
+        try:
+            count_table = conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            count_source = conn.execute(f"SELECT COUNT(*) FROM ({select})").fetchone()[0]
+            missing = conn.execute(f"SELECT COUNT(*) FROM ({select} EXCEPT SELECT * FROM {name})").fetchone()[0]
+            extra = conn.execute(f"SELECT COUNT(*) FROM (SELECT * FROM {name} EXCEPT {select})").fetchone()[0]
+        except sqlite3.Error as e:
+            problems.append(f"{name} : {e}")
+            continue
+
+        if count_table != count_source:
+            problems.append(f"{name} : {count_table} lignes au lieu de {count_source}")
+        if missing or extra:
+            problems.append(f"{name} : {missing} lignes manquantes, {extra} lignes en trop")
+    return problems
@@ -1,49 +1,83 @@
 # db/schema.py
-from sqlalchemy import Table, Column, Integer, String, Float, ForeignKey, MetaData
-
-metadata = MetaData()
-
-circonscriptions = Table(
-    "circonscriptions",
-    metadata,
-    Column("id", Integer, primary_key=True, autoincrement=True),
-    Column("region_nom", String, nullable=False, index=True), 
-    Column("code_circonscription", String), 
-    Column("nom_circonscription", String, nullable=False),
-    
-    # Colonnes NORMALISÉES
-    Column("region_nom_norm", String, index=True),
-    Column("nom_circonscription_norm", String, index=True),
-
-    # Statistiques
-    Column("nb_bureau", Integer, default=0),
-    Column("inscrits", Integer, default=0),
-    Column("votants", Integer, default=0),
-    Column("taux_participation", Float, default=0.0),
-    Column("bulletins_nuls", Integer, default=0),
-    Column("suffrages_exprimes", Integer, default=0),
-    Column("bulletins_blancs_nombre", Integer, default=0),
-    Column("bulletins_blancs_pourcentage", Float, default=0.0),
-)
-
-candidats = Table(
-    "candidats",
-    metadata,
-    Column("id", Integer, primary_key=True, autoincrement=True),
-    Column("circonscription_id", Integer, ForeignKey("circonscriptions.id"), nullable=False),
-    
-    Column("nom_liste_candidat", String, nullable=False),
-    Column("parti_politique", String, nullable=True, index=True),
-    
-    # Colonnes NORMALISÉES
-    Column("nom_liste_candidat_norm", String),
-    Column("parti_politique_norm", String, index=True),
-
-    Column("score_voix", Integer, default=0),
-    Column("pourcentage_voix", Float, default=0.0),
-
-    Column("est_elu", Integer, default=0),  # 0 = False, 1 = True
-)
+
+# Tables SQLAlchemy : construites (et SQLAlchemy importé) à la première lecture de
+# metadata / circonscriptions / candidats, c.-à-d. au chargement des données. L'agent
+# n'utilise que les constantes SQL de ce module et ne paie pas l'import au démarrage.
+_TABLES = None
+
+
+def _build_tables():
+    from sqlalchemy import Table, Column, Index, Integer, String, Float, ForeignKey, MetaData
+
+    metadata = MetaData()
+
+    circonscriptions = Table(
+        "circonscriptions",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("region_nom", String, nullable=False, index=True), 
+        Column("code_circonscription", String), 
+        Column("nom_circonscription", String, nullable=False),
+
+        # Colonnes NORMALISÉES
+        Column("region_nom_norm", String, index=True),
+        Column("nom_circonscription_norm", String, index=True),
+
+        # Statistiques
+        Column("nb_bureau", Integer, default=0),
+        Column("inscrits", Integer, default=0),
+        Column("votants", Integer, default=0),
+        Column("taux_participation", Float, default=0.0),
+        Column("bulletins_nuls", Integer, default=0),
+        Column("suffrages_exprimes", Integer, default=0),
+        Column("bulletins_blancs_nombre", Integer, default=0),
+        Column("bulletins_blancs_pourcentage", Float, default=0.0),
+    )
+
+    candidats = Table(
+        "candidats",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("circonscription_id", Integer, ForeignKey("circonscriptions.id"), nullable=False),
+
+        Column("nom_liste_candidat", String, nullable=False),
+        Column("parti_politique", String, nullable=True, index=True),
+
+        # Colonnes NORMALISÉES
+        Column("nom_liste_candidat_norm", String, index=True),
+        Column("parti_politique_norm", String),
+
+        Column("score_voix", Integer, default=0),
+        Column("pourcentage_voix", Float, default=0.0),
+
+        Column("est_elu", Integer, default=0),  # 0 = False, 1 = True
+
+        # Colonnes DÉRIVÉES (calculées au chargement, cf. ingestion/derived_columns.py)
+        Column("rang_circonscription", Integer, index=True),  # 1 = premier de la circonscription
+        Column("marge_voix", Integer),  # avance sur le second (premier) / retard sur le premier (autres)
+        Column("marge_pourcentage", Float),
+        Column("part_voix_regionale", Float),  # part des voix de la région
+    )
+
+    # Index composites déduits des requêtes des exemples (few_shot_examples.json) :
+    # jointure des vues + filtre élu/non élu + tri par voix servis sans parcours complet ni tri temporaire.
+    # Vérifiés par benchmarks/bench_query_plans.py (EXPLAIN QUERY PLAN sur la base réelle et agrandie).
+    Index("ix_candidats_circonscription_id_est_elu_score_voix",
+          candidats.c.circonscription_id, candidats.c.est_elu, candidats.c.score_voix)
+    Index("ix_candidats_parti_politique_norm_est_elu_score_voix",
+          candidats.c.parti_politique_norm, candidats.c.est_elu, candidats.c.score_voix)
+    Index("ix_candidats_score_voix", candidats.c.score_voix)
+
+    return {"metadata": metadata, "circonscriptions": circonscriptions, "candidats": candidats}
+
+
+def __getattr__(name):
+    global _TABLES
+    if name in ("metadata", "circonscriptions", "candidats"):
+        if _TABLES is None:
+            _TABLES = _build_tables()
+        return _TABLES[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Vue A : Données complètes
@@ -61,14 +95,22 @@ SELECT
     c.nom_liste_candidat_norm,
     c.score_voix,
     c.pourcentage_voix,
-    c.est_elu
+    c.est_elu,
+    c.rang_circonscription,
+    c.marge_voix,
+    c.marge_pourcentage,
+    c.part_voix_regionale
 FROM candidats c
 JOIN circonscriptions ci ON c.circonscription_id = ci.id;
 """
 
-# Vue B : Gagnants uniquement
-vue_elus_uniquement = """
-CREATE VIEW IF NOT EXISTS vue_elus_uniquement AS
+# Agrégats MATÉRIALISÉS : tables physiques recalculées à chaque chargement.
+# Les deux premières gardent le nom et les colonnes des anciennes vues (les prompts restent valables).
+# L'ordre compte : une table peut être calculée à partir d'une table précédente.
+MATERIALIZED_ROLLUPS = {
+    # Gagnants uniquement
+    "vue_elus_uniquement": {
+        "select": """
 SELECT 
     region_nom,
     region_nom_norm,
@@ -78,15 +120,22 @@ SELECT
     parti_politique_norm,
     nom_liste_candidat,
     nom_liste_candidat_norm,
-    score_voix
+    score_voix,
+    marge_voix,
+    marge_pourcentage
 FROM vue_resultats_detailles
-WHERE est_elu = 1;
-"""
-
-# Vue C : Stats régionales
-
-vue_stats_regionales = """
-CREATE VIEW IF NOT EXISTS vue_stats_regionales AS
+WHERE est_elu = 1
+""",
+        "indexes": [
+            ("parti_politique_norm",),
+            ("region_nom_norm",),
+            ("nom_circonscription_norm",),
+            ("marge_voix",),
+        ],
+    },
+    # Stats régionales (participation)
+    "vue_stats_regionales": {
+        "select": """
 SELECT 
     region_nom,
     region_nom_norm,
@@ -95,7 +144,84 @@ SELECT
     SUM(suffrages_exprimes) as total_exprimes,
     ROUND(CAST(SUM(votants) AS FLOAT) / NULLIF(SUM(inscrits), 0), 4) as taux_participation_regional
 FROM circonscriptions
-GROUP BY region_nom, region_nom_norm;
+GROUP BY region_nom, region_nom_norm
+""",
+        "indexes": [
+            ("region_nom_norm",),
+        ],
+    },
+    # Sièges par parti
+    "stats_sieges_partis": {
+        "select": """
+SELECT 
+    parti_politique,
+    parti_politique_norm,
+    COUNT(*) as nombre_sieges,
+    SUM(score_voix) as total_voix_elus
+FROM vue_elus_uniquement
+GROUP BY parti_politique, parti_politique_norm
+""",
+        "indexes": [
+            ("parti_politique_norm",),
+        ],
+    },
+    # Voix par parti et par région
+    "stats_voix_partis_regions": {
+        "select": """
+SELECT 
+    region_nom,
+    region_nom_norm,
+    parti_politique,
+    parti_politique_norm,
+    SUM(score_voix) as total_voix,
+    COUNT(*) as nombre_candidats,
+    SUM(est_elu) as nombre_elus
+FROM vue_resultats_detailles
+GROUP BY region_nom, region_nom_norm, parti_politique, parti_politique_norm
+""",
+        "indexes": [
+            ("parti_politique_norm", "region_nom_norm"),
+            ("region_nom_norm",),
+        ],
+    },
+}
+
+creation_views_sql = [vue_resultats_detailles]
+
+# Index plein texte (FTS5, tokenizer trigram) sur les colonnes de noms normalisées.
+# Tables "external content" : le texte reste dans les tables sources, l'index pointe sur leur id.
+fts_circonscriptions = """
+CREATE VIRTUAL TABLE IF NOT EXISTS fts_circonscriptions USING fts5(
+    region_nom_norm,
+    nom_circonscription_norm,
+    content='circonscriptions',
+    content_rowid='id',
+    tokenize='trigram'
+);
 """
 
-creation_views_sql = [vue_resultats_detailles, vue_elus_uniquement, vue_stats_regionales]
\ No newline at end of file
+fts_candidats = """
+CREATE VIRTUAL TABLE IF NOT EXISTS fts_candidats USING fts5(
+    nom_liste_candidat_norm,
+    parti_politique_norm,
+    content='candidats',
+    content_rowid='id',
+    tokenize='trigram'
+);
+"""
+
+creation_fts_sql = [fts_circonscriptions, fts_candidats]
+
+# À exécuter après le chargement des données (les tables "external content" ne se remplissent pas seules)
+rebuild_fts_sql = [
+    "INSERT INTO fts_circonscriptions(fts_circonscriptions) VALUES('rebuild');",
+    "INSERT INTO fts_candidats(fts_candidats) VALUES('rebuild');",
+]
+
+# Colonne normalisée -> (table FTS, table source)
+FTS_COLUMNS = {
+    "region_nom_norm": ("fts_circonscriptions", "circonscriptions"),
+    "nom_circonscription_norm": ("fts_circonscriptions", "circonscriptions"),
+    "nom_liste_candidat_norm": ("fts_candidats", "candidats"),
+    "parti_politique_norm": ("fts_candidats", "candidats"),
+}
@@ -0,0 +1,112 @@
+# db/sql_params.py
+
+import re
+from typing import Any, Dict, List, Tuple
+
+# Littéraux texte : masqués pendant l'analyse (une valeur ne contient jamais de SQL à interpréter)
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_MASK = "\x00{}\x00"
+# Nombre complet (exposant compris) : jamais une partie de nombre ("0.5e2", "0x1F" restent dans la requête entiers)
+_MASKED_OR_NUMBER = r"\x00\d+\x00|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?(?![\w.])"
+
+# <colonne> <opérateur> <valeur>  (la colonne peut être qualifiée : ci.region_nom_norm)
+_COMPARISON = re.compile(
+    r"(?P<column>\b(?:[A-Za-z_]\w*\.)?(?P<name>[A-Za-z_]\w*))\s*"
+    r"(?P<op>==|=|!=|<>|<=|>=|<|>|\bNOT\s+LIKE\b|\bLIKE\b|\bGLOB\b)\s*"
+    rf"(?P<value>{_MASKED_OR_NUMBER})",
+    re.IGNORECASE,
+)
+
+# <colonne> [NOT] IN (<valeur>, <valeur>...)
+_IN_LIST = re.compile(
+    r"(?P<column>\b(?:[A-Za-z_]\w*\.)?(?P<name>[A-Za-z_]\w*))\s+(?P<op>(?:NOT\s+)?IN)\s*"
+    rf"\((?P<values>\s*(?:{_MASKED_OR_NUMBER})(?:\s*,\s*(?:{_MASKED_OR_NUMBER}))*\s*)\)",
+    re.IGNORECASE,
+)
+
+_LIMIT = re.compile(r"\b(?P<keyword>LIMIT|OFFSET)\s+(?P<value>\d+)\b", re.IGNORECASE)
+
+_PLACEHOLDER = re.compile(r":(?P<name>[A-Za-z_]\w*)")
+
+_RESERVED = {"and", "or", "not", "where", "on", "when", "then", "else", "case", "select", "having"}
+
+
+def parameterize_sql(query: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Sépare une requête générée en forme paramétrée + valeurs :
+
+        WHERE nom_circonscription_norm LIKE '%agboville%' LIMIT 5
+        -> WHERE nom_circonscription_norm LIKE :nom_circonscription_norm LIMIT :limit
+           {"nom_circonscription_norm": "%agboville%", "limit": 5}
+
+    Seules les valeurs comparées à une colonne (=, <, LIKE, IN...) et LIMIT/OFFSET sont extraites :
+    deux questions sur des entités différentes partagent la même forme (même requête préparée,
+    même plan). Les paramètres portent le nom de la colonne, donc l'ordre des conditions ne change
+    pas les noms. Les motifs LIKE ASCII sont mis en minuscules (LIKE y est insensible à la casse).
+    """
+    literals: List[str] = []
+
+    def _stash(match: re.Match) -> str:
+        literals.append(match.group(0))
+        return _MASK.format(len(literals) - 1)
+
+    text = _LITERAL.sub(_stash, query)
+    params: Dict[str, Any] = {}
+
+    def _bind(name: str, raw: str, like: bool = False) -> str:
+        value = _decode(raw, literals)
+        if like and isinstance(value, str) and value.isascii():
+            value = value.lower()
+        key = name.lower()
+        suffix = 2
+        while key in params:
+            key = f"{name.lower()}_{suffix}"
+            suffix += 1
+        params[key] = value
+        return f":{key}"
+
+    def _comparison(match: re.Match) -> str:
+        if match.group("name").lower() in _RESERVED:
+            return match.group(0)
+        like = "LIKE" in match.group("op").upper()
+        placeholder = _bind(match.group("name"), match.group("value"), like=like)
+        return f"{match.group('column')} {match.group('op')} {placeholder}"
+
+    def _in_list(match: re.Match) -> str:
+        if match.group("name").lower() in _RESERVED:
+            return match.group(0)
+        values = [v.strip() for v in match.group("values").split(",")]
+        placeholders = ", ".join(_bind(match.group("name"), v) for v in values)
+        return f"{match.group('column')} {match.group('op')} ({placeholders})"
+
+    text = _IN_LIST.sub(_in_list, text)
+    text = _COMPARISON.sub(_comparison, text)
+    text = _LIMIT.sub(lambda m: f"{m.group('keyword')} {_bind(m.group('keyword'), m.group('value'))}", text)
+
+    for idx, literal in enumerate(literals):
+        text = text.replace(_MASK.format(idx), literal)
+    return text, params
+
+
+def _decode(raw: str, literals: List[str]) -> Any:
+    if raw.startswith("\x00"):
+        literal = literals[int(raw.strip("\x00"))]
+        return literal[1:-1].replace("''", "'")
+    return float(raw) if any(c in raw for c in ".eE") else int(raw)
+
+
+def inline_params(query: str, params: Dict[str, Any]) -> str:
+    """Réinjecte les valeurs dans la requête (affichage et journaux uniquement, jamais exécuté)."""
+    if not params:
+        return query
+
+    def _literal(match: re.Match) -> str:
+        name = match.group("name")
+        if name not in params:
+            return match.group(0)
+        value = params[name]
+        if isinstance(value, str):
+            return "'" + value.replace("'", "''") + "'"
+        return "NULL" if value is None else str(value)
+
+    return _PLACEHOLDER.sub(_literal, query)
@@ -1,5 +1,9 @@
-import pandas as pd
+import re
 import unicodedata
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class ElectionDataCleaner:
     """
@@ -37,7 +41,7 @@ class ElectionDataCleaner:
             
         # 2. Si c'est un "NaN" (Not a Number) venant de Pandas/Excel
         # On vérifie si c'est un float (car NaN est un float) pour éviter des bugs
-        if isinstance(s, float) and pd.isna(s):
+        if isinstance(s, float) and s != s:
             return ""
 
         # 3. Conversion en string (sécurité) et minuscule
@@ -48,20 +52,34 @@ class ElectionDataCleaner:
                     if unicodedata.category(c) != 'Mn')
         return s.strip()
 
+    @staticmethod
+    def normalize_search_text(s: str) -> str:
+        """
+        normalize_text + ponctuation remplacée par des espaces et espaces compactés.
+        Sert à comparer des questions utilisateur et des noms de lieux/partis.
+        """
+        s = ElectionDataCleaner.normalize_text(s)
+        s = re.sub(r"[^\w]+", " ", s)
+        return " ".join(s.split())
+
     @staticmethod
     def clean_numeric_string(s: str) -> str:
         """
         Supprime les espaces dans les chiffres et remplace la virgule par un point pour float.
         """
+        import pandas as pd
+
         if pd.isna(s):
             return "0"
         s = str(s).replace(" ", "").replace(",", ".")
         return s
 
-    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+    def clean(self, df: "pd.DataFrame") -> "pd.DataFrame":
         """
         Applique le nettoyage complet sur le DataFrame.
         """
+        import pandas as pd
+
         df_clean = df.copy()
 
         #  Remplacer régions vides par 'NON_TRANSMIS'
@@ -0,0 +1,76 @@
+import sqlite3
+from typing import List
+
+import pandas as pd
+
+# Colonnes calculées une fois au chargement et stockées dans 'candidats'
+DERIVED_COLUMNS = ["rang_circonscription", "marge_voix", "marge_pourcentage", "part_voix_regionale"]
+
+# Regroupement régional de part_voix_regionale : le nom normalisé, pour que deux graphies
+# d'une même région ("Gbêkê", "GBEKE") ne fassent qu'un groupe
+REGION_KEYS = ["region_nom_norm"]
+
+
+def add_candidate_metrics(df: pd.DataFrame, circo_keys: List[str], region_keys: List[str]) -> pd.DataFrame:
+    """
+    Ajoute les colonnes dérivées par candidat (opérations groupées vectorisées, sans boucle) :
+
+    - rang_circonscription : rang par voix dans la circonscription (1 = premier, ex æquo au même rang)
+    - marge_voix / marge_pourcentage : écart avec le meilleur adversaire de la circonscription
+      (positif pour le premier = avance sur le second, négatif pour les autres = retard sur le premier,
+      vide si le candidat est seul)
+    - part_voix_regionale : part des voix de la région obtenues par le candidat (valeur décimale, comme pourcentage_voix)
+    """
+    df = df.copy()
+    circo = df.groupby(circo_keys, sort=False, dropna=False).ngroup()
+    region = df.groupby(region_keys, sort=False, dropna=False).ngroup()
+
+    df["rang_circonscription"] = (
+        df["score_voix"].groupby(circo).rank(method="min", ascending=False).astype(int)
+    )
+
+    # Position dans la circonscription après tri décroissant : 0 = premier, 1 = second
+    position = df.assign(_circo=circo).sort_values(["_circo", "score_voix"], ascending=[True, False]) \
+        .groupby("_circo").cumcount().reindex(df.index)
+
+    for source, target in [("score_voix", "marge_voix"), ("pourcentage_voix", "marge_pourcentage")]:
+        values = df[source]
+        # Score du premier et du second de chaque circonscription (tri sur les voix)
+        first = values[position == 0].groupby(circo[position == 0]).first()
+        second = values[position == 1].groupby(circo[position == 1]).first()
+        best_opponent = circo.map(first).where(position != 0, circo.map(second))
+        df[target] = values - best_opponent
+
+    df["marge_voix"] = df["marge_voix"].astype("Int64")
+    df["marge_pourcentage"] = df["marge_pourcentage"].round(4)
+    df["part_voix_regionale"] = (
+        df["score_voix"] / df["score_voix"].groupby(region).transform("sum").replace(0, pd.NA)
+    ).astype(float).round(4)
+
+    return df
+
+
+def refresh_candidate_metrics(conn: sqlite3.Connection) -> int:
+    """
+    Calcule les colonnes dérivées des candidats déjà insérés (appelé par l'ingestion, et
+    utilisable tel quel pour recalculer une base existante). Renvoie le nombre de candidats.
+    Les agrégats matérialisés qui en dépendent doivent ensuite être (re)construits.
+    """
+    df = pd.read_sql_query(
+        """
+        SELECT c.id, c.circonscription_id, ci.region_nom_norm, c.score_voix, c.pourcentage_voix
+        FROM candidats c
+        JOIN circonscriptions ci ON c.circonscription_id = ci.id
+        """,
+        conn,
+    )
+    df = add_candidate_metrics(df, ["circonscription_id"], REGION_KEYS)
+
+    rows = df[DERIVED_COLUMNS + ["id"]].astype(object)
+    rows = rows.where(rows.notna(), None)
+    assignments = ", ".join(f"{col} = ?" for col in DERIVED_COLUMNS)
+    conn.executemany(
+        f"UPDATE candidats SET {assignments} WHERE id = ?",
+        [tuple(row) for row in rows.itertuples(index=False)],
+    )
+    return len(df)
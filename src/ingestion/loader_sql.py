@@ -7,8 +7,10 @@ from sqlalchemy import create_engine
 
 from ingestion.table_extractor import PDFElectionExtractor  
 from ingestion.clean_data import ElectionDataCleaner
+from ingestion.derived_columns import refresh_candidate_metrics
 from database.connection import DatabaseConnection
-from database.schema import metadata, creation_views_sql
+from database.schema import metadata, creation_views_sql, creation_fts_sql, rebuild_fts_sql
+from database.rollups import materialize_rollups, check_rollups
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -186,7 +188,7 @@ class ElectionLoader:
                         "parti_politique_norm": row.get("parti_politique_norm"),
                         "score_voix": int(row.get("score_voix", 0)),  
                         "pourcentage_voix": float(row.get("pourcentage_voix", 0.0)), 
-                        "est_elu": 1 if row.get("est_elu") else 0
+                        "est_elu": 1 if row.get("est_elu") else 0,
                     })
                 
                 sql_cand = """
@@ -199,9 +201,11 @@ class ElectionLoader:
                 cursor.executemany(sql_cand, candidates_data)
                 cand_count += len(candidates_data)
 
+            # Rang, marge et part régionale : calculés une fois ici plutôt qu'en SQL à chaque question
+            refresh_candidate_metrics(conn)
             conn.commit()
             print(f"    {circo_count} circonscriptions insérées")
-            print(f"    {cand_count} candidats insérés")
+            print(f"    {cand_count} candidats insérés (colonnes dérivées calculées)")
             
             # Création des Vues SQL
             print("\n Création des vues...")
@@ -210,6 +214,22 @@ class ElectionLoader:
             conn.commit()
             print("   Vues créées")
 
+            # Agrégats matérialisés (tables indexées, mêmes noms que les anciennes vues)
+            print("\n Matérialisation des agrégats...")
+            materialize_rollups(conn)
+            problems = check_rollups(conn)
+            if problems:
+                raise ValueError("Agrégats incohérents : " + " ; ".join(problems))
+            conn.commit()
+            print("   Agrégats matérialisés et vérifiés")
+
+            # Index plein texte (trigrammes) pour les recherches LIKE '%...%'
+            print("\n Création des index FTS5...")
+            for fts_sql in creation_fts_sql + rebuild_fts_sql:
+                cursor.execute(fts_sql)
+            conn.commit()
+            print("   Index FTS5 créés")
+
         except Exception as e:
             conn.rollback()
             print(f"\n ERREUR : {e}")
@@ -0,0 +1,116 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from src.agent.answer_cache import AnswerCache, CachedAgentGraph, normalize_question
+
+RESULT = {
+    "final_answer": "Le **RHDP** a remporté 155 sièges.",
+    "sql_query": "SELECT COUNT(*) FROM vue_elus_uniquement WHERE parti_politique_norm LIKE '%rhdp%'",
+    "sql_results": [{"COUNT(*)": 155}],
+    "chart_data": None,
+}
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnswerCache(db_path=str(tmp_path / "cache.db"))
+
+def test_normalize_question_folds_accents_and_punctuation():
+    """Vérifie que casse, accents, ponctuation et espaces sont ignorés."""
+    assert normalize_question("  Combien de Sièges a gagné le RHDP ?? ") == "combien de sieges a gagne le rhdp"
+
+def test_exact_hit(cache):
+    """Une question identique après normalisation renvoie la réponse stockée."""
+    cache.set("Combien de sièges a gagné le RHDP ?", RESULT)
+    hit = cache.get("combien de sieges a gagne le rhdp")
+
+    assert hit["final_answer"] == RESULT["final_answer"]
+    assert hit["sql_results"].records() == RESULT["sql_results"]
+
+def test_near_duplicate_hit(cache):
+    """Une reformulation légère retrouve la même entrée."""
+    cache.set("Combien de sièges a gagné le RHDP ?", RESULT)
+
+    assert cache.get("Le RHDP a gagné combien de sièges ?") is not None
+
+def test_near_duplicate_requires_same_numbers_and_entities(cache):
+    """Top 5 / Top 10 ou deux villes différentes ne partagent pas la réponse."""
+    cache.set("Top 5 des candidats à Bouaké", RESULT)
+
+    assert cache.get("Top 10 des candidats à Bouaké") is None
+    assert cache.get("Top 5 des candidats à Korhogo") is None
+
+def test_near_duplicate_requires_same_party_and_region(cache):
+    """Même formulation avec un autre parti ou une autre région : pas de réponse partagée."""
+    cache.set("Quel est le total des voix obtenues par le RHDP dans la région du Poro ?", RESULT)
+
+    assert cache.get("Quel est le total des voix obtenues par le PDCI dans la région du Poro ?") is None
+    assert cache.get("Quel est le total des voix obtenues par le RHDP dans la région de la Bagoué ?") is None
+    assert cache.get("Le total des voix obtenues dans la région du Poro par le RHDP ?") is not None
+
+def test_near_duplicate_requires_same_comparison_and_negation(cache):
+    """"plus de" / "moins de" et "élus" / "pas élus" ne partagent jamais une réponse."""
+    cache.set("Combien de candidats élus du RHDP avec plus de cinquante pour cent ?", RESULT)
+    cache.set("Combien de candidats du RHDP ont été élus ?", RESULT)
+
+    assert cache.get("Combien de candidats élus du RHDP avec moins de cinquante pour cent ?") is None
+    assert cache.get("Combien de candidats du RHDP n'ont pas été élus ?") is None
+
+def test_near_duplicate_requires_same_metric_and_spelled_numbers(cache):
+    """Une question longue qui ne diffère que par la métrique ou un nombre en lettres n'est pas servie."""
+    cache.set("Quel est le nombre total de voix obtenues par le RHDP dans la région du Poro lors des législatives de 2021 ?", RESULT)
+    cache.set("Quels sont les cinq candidats ayant obtenu le plus de voix dans la région du Poro lors des législatives de 2021 ?", RESULT)
+
+    assert cache.get("Quel est le pourcentage total de voix obtenues par le RHDP dans la région du Poro lors des législatives de 2021 ?") is None
+    assert cache.get("Quels sont les dix candidats ayant obtenu le plus de voix dans la région du Poro lors des législatives de 2021 ?") is None
+
+def test_near_duplicate_without_gazetteer_only_ignores_stop_words(cache):
+    """Base indisponible : seuls les mots vides et l'ordre des mots peuvent différer."""
+    cache.set("Combien de sièges a gagné le RHDP ?", RESULT)
+    with patch("src.agent.gazetteer.extract_entities", return_value=None):
+        assert cache.get("Le RHDP a gagné combien de sièges ?") is not None
+        assert cache.get("Combien de sièges a gagné le PDCI ?") is None
+
+def test_reingestion_invalidates_answers(tmp_path):
+    """Une réponse n'est plus servie après une modification du fichier de la base interrogée."""
+    source = tmp_path / "elections.db"
+    source.write_bytes(b"v1")
+    cache = AnswerCache(db_path=str(tmp_path / "cache.db"), source_db_path=str(source))
+    cache.set("Combien de sièges a gagné le RHDP ?", RESULT)
+    assert cache.get("Combien de sièges a gagné le RHDP ?") is not None
+
+    source.write_bytes(b"version 2")
+
+    assert cache.get("Combien de sièges a gagné le RHDP ?") is None
+    assert cache.get("Le RHDP a gagné combien de sièges ?") is None
+
+def test_ttl_expiry(tmp_path):
+    """Une entrée expirée n'est plus servie."""
+    cache = AnswerCache(db_path=str(tmp_path / "cache.db"), ttl_seconds=0)
+    cache.set("Qui a gagné à Tiapoum ?", RESULT)
+    time.sleep(0.01)
+
+    assert cache.get("Qui a gagné à Tiapoum ?") is None
+
+def test_lru_eviction(tmp_path):
+    """Au-delà de max_entries, l'entrée la moins récemment utilisée est évincée."""
+    cache = AnswerCache(db_path=str(tmp_path / "cache.db"), max_entries=2)
+    cache.set("question alpha", RESULT)
+    cache.set("question beta", RESULT)
+    cache.get("question alpha")
+    cache.set("question gamma", RESULT)
+
+    assert len(cache) == 2
+    assert cache.get("question beta") is None
+    assert cache.get("question alpha") is not None
+
+def test_cached_graph_skips_agent_on_hit(cache):
+    """Sur un hit, le graphe (et donc le LLM) n'est jamais appelé."""
+    graph = MagicMock()
+    graph.invoke.return_value = {"user_query": "Qui a gagné à Azaguié ?", **RESULT}
+    agent = CachedAgentGraph(graph, cache)
+
+    agent.invoke({"user_query": "Qui a gagné à Azaguié ?"})
+    result = agent.invoke({"user_query": "qui a gagne a azaguie"})
+
+    assert graph.invoke.call_count == 1
+    assert result["final_answer"] == RESULT["final_answer"]
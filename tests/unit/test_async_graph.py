@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.agent.graph import build_agent_graph
+from src.agent.nodes.classify_intent_sql import aclassify_intent_node
+from src.agent.state import UserQueryClassification
+
+def _mock_client():
+    client = MagicMock()
+    client.ainvoke_structured = AsyncMock(return_value=UserQueryClassification(
+        request_validity="allowed",
+        query_nature="aggregation",
+        reasoning_summary="Test"
+    ))
+    client.ainvoke = AsyncMock(side_effect=[
+        MagicMock(content="SELECT COUNT(*) AS sieges FROM vue_elus_uniquement WHERE parti_politique_norm LIKE '%rhdp%'"),
+        MagicMock(content="Le **RHDP** a remporté des sièges."),
+    ])
+    return client
+
+def test_async_classify_routes_allowed():
+    """Le nœud asynchrone utilise ainvoke_structured et route comme la version synchrone."""
+    client = _mock_client()
+    with patch("src.agent.nodes.classify_intent_sql.get_llm_client", return_value=client):
+        result = asyncio.run(aclassify_intent_node({"user_query": "Quels sont les résultats à Abidjan ?"}))
+
+    assert result.goto == "recherche_similaire"
+    client.ainvoke_structured.assert_awaited_once()
+
+def test_async_graph_end_to_end():
+    """Le graphe async répond sans aucun appel LLM synchrone."""
+    client = _mock_client()
+    client.invoke = MagicMock(side_effect=AssertionError("appel synchrone"))
+    client.invoke_structured = MagicMock(side_effect=AssertionError("appel synchrone"))
+
+    with patch("src.agent.nodes.classify_intent_sql.get_llm_client", return_value=client), \
+         patch("src.agent.nodes.generate_adapte_sql.get_llm_client", return_value=client), \
+         patch("src.agent.nodes.generate_final_answer_sql.get_llm_client", return_value=client):
+        agent = build_agent_graph(async_mode=True)
+        result = asyncio.run(agent.ainvoke({
+            "user_query": "Quel est le poids du RHDP dans la nouvelle assemblée ?",
+            "classification": None,
+            "sql_query": None,
+            "sql_results": [],
+            "chart_generated": False,
+            "errors": [],
+            "final_answer": None
+        }))
+
+    assert result["sql_results"].row(0)["sieges"] > 0
+    assert "RHDP" in result["final_answer"]
@@ -0,0 +1,128 @@
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from src.agent import chart_renderer
+from src.agent.chart_renderer import render_chart, render_png, chart_key, plotly_figure, PLOTLY_MIME
+from src.agent.nodes import generate_chart_sql
+from src.agent.nodes.generate_chart_sql import generate_chart_node, _bar_spec
+from src.agent.state import UserQueryClassification
+from src.database.result_set import ResultSet
+
+PNG_MAGIC = b"\x89PNG"
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    chart_renderer._RENDER_CACHE.clear()
+    yield
+    chart_renderer._RENDER_CACHE.clear()
+
+def _results(n=5):
+    return ResultSet.from_rows(["parti", "sieges"], [(f"P{i}", i * 10) for i in range(n)])
+
+def test_render_png_without_pyplot():
+    """Le rendu produit un PNG à partir d'une spécification, sans état global pyplot."""
+    png = render_png(_bar_spec(_results()))
+
+    assert png.startswith(PNG_MAGIC)
+
+def test_render_cache_reuses_png():
+    """Même type + mêmes données : le PNG est réutilisé, la spécification n'est pas reconstruite."""
+    results = _results()
+    build_spec = MagicMock(return_value=_bar_spec(results))
+    with patch.object(chart_renderer, "CHART_WORKERS", 0):
+        first = render_chart("bar", results, build_spec)
+        second = render_chart("bar", _results(), build_spec)
+
+    assert first == second
+    build_spec.assert_called_once()
+
+def test_cache_key_depends_on_type_and_data():
+    """La clé change avec le type de graphique ou les données."""
+    assert chart_key("bar", _results()) == chart_key("bar", _results())
+    assert chart_key("bar", _results()) != chart_key("pie", _results())
+    assert chart_key("bar", _results()) != chart_key("bar", _results(6))
+
+def test_render_in_process_pool():
+    """Le rendu passe par le pool de processus."""
+    results = _results()
+    with patch.object(chart_renderer, "CHART_WORKERS", 1):
+        try:
+            png = render_chart("bar", results, lambda: _bar_spec(results))
+        finally:
+            chart_renderer._reset_pool()
+
+    assert png.startswith(PNG_MAGIC)
+
+def test_concurrent_renders_are_isolated():
+    """Des rendus simultanés (plusieurs sessions) ne se mélangent pas."""
+    with patch.object(chart_renderer, "CHART_WORKERS", 0), ThreadPoolExecutor(max_workers=4) as executor:
+        pngs = list(executor.map(lambda n: render_png(_bar_spec(_results(n))), range(2, 10)))
+
+    assert all(png.startswith(PNG_MAGIC) for png in pngs)
+    assert len(set(pngs)) == len(pngs)
+
+def _chart_state(chart_type):
+    classification = UserQueryClassification(request_validity="allowed", query_nature="ranking",
+                                             task_type="visualization", chart_type=chart_type)
+    return {"classification": classification, "sql_results": _results()}
+
+def test_generate_chart_node_returns_plotly_spec():
+    """Par défaut, le nœud renvoie une figure Plotly compacte (données + layout), sans PNG."""
+    with patch.object(chart_renderer, "render_png") as mock_render:
+        result = generate_chart_node(_chart_state("bar"))
+
+    chart_data = result.update["chart_data"]
+    assert chart_data["mime_type"] == PLOTLY_MIME
+    assert chart_data["figure"]["data"][0]["y"] == [0, 10, 20, 30, 40]
+    assert "data" not in chart_data
+    mock_render.assert_not_called()
+
+def test_plotly_spec_is_valid_figure():
+    """La spécification est acceptée par Plotly et bien plus légère que le PNG équivalent."""
+    import plotly.graph_objects as go
+
+    spec = _bar_spec(_results(50))
+    figure = plotly_figure(spec)
+    go.Figure(figure)
+
+    assert len(json.dumps(figure)) * 10 < len(render_png(spec))
+
+def test_png_backend_opt_in():
+    """CHART_BACKEND = "png" : image base64 rendue par matplotlib."""
+    with patch.object(generate_chart_sql, "CHART_BACKEND", "png"), patch.object(chart_renderer, "CHART_WORKERS", 0):
+        result = generate_chart_node(_chart_state("pie"))
+
+    assert result.update["chart_generated"] is True
+    assert result.update["chart_data"]["mime_type"] == "image/png"
+
+def test_pool_does_not_fork_parent():
+    """Les workers sont démarrés par forkserver/spawn, pas par fork du processus multi-threadé."""
+    assert chart_renderer._start_context().get_start_method() in ("forkserver", "spawn")
+
+def test_render_timeout_restarts_pool():
+    """Rendu bloqué : TimeoutError, workers terminés et nouveau pool au graphique suivant."""
+    stuck_pool = MagicMock()
+    stuck_pool.submit.return_value.result.side_effect = chart_renderer.FutureTimeoutError()
+    with patch.object(chart_renderer, "CHART_WORKERS", 1), \
+         patch.object(chart_renderer, "_get_pool", return_value=stuck_pool), \
+         patch.object(chart_renderer, "_reset_pool") as mock_reset:
+        with pytest.raises(TimeoutError):
+            render_chart("bar", _results(), lambda: _bar_spec(_results()))
+
+    stuck_pool.submit.return_value.cancel.assert_called_once()
+    mock_reset.assert_called_once_with(kill=True)
+    assert len(chart_renderer._RENDER_CACHE) == 0
+
+def test_reset_pool_terminates_workers():
+    """kill=True termine réellement les processus du pool abandonné."""
+    with patch.object(chart_renderer, "CHART_WORKERS", 1):
+        pool = chart_renderer._get_pool()
+        pool.submit(int).result(timeout=30)
+        processes = list(pool._processes.values())
+        chart_renderer._reset_pool(kill=True)
+        for process in processes:
+            process.join(timeout=5)
+
+    assert processes and not any(process.is_alive() for process in processes)
+    assert chart_renderer._POOL is None
@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from src.agent.graph import build_agent_graph
+from src.agent.nodes.classify_generate_sql import classify_and_generate_sql_node, _build_combined_prompt
+from src.agent.nodes.classify_intent_sql import classification_context
+from src.agent.nodes.generate_adapte_sql import build_sql_system_prompt
+from src.agent.gazetteer import format_region_list
+from src.agent.state import ClassificationWithSQL
+
+QUESTION = "Quel est le poids du RHDP dans la nouvelle assemblée ?"
+
+def _combined(validity="allowed", sql="SELECT COUNT(*) AS sieges FROM vue_elus_uniquement WHERE parti_politique_norm = 'rhdp'"):
+    return ClassificationWithSQL(
+        request_validity=validity,
+        query_nature="aggregation",
+        reasoning_summary="Test",
+        sql_query=sql,
+    )
+
+@patch("src.agent.nodes.classify_generate_sql.get_llm_client")
+def test_combined_allowed_goes_to_verify(mock_get_client):
+    """Une question autorisée part en vérification avec le SQL du même appel."""
+    mock_get_client.return_value.invoke_structured.return_value = _combined(sql="```sql\nSELECT 1;\n```")
+
+    result = classify_and_generate_sql_node({"user_query": QUESTION})
+
+    assert result.goto == "verify_sql"
+    assert result.update["sql_query"] == "SELECT 1"
+    assert result.update["classification"].request_validity == "allowed"
+    assert not hasattr(result.update["classification"], "sql_query")
+
+@pytest.mark.parametrize("validity, sql, goto", [
+    ("out_of_scope", None, "reponse_hors_sujet"),
+    ("policy_violation", "SELECT 1", "reponse_politique"),
+    ("ambiguous", None, "generate_clarification"),
+    ("allowed", None, "recherche_similaire"),   # SQL manquant -> chemin séquentiel
+])
+@patch("src.agent.nodes.classify_generate_sql.get_llm_client")
+def test_combined_routing(mock_get_client, validity, sql, goto):
+    """Le routage suit la classification ; le SQL n'est gardé que pour 'allowed'."""
+    mock_get_client.return_value.invoke_structured.return_value = _combined(validity, sql)
+
+    result = classify_and_generate_sql_node({"user_query": QUESTION})
+
+    assert result.goto == goto
+    assert "sql_query" not in result.update
+
+def test_combined_graph_single_call_before_answer():
+    """En mode combiné, seul l'appel de réponse finale s'ajoute à l'appel structuré."""
+    client = MagicMock()
+    client.invoke_structured.return_value = _combined()
+    client.invoke.return_value = MagicMock(content="Le **RHDP** domine l'assemblée.")
+
+    with patch("src.agent.nodes.classify_generate_sql.get_llm_client", return_value=client), \
+         patch("src.agent.nodes.generate_adapte_sql.get_llm_client", return_value=client), \
+         patch("src.agent.nodes.generate_final_answer_sql.get_llm_client", return_value=client):
+        agent = build_agent_graph(mode="combined")
+        result = agent.invoke({"user_query": QUESTION, "errors": [], "chart_generated": False})
+
+    assert client.invoke_structured.call_count == 1
+    assert client.invoke.call_count == 1
+    assert result["sql_results"].row(0)["sieges"] > 0
+
+def test_combined_prompt_shares_schema_once():
+    """Schéma et liste des régions n'apparaissent qu'une fois : prompt nettement plus court que les deux prompts séparés."""
+    prompt = _build_combined_prompt(QUESTION, "")
+    separate = len(classification_context()) + len(build_sql_system_prompt(""))
+
+    assert prompt.count(format_region_list()) == 1
+    assert prompt.count("VUE 'vue_elus_uniquement'") == 1
+    assert "SCHÉMA EXACT" not in prompt
+    assert len(prompt) < 0.9 * separate
+
+def test_unknown_graph_mode():
+    """Un mode inconnu est refusé à la construction du graphe."""
+    with pytest.raises(ValueError):
+        build_agent_graph(mode="parallel")
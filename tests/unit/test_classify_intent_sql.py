@@ -3,11 +3,11 @@ from unittest.mock import patch, MagicMock
 from src.agent.nodes.classify_intent_sql import classify_intent_node
 from src.agent.state import UserQueryClassification
 
-@patch("src.agent.nodes.classify_intent_sql.LLMClient")
-def test_classify_intent_allowed(MockClientClass):
+@patch("src.agent.nodes.classify_intent_sql.get_llm_client")
+def test_classify_intent_allowed(MockGetClient):
     """Teste si une question valide va bien vers recherche_similaire."""
     # Configurer le simulateur (Mock)
-    mock_instance = MockClientClass.return_value
+    mock_instance = MockGetClient.return_value
     mock_instance.invoke_structured.return_value = UserQueryClassification(
         request_validity="allowed",
         query_nature="simple_retrieval",
@@ -20,10 +20,10 @@ def test_classify_intent_allowed(MockClientClass):
     assert result.goto == "recherche_similaire"
     assert result.update["classification"].request_validity == "allowed"
 
-@patch("src.agent.nodes.classify_intent_sql.LLMClient")
-def test_classify_intent_ambiguous(MockClientClass):
+@patch("src.agent.nodes.classify_intent_sql.get_llm_client")
+def test_classify_intent_ambiguous(MockGetClient):
     """Teste si une question sans lieu va bien vers clarification."""
-    mock_instance = MockClientClass.return_value
+    mock_instance = MockGetClient.return_value
     mock_instance.invoke_structured.return_value = UserQueryClassification(
         request_validity="ambiguous",
         query_nature="simple_retrieval",
@@ -36,10 +36,10 @@ def test_classify_intent_ambiguous(MockClientClass):
 
     assert result.goto == "generate_clarification"
 
-@patch("src.agent.nodes.classify_intent_sql.LLMClient")
-def test_classify_intent_system_error(MockClientClass):
+@patch("src.agent.nodes.classify_intent_sql.get_llm_client")
+def test_classify_intent_system_error(MockGetClient):
     """Teste la réaction du code si le LLM plante."""
-    mock_instance = MockClientClass.return_value
+    mock_instance = MockGetClient.return_value
     mock_instance.invoke_structured.side_effect = Exception("Erreur Mistral")
 
     state = {"user_query": "Question test"}
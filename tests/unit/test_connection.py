@@ -0,0 +1,63 @@
+import sqlite3
+import threading
+import pytest
+from src.database.connection import ConnectionPool, DatabaseConnection
+
+@pytest.fixture
+def db_file(tmp_path):
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (v INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+    return path
+
+def test_pool_reuses_warm_connection(db_file):
+    """Deux emprunts successifs réutilisent la même connexion."""
+    pool = ConnectionPool(str(db_file))
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second.execute("SELECT v FROM t").fetchone()["v"] == 1
+
+    assert first is second
+
+def test_pool_concurrent_borrows_get_distinct_connections(db_file):
+    """Deux threads simultanés n'utilisent jamais la même connexion."""
+    pool = ConnectionPool(str(db_file))
+    barrier = threading.Barrier(2)
+    seen = []
+
+    def worker():
+        with pool.connection() as conn:
+            seen.append(id(conn))
+            barrier.wait(timeout=5)
+            conn.execute("SELECT v FROM t").fetchall()
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert len(set(seen)) == 2
+
+def test_pool_is_read_only(db_file):
+    """Toute écriture est refusée par les connexions du pool."""
+    pool = ConnectionPool(str(db_file))
+    with pool.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO t VALUES (2)")
+
+def test_pool_reopens_after_database_change(db_file):
+    """Après une ré-ingestion, le pool rouvre ses connexions et voit les nouvelles données."""
+    pool = ConnectionPool(str(db_file))
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+    writer = DatabaseConnection(str(db_file), read_only=False).get_connection()
+    writer.execute("INSERT INTO t VALUES (2), (3)")
+    writer.commit()
+    writer.close()
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 3
@@ -0,0 +1,96 @@
+import pytest
+import shutil
+import sqlite3
+import pandas as pd
+from src.agent.gazetteer import DB_PATH
+from src.ingestion.derived_columns import add_candidate_metrics, refresh_candidate_metrics, DERIVED_COLUMNS, REGION_KEYS
+
+def _sample():
+    return pd.DataFrame({
+        "region_nom": ["A", "A", "A", "A", "B", "B"],
+        "nom_circonscription": ["X", "X", "X", "Y", "Z", "Z"],
+        "score_voix": [30, 50, 20, 10, 5, 7],
+        "pourcentage_voix": [0.3, 0.5, 0.2, 1.0, 0.4167, 0.5833],
+    })
+
+def test_rank_margin_and_regional_share():
+    """Rang, marge sur le meilleur adversaire et part régionale sont calculés par groupe."""
+    df = add_candidate_metrics(_sample(), ["nom_circonscription"], ["region_nom"])
+
+    assert df["rang_circonscription"].tolist() == [2, 1, 3, 1, 2, 1]
+    assert df["marge_voix"].tolist()[:3] == [-20, 20, -30]
+    assert df["marge_pourcentage"].iloc[1] == 0.2
+    assert df["part_voix_regionale"].iloc[1] == round(50 / 110, 4)
+    assert df.groupby("region_nom")["part_voix_regionale"].sum().round(3).tolist() == [1.0, 1.0]
+
+def test_single_candidate_has_no_margin():
+    """Un candidat seul dans sa circonscription est premier, sans marge."""
+    df = add_candidate_metrics(_sample(), ["nom_circonscription"], ["region_nom"])
+
+    assert df["rang_circonscription"].iloc[3] == 1
+    assert pd.isna(df["marge_voix"].iloc[3])
+
+def test_tied_leaders_share_rank_and_zero_margin():
+    """Deux premiers ex æquo ont le même rang et une marge nulle."""
+    df = pd.DataFrame({"c": [1, 1, 1], "r": ["A"] * 3, "score_voix": [40, 40, 20], "pourcentage_voix": [0.4, 0.4, 0.2]})
+
+    out = add_candidate_metrics(df, ["c"], ["r"])
+
+    assert out["rang_circonscription"].tolist() == [1, 1, 3]
+    assert out["marge_voix"].tolist() == [0, 0, -20]
+
+def test_regional_share_groups_on_normalized_region():
+    """Deux graphies d'une même région forment un seul groupe (comme au recalcul depuis la base)."""
+    df = _sample().assign(region_nom=["Gbêkê", "GBEKE", "Gbeke", "gbêkê", "B", "B"],
+                          region_nom_norm=["gbeke"] * 4 + ["b", "b"])
+    out = add_candidate_metrics(df, ["nom_circonscription"], REGION_KEYS)
+
+    assert out.loc[:3, "part_voix_regionale"].sum() == pytest.approx(1.0, abs=1e-3)
+    assert out.loc[1, "part_voix_regionale"] == 0.4545
+
+def test_shipped_database_matches_recomputation(tmp_path):
+    """Les colonnes livrées dans la base correspondent au recalcul pandas."""
+    path = tmp_path / "elections.db"
+    shutil.copy(DB_PATH, path)
+    query = f"SELECT id, {', '.join(DERIVED_COLUMNS)} FROM candidats ORDER BY id"
+
+    with sqlite3.connect(path) as conn:
+        shipped = conn.execute(query).fetchall()
+        conn.execute("UPDATE candidats SET rang_circonscription = NULL, marge_voix = NULL")
+        refresh_candidate_metrics(conn)
+        recomputed = conn.execute(query).fetchall()
+
+    assert shipped == recomputed
+    assert all(row[1] is not None for row in shipped)
+
+def test_ingestion_fills_derived_columns():
+    """L'ingestion insère les candidats sans colonnes dérivées puis les calcule depuis la base."""
+    from src.database.schema import metadata
+    from sqlalchemy import create_engine
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        metadata.create_all(connection)
+        conn = connection.connection.driver_connection
+        conn.executemany("INSERT INTO circonscriptions (id, region_nom, region_nom_norm, nom_circonscription) "
+                         "VALUES (?, ?, 'GBEKE', ?)", [(1, "Gbêkê", "X"), (2, "GBEKE", "Y")])
+        conn.executemany("INSERT INTO candidats (circonscription_id, nom_liste_candidat, score_voix, pourcentage_voix) "
+                         "VALUES (?, 'c', ?, ?)", [(1, 30, 0.3), (1, 50, 0.5), (1, 20, 0.2), (2, 10, 1.0)])
+
+        assert refresh_candidate_metrics(conn) == 4
+        rows = conn.execute(f"SELECT {', '.join(DERIVED_COLUMNS)} FROM candidats ORDER BY id").fetchall()
+
+    assert rows == [(2, -20, -0.2, 0.2727), (1, 20, 0.2, 0.4545), (3, -30, -0.3, 0.1818), (1, None, None, 0.0909)]
+
+def test_winner_margin_exposed_in_views():
+    """Les vues exposent les colonnes dérivées (plus besoin de fonctions de fenêtre)."""
+    with sqlite3.connect(DB_PATH) as conn:
+        second = conn.execute(
+            "SELECT COUNT(*) FROM vue_resultats_detailles WHERE rang_circonscription = 2"
+        ).fetchone()[0]
+        margins = conn.execute(
+            "SELECT COUNT(*) FROM vue_elus_uniquement WHERE marge_voix IS NOT NULL"
+        ).fetchone()[0]
+
+    assert second > 0
+    assert margins > 0
@@ -1 +1,76 @@
-s
\ No newline at end of file
+import pytest
+from unittest.mock import patch
+from src.agent.nodes import execute_sql
+from src.agent.nodes.execute_sql import execute_sql_node
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    execute_sql._RESULT_CACHE.clear()
+    yield
+    execute_sql._RESULT_CACHE.clear()
+
+def test_execute_sql_returns_rows():
+    """Une requête valide renvoie des lignes et passe au choix du graphique."""
+    state = {"sql_query": "SELECT COUNT(*) AS nb FROM vue_elus_uniquement WHERE parti_politique_norm LIKE '%rhdp%'"}
+    result = execute_sql_node(state)
+
+    assert result.goto == "determine_chart_intent"
+    assert result.update["sql_results"].row(0)["nb"] > 0
+
+def test_execute_sql_empty_query():
+    """Sans requête, on termine avec un message d'erreur."""
+    result = execute_sql_node({"sql_query": None})
+
+    assert len(result.update["sql_results"]) == 0
+    assert "Aucune requête" in result.update["errors"][0]
+
+def test_execute_sql_reuses_cache_for_equivalent_sql():
+    """Deux formulations équivalentes de la même requête ne touchent la base qu'une fois."""
+    first = "SELECT nom_liste_candidat FROM vue_elus_uniquement WHERE nom_circonscription_norm LIKE '%tiapoum%' AND parti_politique_norm LIKE '%rhdp%'"
+    second = "select nom_liste_candidat from vue_elus_uniquement\nwhere parti_politique_norm like '%RHDP%' and nom_circonscription_norm like '%tiapoum%';"
+
+    expected = execute_sql_node({"sql_query": first}).update["sql_results"]
+    with patch("src.database.connection.ConnectionPool.connection") as mock_conn:
+        result = execute_sql_node({"sql_query": second})
+
+    mock_conn.assert_not_called()
+    assert result.update["sql_results"] == expected
+
+def test_execute_sql_caps_rows_and_counts_total():
+    """Au-delà de la limite, seules les premières lignes sont gardées ; le total exact est compté."""
+    query = "SELECT nom_liste_candidat, score_voix FROM vue_resultats_detailles"
+    with patch.object(execute_sql, "MAX_RESULT_ROWS", 50):
+        result = execute_sql_node({"sql_query": query})
+
+    update = result.update
+    assert len(update["sql_results"]) == 50
+    assert update["sql_truncated"] is True
+    assert update["sql_total_rows"] == 930
+    assert update["sql_total_exact"] is True
+
+def test_execute_sql_small_result_not_truncated():
+    """Un résultat sous la limite est complet."""
+    result = execute_sql_node({"sql_query": "SELECT region_nom FROM vue_stats_regionales"})
+
+    assert result.update["sql_truncated"] is False
+    assert result.update["sql_total_rows"] == len(result.update["sql_results"])
+
+def test_counting_stops_at_ceiling():
+    """Au-delà du plafond de comptage, le total devient une borne inférieure."""
+    query = "SELECT score_voix FROM candidats"
+    with patch.object(execute_sql, "MAX_COUNTED_ROWS", 100):
+        result = execute_sql.fetch_results(query, max_rows=10)
+
+    assert len(result.rows) == 10
+    assert result.total_rows == 100
+    assert result.total_exact is False
+
+def test_cached_truncated_result_not_reused_with_larger_cap():
+    """Un résultat tronqué en cache n'est pas servi si la limite demandée est plus grande."""
+    query = "SELECT score_voix FROM candidats"
+    execute_sql.fetch_results(query, max_rows=10)
+
+    result = execute_sql.fetch_results(query, max_rows=20)
+
+    assert len(result.rows) == 20
+    assert result.total_rows == 930
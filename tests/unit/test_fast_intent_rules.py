@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import patch
+from src.agent.nodes.classify_intent_sql import classify_intent_node
+from src.agent.nodes.fast_intent_rules import classify_with_rules, get_rule_stats, reset_rule_stats
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    reset_rule_stats()
+    yield
+    reset_rule_stats()
+
+@pytest.mark.parametrize("question, nature", [
+    ("Combien de sièges a gagné le RHDP ?", "aggregation"),
+    ("Quel est le taux de participation à Bouaké ?", "simple_retrieval"),
+    ("Quel est le taux de participation dans la région de Gbêkê ?", "simple_retrieval"),
+    ("Qui a gagné à Tiapoum ?", "simple_retrieval"),
+])
+def test_rules_classify_obvious_questions(question, nature):
+    """Les questions évidentes sont classées 'allowed' sans LLM."""
+    classification = classify_with_rules(question)
+
+    assert classification.request_validity == "allowed"
+    assert classification.query_nature == nature
+
+@pytest.mark.parametrize("question", [
+    "Qui a gagné ?",                               # lieu manquant -> clarification par le LLM
+    "Compare les scores du RHDP et du PDCI",       # comparaison
+    "Qui a gagné à Bouaké et à Korhogo ?",         # plusieurs lieux
+    "Fais un graphique des sièges du RHDP",        # visualisation
+    "Quelle est la capitale du Ghana ?",           # hors sujet
+    "Combien de candidats du RHDP n'ont pas été élus ?",  # négation
+    "Combien de sièges le PDCI a-t-il perdus ?",   # sens inversé
+])
+def test_rules_defer_to_llm(question):
+    """Hors des cas sûrs, la règle s'abstient."""
+    assert classify_with_rules(question) is None
+
+def test_rules_report_hit_rate():
+    """Les compteurs mesurent les appels LLM évités."""
+    classify_with_rules("Qui a gagné à Azaguié ?")
+    classify_with_rules("Qui a gagné ?")
+
+    stats = get_rule_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+@patch("src.agent.nodes.classify_intent_sql.get_llm_client")
+def test_classify_node_skips_llm_on_rule_hit(MockGetClient):
+    """Le nœud de classification n'appelle pas Mistral quand une règle répond."""
+    result = classify_intent_node({"user_query": "Combien de sièges a gagné le RHDP ?"})
+
+    assert result.goto == "recherche_similaire"
+    MockGetClient.assert_not_called()
@@ -0,0 +1,87 @@
+import pytest
+from src.agent.gazetteer import Gazetteer, get_gazetteer, sql_filter, format_resolved_entities
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return get_gazetteer()
+
+@pytest.mark.parametrize("mention, kind, alias", [
+    ("Gbêkê", "region", "gbeke"),
+    ("abidjan", "region", "abidjan"),
+    ("PDCI", "parti", "pdci"),
+    ("Bouaké", "circonscription", "bouake"),
+    ("Bouké", "circonscription", "bouake"),       # faute de frappe
+    ("Korogo", "circonscription", "korhogo"),     # faute de frappe
+])
+def test_resolve_mentions(gazetteer, mention, kind, alias):
+    """Les mentions usuelles (accents, sigles, fautes) sont résolues vers un alias connu."""
+    matches = gazetteer.resolve(mention, kind=kind)
+
+    assert matches and matches[0][1] == alias
+
+def test_resolve_unknown_mention(gazetteer):
+    """Un mot sans rapport n'est rattaché à aucune entité."""
+    assert gazetteer.resolve("Ouagadougou") == []
+
+def test_entities_map_to_exact_values(gazetteer):
+    """Les entités d'une question pointent vers les valeurs *_norm exactes de la base."""
+    entities = gazetteer.entities("combien de sieges a gagne le pdci a abidjan")
+
+    assert entities["region"] == {"abidjan": ["district autonome d'abidjan"]}
+    assert set(entities["parti"]["pdci"]) == {"pdci-rda", "pdci-rda - eds"}
+
+def test_common_words_are_not_entities(gazetteer):
+    """Les mots courants d'une question ne sont pas pris pour des fautes de frappe."""
+    entities = gazetteer.entities("quelle region a le plus fort taux de participation")
+
+    assert not any(entities.values())
+
+def test_sql_filter_uses_equality():
+    """Une valeur -> '=', plusieurs -> IN ; les apostrophes sont échappées."""
+    assert sql_filter("region", ["n'zi"]) == "region_nom_norm = 'n''zi'"
+    assert sql_filter("parti", ["b", "a", "a"]) == "parti_politique_norm IN ('a', 'b')"
+
+def test_resolved_entities_for_prompt():
+    """Le bloc injecté dans le prompt SQL donne le filtre exact à utiliser."""
+    block = format_resolved_entities("Qui a gagné dans le Gbêkê ?")
+
+    assert "region_nom_norm = 'gbeke'" in block
+
+def test_gazetteer_from_entries():
+    """Le gazetteer se construit aussi sans base (entrées fournies)."""
+    gazetteer = Gazetteer({"circonscription": {"tiapoum": ["noe, nouamou et tiapoum"]}})
+
+    assert gazetteer.entities("qui a gagne a tiapum")["circonscription"] == {"tiapoum": ["noe, nouamou et tiapoum"]}
+
+def test_party_label_is_not_a_candidate(gazetteer):
+    """"independant" est une étiquette de parti, jamais un filtre sur le nom du candidat."""
+    entities = gazetteer.entities("combien de candidats independant ont ete elus")
+
+    assert "independant" in entities["parti"]
+    assert entities["candidat"] == {}
+
+def test_gazetteer_rebuilt_when_database_changes():
+    """L'index est reconstruit quand la signature du fichier .db change, réutilisé sinon."""
+    from unittest.mock import patch
+    from src.database.connection import DatabaseConnection
+
+    first = get_gazetteer()
+    assert get_gazetteer() is first
+    with patch.object(DatabaseConnection, "file_signature", return_value=(0, 0, 0)):
+        rebuilt = get_gazetteer()
+
+    assert rebuilt is not first
+
+def test_answer_and_clarification_prompts_use_database_regions():
+    """Les prompts de réponse et de clarification reprennent la liste des régions de la base."""
+    from src.agent.gazetteer import format_region_list
+    from src.agent.nodes.generate_final_answer_sql import _build_answer_prompt
+    from src.agent.nodes.generate_clarification_node import _build_clarification_prompt
+    from src.database.result_set import ResultSet
+
+    regions = format_region_list()
+    answer = _build_answer_prompt({"user_query": "Qui a gagné à Tiapoum ?", "sql_results": ResultSet.from_rows(["nom"], [("X",)])})
+    clarification = _build_clarification_prompt({"user_query": "Résultats ?", "classification": None})
+
+    assert "'tchologo'" in regions
+    assert regions in answer and regions in clarification
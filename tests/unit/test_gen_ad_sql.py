@@ -0,0 +1,95 @@
+import sqlite3
+import pytest
+from unittest.mock import patch, MagicMock
+from src.agent.nodes.generate_adapte_sql import generate_sql_query_node
+from src.agent.gazetteer import DB_PATH
+from src.agent.nodes.sql_templates import render_sql_template, get_template_stats, reset_template_stats
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    reset_template_stats()
+    yield
+    reset_template_stats()
+
+@pytest.mark.parametrize("question, template", [
+    ("Combien de sièges a gagné le RHDP ?", "seats_per_party"),
+    ("Combien de sièges par parti ?", "seats_per_party"),
+    ("Qui a gagné à Tiapoum ?", "winner_per_constituency"),
+    ("Quel est le taux de participation à Abidjan ?", "participation"),
+    ("Taux de participation par région", "participation"),
+    ("Top 5 des candidats à Bouaké", "top_scores"),
+])
+def test_templates_cover_frequent_questions(question, template):
+    """Les formes fréquentes produisent un SQL exécutable sans LLM."""
+    name, sql = render_sql_template(question)
+
+    assert name == template
+    with sqlite3.connect(DB_PATH) as conn:
+        assert conn.execute(sql).fetchall()
+
+def test_template_fills_slots():
+    """Les slots (parti, lieu, N) sont remplis avec les valeurs exactes de la base."""
+    _, sql = render_sql_template("Les 3 meilleurs scores du PDCI à Abidjan")
+
+    assert "parti_politique_norm IN ('pdci-rda', 'pdci-rda - eds')" in sql
+    assert "region_nom_norm = 'district autonome d''abidjan'" in sql
+    assert sql.endswith("LIMIT 3")
+
+def test_count_of_elected_in_place():
+    """"Combien d'élus à Bouaké" : un nombre d'élus, pas la liste des vainqueurs."""
+    name, sql = render_sql_template("Combien d'élus à Bouaké ?")
+
+    assert name == "seats_per_party"
+    assert sql.startswith("SELECT COUNT(*) AS nombre_sieges FROM vue_elus_uniquement WHERE ")
+    with sqlite3.connect(DB_PATH) as conn:
+        ((count,),) = conn.execute(sql).fetchall()
+        winners = conn.execute(render_sql_template("Qui a gagné à Bouaké ?")[1]).fetchall()
+    assert count == len(winners) > 0
+
+@pytest.mark.parametrize("question", [
+    "Compare les scores du RHDP et du PDCI",
+    "Qui a gagné à Bouaké et à Korhogo ?",
+    "Quel candidat a le nom le plus long ?",
+])
+def test_no_template_when_ambiguous(question):
+    """Sans correspondance sûre, aucun template n'est appliqué."""
+    assert render_sql_template(question) is None
+    assert get_template_stats()["misses"] == 1
+
+@pytest.mark.parametrize("question", [
+    "Combien de candidats du RHDP n'ont pas été élus ?",             # négation
+    "Combien de sièges le RHDP a-t-il perdus ?",                     # négation
+    "Top 5 des candidats les moins votés",                           # ordre inverse
+    "Top 5 des candidats avec le score le plus faible à Bouaké",     # ordre inverse
+    "Top 3 des partis en nombre de voix",                            # unité classée : les partis
+    "Classement des circonscriptions du Poro par taux de participation",  # classement dans une région
+    "Circonscriptions avec la plus forte participation dans le Poro",     # classement dans une région
+    "Combien de sièges a gagné le RHDP en 2021 ?",                   # année
+    "Qui a gagné à Korhogo commune ?",                               # commune / ville : ignorées par le gazetteer
+    "Quel est le taux de participation à Abidjan commune ?",
+    "Qui a gagné à Bouaké sous-préfecture ?",
+])
+def test_no_template_for_unsupported_forms(question):
+    """Négation, ordre inverse, partis classés, classement interne, année ou commune : le LLM génère le SQL."""
+    assert render_sql_template(question) is None
+
+@patch("src.agent.nodes.generate_adapte_sql.get_llm_client")
+def test_node_uses_template_without_llm(mock_get_client):
+    """Sur une question fréquente, le nœud ne contacte pas Mistral."""
+    result = generate_sql_query_node({"user_query": "Qui a gagné à Tiapoum ?", "errors": []})
+
+    mock_get_client.assert_not_called()
+    assert result.goto == "verify_sql"
+    assert "vue_elus_uniquement" in result.update["sql_query"]
+
+@patch("src.agent.nodes.generate_adapte_sql.get_llm_client")
+def test_node_falls_back_to_llm_on_retry(mock_get_client):
+    """Après une erreur, la correction passe par le LLM."""
+    mock_client = MagicMock()
+    mock_client.invoke.return_value = MagicMock(content="SELECT 1")
+    mock_get_client.return_value = mock_client
+
+    result = generate_sql_query_node({"user_query": "Qui a gagné à Tiapoum ?", "errors": ["no such column"]})
+
+    mock_client.invoke.assert_called_once()
+    assert result.update["sql_query"] == "SELECT 1"
@@ -0,0 +1,90 @@
+import numpy as np
+from src.agent.chart_renderer import render_png
+from src.agent.nodes.generate_chart_sql import (
+    _prepare_data_for_plotting, _bar_spec, is_additive, MAX_CATEGORIES, MAX_PIE_SLICES, MAX_LINE_POINTS, HISTOGRAM_MAX_BINS,
+)
+from src.database.result_set import ResultSet
+
+def _results(n):
+    return ResultSet.from_rows(["circonscription", "votants"], [(f"C{i:03d}", (i * 37) % 1000) for i in range(n)])
+
+def test_bar_tail_folded_into_autres():
+    """Au-delà de MAX_CATEGORIES, les plus petites valeurs sont regroupées dans "Autres" (total conservé)."""
+    results = _results(300)
+    labels, values, _, _ = _prepare_data_for_plotting(results)
+
+    assert len(labels) == MAX_CATEGORIES
+    assert labels[-1] == "Autres"
+    assert values.sum() == results.column("votants").sum()
+    kept = values[:-1]
+    assert kept.min() >= np.sort(results.column("votants"))[-(MAX_CATEGORIES - 1)]
+
+def test_small_result_untouched():
+    """Peu de lignes : ni regroupement ni réordonnancement."""
+    labels, values, _, _ = _prepare_data_for_plotting(_results(5))
+
+    assert labels == ["C000", "C001", "C002", "C003", "C004"]
+    assert values.tolist() == [0, 37, 74, 111, 148]
+
+def test_pie_uses_fewer_slices():
+    """Un camembert garde au plus MAX_PIE_SLICES parts."""
+    labels, _, _, _ = _prepare_data_for_plotting(_results(50), "pie")
+
+    assert len(labels) == MAX_PIE_SLICES
+
+def test_histogram_computes_bins():
+    """Un histogramme compte les lignes par classe de valeurs."""
+    labels, counts, x_label, y_label = _prepare_data_for_plotting(_results(1000), "histogram")
+
+    assert len(labels) <= HISTOGRAM_MAX_BINS
+    assert counts.sum() == 1000
+    assert (x_label, y_label) == ("votants", "effectif")
+
+def test_line_downsampled():
+    """Une longue série est ramenée à MAX_LINE_POINTS points, extrémités gardées."""
+    labels, values, _, _ = _prepare_data_for_plotting(_results(5000), "line")
+
+    assert len(values) <= MAX_LINE_POINTS
+    assert labels[0] == "C000" and labels[-1] == "C4999"
+
+def test_render_size_independent_of_rows():
+    """La taille de la spécification ne dépend plus du nombre de lignes."""
+    small, large = _bar_spec(_results(25)), _bar_spec(_results(5000))
+
+    assert len(small["labels"]) == len(large["labels"]) == MAX_CATEGORIES
+    assert render_png(large).startswith(b"\x89PNG")
+
+def test_rate_tail_summarized_by_median():
+    """Un taux ne se somme pas : la queue est résumée par sa médiane, jamais plus haute que les barres gardées."""
+    rates = [(f"C{i:03d}", 40 + (i * 7) % 50) for i in range(200)]
+    results = ResultSet.from_rows(["circonscription", "taux_participation"], rates)
+    labels, values, _, _ = _prepare_data_for_plotting(results)
+
+    assert labels[-1] == "Autres (médiane)"
+    assert values[-1] <= values[:-1].min()
+    assert values[-1] == np.median(np.sort(results.column("taux_participation"))[:-(MAX_CATEGORIES - 1)])
+
+def test_additive_columns():
+    """Seuls les comptages et les voix sont sommés."""
+    assert is_additive("score_voix") and is_additive("nombre_sieges") and is_additive("COUNT(*)")
+    assert not is_additive("taux_participation") and not is_additive("part_voix_regionale")
+    assert not is_additive("marge_voix") and not is_additive("annee")
+    assert is_additive("voix_parti") and is_additive("sieges_par_parti") and is_additive("total_voix_departement")
+    assert not is_additive("moyenne_voix") and not is_additive("AVG(score_voix)") and not is_additive("parts_voix")
+
+def test_votes_per_party_tail_summed():
+    """Voix par parti : "parti" n'est pas "part", la queue du camembert est sommée (total conservé)."""
+    results = ResultSet.from_rows(["parti", "voix_parti"], [(f"P{i:02d}", 100 + i * 13) for i in range(42)])
+    labels, values, _, _ = _prepare_data_for_plotting(results, "pie")
+
+    assert labels[-1] == "Autres"
+    assert values.sum() == results.column("voix_parti").sum()
+
+def test_numeric_only_result_keeps_label_and_value_distinct():
+    """(annee, voix) sans colonne texte : voix par année, pas un histogramme des années."""
+    results = ResultSet.from_rows(["annee", "voix"], [(2016, 1200), (2021, 1500)])
+
+    labels, values, label_key, value_key = _prepare_data_for_plotting(results)
+
+    assert (label_key, value_key) == ("annee", "voix")
+    assert labels == ["2016", "2021"] and values.tolist() == [1200, 1500]
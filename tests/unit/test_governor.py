@@ -0,0 +1,80 @@
+import sqlite3
+import time
+import pytest
+from unittest.mock import patch
+from src.database import governor
+from src.database.governor import governed, QueryAborted
+from src.agent.nodes import execute_sql
+from src.agent.nodes.verify_sql import verify_sql_node
+
+# CTE récursive : des centaines de millions de lignes si rien ne l'arrête
+ENDLESS = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    execute_sql._RESULT_CACHE.clear()
+    yield
+    execute_sql._RESULT_CACHE.clear()
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+def test_vm_step_budget_aborts_query(conn):
+    """Au-delà du budget d'instructions, la requête est interrompue avec une erreur structurée."""
+    with pytest.raises(QueryAborted) as excinfo:
+        with governed(conn, deadline_s=30, max_vm_steps=100_000):
+            conn.execute(ENDLESS).fetchall()
+
+    assert excinfo.value.reason == "vm_steps"
+    assert "REQUÊTE INTERROMPUE" in str(excinfo.value)
+
+def test_deadline_aborts_query(conn):
+    """L'échéance interrompt la requête même avec un budget d'instructions illimité."""
+    start = time.monotonic()
+    with pytest.raises(QueryAborted) as excinfo:
+        with governed(conn, deadline_s=0.05, max_vm_steps=10**15):
+            conn.execute(ENDLESS).fetchall()
+
+    assert excinfo.value.reason == "deadline"
+    assert time.monotonic() - start < 2
+
+def test_watchdog_interrupts_without_progress_handler(conn):
+    """Sans appel du progress handler, le watchdog interrompt la connexion à l'échéance."""
+    with patch.object(governor, "CHECK_EVERY", 10**9):
+        with pytest.raises(QueryAborted) as excinfo:
+            with governed(conn, deadline_s=0.05, max_vm_steps=10**15):
+                conn.execute(ENDLESS).fetchall()
+
+    assert excinfo.value.reason == "deadline"
+
+def test_connection_usable_after_abort(conn):
+    """Après une interruption, la connexion sert normalement (handler retiré, pas d'interruption résiduelle)."""
+    with pytest.raises(QueryAborted):
+        with governed(conn, deadline_s=30, max_vm_steps=100_000):
+            conn.execute(ENDLESS).fetchall()
+
+    time.sleep(0.05)
+    assert conn.execute("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n LIMIT 100000) "
+                        "SELECT COUNT(*) FROM n").fetchone()[0] == 100000
+
+def test_cartesian_join_sent_back_to_generation():
+    """Une jointure cartésienne trop coûteuse repart vers la génération avec l'erreur du gouverneur."""
+    query = "SELECT COUNT(*) FROM candidats a, candidats b, candidats c"
+    with patch.object(governor, "MAX_VM_STEPS", 1_000_000):
+        result = verify_sql_node({"sql_query": query, "errors": []})
+
+    assert result.goto == "generate_sql"
+    assert result.update["errors"][0].startswith("REQUÊTE INTERROMPUE")
+
+def test_counting_interrupted_keeps_rows():
+    """Si le budget s'épuise pendant le comptage, les lignes lues sont gardées, total partiel."""
+    query = "SELECT a.score_voix FROM candidats a, candidats b"
+    with patch.object(governor, "MAX_VM_STEPS", 1_000_000):
+        result = execute_sql.fetch_results(query, max_rows=10)
+
+    assert len(result.rows) == 10
+    assert result.total_exact is False
+    assert result.total_rows > 10
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+from pathlib import Path
+from src.agent import graph
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+def test_graph_import_does_not_load_heavy_libraries():
+    """Importer et construire le graphe ne charge ni SQLAlchemy, ni matplotlib, ni le client Mistral, ni pandas."""
+    snippet = (
+        "import sys\n"
+        "from src.agent.graph import build_agent_graph\n"
+        "build_agent_graph(); build_agent_graph(async_mode=True, mode='speculative')\n"
+        "print(','.join(m for m in ('sqlalchemy', 'matplotlib', 'langchain_mistralai', 'pandas') if m in sys.modules))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", snippet], cwd=PROJECT_ROOT, capture_output=True, text=True)
+
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ""
+
+def test_lazy_node_resolves_module_function():
+    """Le nœud différé appelle la fonction du module au moment de l'exécution (patchs compris)."""
+    from unittest.mock import patch
+    from src.agent.nodes import classify_intent_sql
+
+    node = graph._lazy_node("classify_intent_sql", "reponse_politique_node")
+    with patch.object(classify_intent_sql, "reponse_politique_node", return_value="patched") as mock_node:
+        assert node({"user_query": "q"}) == "patched"
+
+    mock_node.assert_called_once_with({"user_query": "q"})
+    assert node.__name__ == "reponse_politique_node"
@@ -0,0 +1,38 @@
+import pytest
+from src.agent.llm_client import get_llm_client, reset_llm_clients
+from src.agent.state import UserQueryClassification
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setenv("MISTRAL_API_KEY", "test-key")
+    reset_llm_clients()
+    yield
+    reset_llm_clients()
+
+def test_registry_returns_shared_client():
+    """Le même modèle renvoie toujours le même client (et donc le même pool HTTP)."""
+    first = get_llm_client()
+    second = get_llm_client()
+
+    assert first is second
+    assert first.llm.client is second.llm.client
+
+def test_new_api_key_creates_new_client(monkeypatch):
+    """Une nouvelle clé saisie dans l'UI ne réutilise pas l'ancien client."""
+    first = get_llm_client()
+    monkeypatch.setenv("MISTRAL_API_KEY", "other-key")
+
+    assert get_llm_client() is not first
+
+def test_structured_runnable_cached_per_schema():
+    """with_structured_output n'est construit qu'une fois par schéma."""
+    client = get_llm_client()
+
+    assert client._get_structured_llm(UserQueryClassification) is client._get_structured_llm(UserQueryClassification)
+
+def test_missing_api_key_raises(monkeypatch):
+    """Sans clé, la création du client échoue explicitement."""
+    monkeypatch.delenv("MISTRAL_API_KEY")
+
+    with pytest.raises(ValueError):
+        get_llm_client()
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+from pathlib import Path
+import pytest
+from src.agent.gazetteer import DB_PATH
+from src.database.query_rewrite import rewrite_like_to_fts, available_fts_tables, full_table_scans
+
+EXAMPLES_PATH = Path(__file__).resolve().parents[2] / "src" / "agent" / "few_shot_examples" / "few_shot_examples.json"
+SMALL_ROLLUPS = {"vue_stats_regionales", "stats_sieges_partis", "stats_voix_partis_regions"}
+
+FTS = {"fts_circonscriptions", "fts_candidats"}
+
+def test_like_rewritten_to_fts_lookup():
+    """Un LIKE '%terme%' sur une colonne _norm passe par la table FTS5."""
+    query = "SELECT * FROM vue_elus_uniquement WHERE ci.nom_circonscription_norm LIKE '%agboville%'"
+
+    assert rewrite_like_to_fts(query, FTS) == (
+        "SELECT * FROM vue_elus_uniquement WHERE ci.nom_circonscription_norm IN "
+        "(SELECT nom_circonscription_norm FROM fts_circonscriptions WHERE nom_circonscription_norm LIKE '%agboville%')"
+    )
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM candidats WHERE parti_politique_norm NOT LIKE '%rhdp%'",     # négation
+    "SELECT * FROM candidats WHERE parti_politique_norm LIKE 'rhdp%'",          # préfixe : B-tree possible
+    "SELECT * FROM candidats WHERE score_voix LIKE '%12%'",                     # colonne non indexée
+    "SELECT 'parti_politique_norm LIKE ''%x%''' FROM candidats",                # dans un littéral
+])
+def test_unsafe_predicates_left_untouched(query):
+    """Les cas où la réécriture n'apporte rien ou changerait le sens ne sont pas touchés."""
+    assert rewrite_like_to_fts(query, FTS) == query
+
+def test_no_rewrite_without_fts_tables():
+    """Sans table FTS dans la base, la requête est inchangée."""
+    query = "SELECT * FROM candidats WHERE parti_politique_norm LIKE '%rhdp%'"
+
+    assert rewrite_like_to_fts(query, set()) == query
+
+@pytest.mark.parametrize("query", [
+    "SELECT nom_circonscription FROM circonscriptions WHERE nom_circonscription_norm LIKE '%agboville%'",
+    "SELECT COUNT(*) FROM vue_elus_uniquement WHERE parti_politique_norm LIKE '%pdci%'",
+    "SELECT nom_liste_candidat FROM vue_resultats_detailles WHERE nom_liste_candidat_norm LIKE '%kouame%' "
+    "AND region_nom_norm LIKE '%abidjan%'",
+    "SELECT * FROM vue_elus_uniquement WHERE nom_circonscription_norm LIKE '%bouake%sous%'",
+    "SELECT * FROM vue_stats_regionales WHERE region_nom_norm LIKE '%abidjan%'",
+])
+def test_rewritten_query_returns_same_rows(query):
+    """La requête réécrite renvoie exactement les mêmes lignes sur la base livrée."""
+    with sqlite3.connect(DB_PATH) as conn:
+        fts_tables = available_fts_tables(conn)
+        rewritten = rewrite_like_to_fts(query, fts_tables)
+
+        assert fts_tables == FTS
+        assert rewritten != query
+        assert sorted(conn.execute(rewritten).fetchall()) == sorted(conn.execute(query).fetchall())
+
+def test_full_table_scan_detected():
+    """Un filtre sur une colonne non indexée est signalé comme parcours complet."""
+    with sqlite3.connect(DB_PATH) as conn:
+        assert full_table_scans(conn, "SELECT * FROM candidats WHERE pourcentage_voix > 0.5") == ["candidats"]
+        assert full_table_scans(conn, "SELECT * FROM vue_stats_regionales", allowed=SMALL_ROLLUPS) == []
+
+def test_index_scan_without_constraint_detected():
+    """Un parcours complet d'index (couvrant ou non) compte comme parcours ; une recherche bornée non."""
+    with sqlite3.connect(DB_PATH) as conn:
+        assert full_table_scans(conn, "SELECT score_voix FROM candidats ORDER BY score_voix") == ["candidats"]
+        assert full_table_scans(conn, "SELECT * FROM candidats ORDER BY score_voix") == ["candidats"]
+        assert full_table_scans(conn, "SELECT COUNT(*) FROM candidats WHERE score_voix > 10") == []
+
+def test_few_shot_queries_use_indexes():
+    """Les requêtes des exemples (après réécriture FTS) ne parcourent aucune table de base entièrement."""
+    with open(EXAMPLES_PATH, "r", encoding="utf-8") as f:
+        examples = json.load(f)
+
+    with sqlite3.connect(DB_PATH) as conn:
+        fts_tables = available_fts_tables(conn)
+        for example in examples:
+            query = rewrite_like_to_fts(example["sql_query"], fts_tables)
+            assert full_table_scans(conn, query, allowed=SMALL_ROLLUPS) == [], example["intention"]
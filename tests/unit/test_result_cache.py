@@ -0,0 +1,50 @@
+import pytest
+from src.database.result_cache import QueryResultCache, canonicalize_sql
+
+def test_canonicalize_folds_case_spaces_and_semicolons():
+    """Casse des mots-clés, espaces et points-virgules finaux n'influencent pas la clé."""
+    a = "SELECT score_voix FROM vue_resultats_detailles WHERE score_voix > 10000;"
+    b = "select score_voix\n  from vue_resultats_detailles where score_voix>10000"
+    assert canonicalize_sql(a) == canonicalize_sql(b)
+
+def test_canonicalize_sorts_like_conjuncts():
+    """L'ordre des filtres LIKE d'un WHERE conjonctif n'a pas d'importance."""
+    a = "SELECT * FROM t WHERE a LIKE '%X%' AND b LIKE '%y%'"
+    b = "SELECT * FROM t WHERE b LIKE '%y%' AND a LIKE '%x%'"
+    assert canonicalize_sql(a) == canonicalize_sql(b)
+
+def test_canonicalize_keeps_equality_literals_and_or_order():
+    """Les littéraux hors LIKE et les conditions OR restent intacts."""
+    assert canonicalize_sql("SELECT * FROM t WHERE a = 'X'") != canonicalize_sql("SELECT * FROM t WHERE a = 'x'")
+    assert "a=1 or b=2" in canonicalize_sql("SELECT * FROM t WHERE a = 1 OR b = 2")
+
+def test_cache_bounded_by_entries_and_bytes():
+    """Le cache évince les entrées les plus anciennes au-delà des bornes."""
+    cache = QueryResultCache(max_entries=2, max_bytes=10_000)
+    for i in range(3):
+        cache.set(f"SELECT {i}", ("sig",), [{"v": i}])
+
+    assert len(cache) == 2
+    assert cache.get("SELECT 0", ("sig",)) is None
+
+    cache.set("SELECT big", ("sig",), [{"v": "x" * 20_000}])
+    assert cache.get("SELECT big", ("sig",)) is None
+    assert cache.total_bytes <= 10_000
+
+def test_cache_invalidated_when_database_changes():
+    """Une nouvelle signature de fichier vide le cache."""
+    cache = QueryResultCache()
+    cache.set("SELECT 1", ("v1",), [{"v": 1}])
+
+    assert cache.get("SELECT 1", ("v1",)).records() == [{"v": 1}]
+    assert cache.get("SELECT 1", ("v2",)) is None
+
+def test_metadata_stored_with_rows():
+    """Les métadonnées (troncature, total) sont rendues avec les lignes."""
+    cache = QueryResultCache()
+    cache.set("SELECT 1", ("sig",), [{"a": 1}], meta={"total_rows": 42})
+
+    rows, meta = cache.get_entry("SELECT 1", ("sig",))
+
+    assert rows.records() == [{"a": 1}]
+    assert meta == {"total_rows": 42}
@@ -0,0 +1,52 @@
+import json
+import numpy as np
+from src.database.result_set import ResultSet
+from src.agent.nodes.generate_final_answer_sql import _format_results_to_markdown
+from src.agent.nodes.generate_chart_sql import _prepare_data_for_plotting
+
+ROWS = [("RHDP", 155, 0.62), ("PDCI-RDA", 32, 0.13), ("INDEPENDANT", 31, None)]
+
+def _results():
+    return ResultSet.from_rows(["parti", "sieges", "part"], ROWS)
+
+def test_columns_typed_once():
+    """Noms et types sont stockés une fois ; les colonnes numériques sont des tableaux NumPy."""
+    results = _results()
+
+    assert results.columns == ("parti", "sieges", "part")
+    assert results.types == ("text", "integer", "mixed")
+    assert results.column("sieges").dtype == np.int64
+    assert results.row(0) == {"parti": "RHDP", "sieges": 155, "part": 0.62}
+
+def test_to_pandas_shares_numeric_columns():
+    """La conversion pandas ne copie pas les colonnes numériques."""
+    results = _results()
+    df = results.to_pandas()
+
+    assert list(df.columns) == ["parti", "sieges", "part"]
+    assert np.shares_memory(df["sieges"].to_numpy(), results.column("sieges"))
+
+def test_json_round_trip_is_columnar():
+    """Le JSON porte les noms une seule fois et redonne le même résultat."""
+    results = _results()
+    payload = json.loads(json.dumps(results.to_json()))
+
+    assert payload["data"][0] == ["RHDP", "PDCI-RDA", "INDEPENDANT"]
+    assert ResultSet.from_json(payload) == results
+    assert ResultSet.from_json(results.records()) == results
+
+def test_columns_read_only():
+    """Le cache partage le même objet : les colonnes ne sont pas modifiables."""
+    results = _results()
+
+    assert not results.column("sieges").flags.writeable
+
+def test_markdown_and_plotting_helpers():
+    """Le tableau Markdown et la préparation du graphique lisent les colonnes directement."""
+    results = _results()
+    labels, values, label_key, value_key = _prepare_data_for_plotting(results)
+
+    assert _format_results_to_markdown(results).splitlines()[2] == "| RHDP | 155 | 0.62 |"
+    assert (label_key, value_key) == ("parti", "sieges")
+    assert labels == ["RHDP", "PDCI-RDA", "INDEPENDANT"]
+    assert values.tolist() == [155, 32, 31]
@@ -0,0 +1,56 @@
+import shutil
+import sqlite3
+import pytest
+from src.agent.gazetteer import DB_PATH
+from src.database.schema import MATERIALIZED_ROLLUPS
+from src.database.rollups import materialize_rollups, check_rollups
+
+@pytest.fixture
+def db_copy(tmp_path):
+    path = tmp_path / "elections.db"
+    shutil.copy(DB_PATH, path)
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+def test_shipped_database_rollups_are_tables():
+    """Les agrégats de la base livrée sont des tables physiques indexées, pas des vues."""
+    with sqlite3.connect(DB_PATH) as conn:
+        kinds = dict(conn.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view')").fetchall())
+        indexed = {row[0] for row in conn.execute("SELECT tbl_name FROM sqlite_master WHERE type = 'index'")}
+
+    for name in MATERIALIZED_ROLLUPS:
+        assert kinds[name] == "table"
+        assert name in indexed
+
+def test_shipped_database_rollups_are_consistent():
+    """Les agrégats livrés correspondent au recalcul depuis les tables de base."""
+    with sqlite3.connect(DB_PATH) as conn:
+        assert check_rollups(conn) == []
+
+def test_consistency_check_detects_drift(db_copy):
+    """Une table de base modifiée sans rematérialisation est signalée."""
+    db_copy.execute("UPDATE circonscriptions SET votants = votants + 1 WHERE id = 1")
+
+    problems = check_rollups(db_copy)
+
+    assert any("vue_stats_regionales" in p for p in problems)
+
+def test_materialize_replaces_views(db_copy):
+    """La matérialisation remplace une ancienne vue du même nom et reste cohérente."""
+    db_copy.execute("DROP TABLE vue_elus_uniquement")
+    db_copy.execute("CREATE VIEW vue_elus_uniquement AS SELECT * FROM vue_resultats_detailles WHERE est_elu = 1")
+
+    materialize_rollups(db_copy)
+
+    kind = db_copy.execute("SELECT type FROM sqlite_master WHERE name = 'vue_elus_uniquement'").fetchone()[0]
+    assert kind == "table"
+    assert check_rollups(db_copy) == []
+
+def test_seats_rollup_matches_elected_count():
+    """Les sièges par parti totalisent le nombre d'élus."""
+    with sqlite3.connect(DB_PATH) as conn:
+        seats = conn.execute("SELECT SUM(nombre_sieges) FROM stats_sieges_partis").fetchone()[0]
+        elected = conn.execute("SELECT COUNT(*) FROM candidats WHERE est_elu = 1").fetchone()[0]
+
+    assert seats == elected
@@ -0,0 +1,104 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from src.agent.nodes.speculative_classify import speculative_classify_node, aspeculative_classify_node, guess_query_nature
+from src.agent.state import UserQueryClassification
+from src.agent.nodes.sql_templates import get_template_stats, reset_template_stats
+
+QUESTION = "Quel est le poids total du RHDP dans la nouvelle assemblée ?"
+DELAY = 0.3
+
+def _classification(validity, nature="aggregation"):
+    return UserQueryClassification(request_validity=validity, query_nature=nature, reasoning_summary="Test")
+
+def _slow(value, delay=DELAY):
+    def _call(*args, **kwargs):
+        time.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return _call
+
+def _aslow(value, calls=None, delay=DELAY):
+    async def _call(*args, **kwargs):
+        await asyncio.sleep(delay)
+        if calls is not None:
+            calls.append("completed")
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return _call
+
+def _clients(validity, sql_response, nature="aggregation", calls=None):
+    classifier, generator = MagicMock(), MagicMock()
+    # Classification plus rapide que la génération quand on vérifie l'annulation
+    classify_delay = DELAY / 3 if calls is not None else DELAY
+    classifier.invoke_structured.side_effect = _slow(_classification(validity, nature), classify_delay)
+    classifier.ainvoke_structured.side_effect = _aslow(_classification(validity, nature), delay=classify_delay)
+    generator.ainvoke.side_effect = _aslow(sql_response, calls)
+    return classifier, generator
+
+def _run(node, validity, sql_response=MagicMock(content="SELECT 1"), nature="aggregation", calls=None):
+    classifier, generator = _clients(validity, sql_response, nature, calls)
+    with patch("src.agent.nodes.classify_intent_sql.get_llm_client", return_value=classifier), \
+         patch("src.agent.nodes.generate_adapte_sql.get_llm_client", return_value=generator):
+        start = time.perf_counter()
+        result = node({"user_query": QUESTION, "errors": []})
+        if asyncio.iscoroutine(result):
+            result = asyncio.run(result)
+        return result, time.perf_counter() - start
+
+@pytest.mark.parametrize("node", [speculative_classify_node, aspeculative_classify_node])
+def test_speculation_overlaps_classification_and_sql(node):
+    """Question autorisée : le SQL spéculatif est retenu et les deux appels se recouvrent."""
+    result, elapsed = _run(node, "allowed")
+
+    assert result.goto == "verify_sql"
+    assert result.update["sql_query"] == "SELECT 1"
+    assert result.update["classification"].request_validity == "allowed"
+    assert elapsed < 2 * DELAY
+
+@pytest.mark.parametrize("node", [speculative_classify_node, aspeculative_classify_node])
+def test_speculation_discarded_when_not_allowed(node):
+    """Question hors sujet : le SQL spéculatif est jeté sans attendre la génération."""
+    calls = []
+    result, _ = _run(node, "out_of_scope", calls=calls)
+    time.sleep(2 * DELAY)
+
+    assert result.goto == "reponse_hors_sujet"
+    assert "sql_query" not in result.update
+    # L'appel LLM spéculatif a été annulé, pas seulement ignoré
+    assert calls == []
+
+def test_speculation_discarded_when_nature_differs():
+    """Nature retenue différente de la nature supposée : le SQL spéculatif n'est pas réutilisé."""
+    result, _ = _run(speculative_classify_node, "allowed", nature="ranking")
+
+    assert result.goto == "recherche_similaire"
+    assert "sql_query" not in result.update
+
+@pytest.mark.parametrize("node", [speculative_classify_node, aspeculative_classify_node])
+def test_template_stats_counted_only_when_speculation_used(node):
+    """La question n'est comptée dans les statistiques des templates que si le SQL spéculatif est retenu."""
+    reset_template_stats()
+    _run(node, "allowed", nature="ranking")
+    assert get_template_stats()["misses"] == 0
+
+    _run(node, "allowed")
+    assert get_template_stats()["misses"] == 1
+    reset_template_stats()
+
+def test_guess_query_nature():
+    """La nature supposée suit les mots de la question."""
+    assert guess_query_nature(QUESTION) == "aggregation"
+    assert guess_query_nature("Top 5 des candidats à Bouaké") == "ranking"
+    assert guess_query_nature("Compare le RHDP et le PDCI") == "comparison"
+    assert guess_query_nature("Qui a gagné à Tiapoum ?") == "simple_retrieval"
+
+def test_speculation_failure_falls_back_to_sequential_path():
+    """Si la génération spéculative échoue, on reprend le chemin classique."""
+    result, _ = _run(speculative_classify_node, "allowed", sql_response=Exception("timeout Mistral"))
+
+    assert result.goto == "recherche_similaire"
+    assert "sql_query" not in result.update
@@ -0,0 +1,86 @@
+import pytest
+from src.agent.nodes import execute_sql
+from src.database.result_cache import QueryResultCache
+from src.database.query_rewrite import rewrite_like_to_fts
+from src.database.sql_params import parameterize_sql, inline_params
+from src.database.schema import FTS_COLUMNS
+
+FTS_TABLES = {table for table, _ in FTS_COLUMNS.values()}
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    execute_sql._RESULT_CACHE.clear()
+    yield
+    execute_sql._RESULT_CACHE.clear()
+
+def test_values_extracted_as_named_params():
+    """Les valeurs comparées aux colonnes et le LIMIT deviennent des paramètres nommés."""
+    shape, params = parameterize_sql(
+        "SELECT nom FROM vue_elus_uniquement WHERE region_nom_norm LIKE '%Poro%' AND score_voix > 1000 LIMIT 5"
+    )
+
+    assert shape == ("SELECT nom FROM vue_elus_uniquement WHERE region_nom_norm LIKE :region_nom_norm "
+                     "AND score_voix > :score_voix LIMIT :limit")
+    assert params == {"region_nom_norm": "%poro%", "score_voix": 1000, "limit": 5}
+
+def test_different_entities_share_shape():
+    """Deux questions sur des entités différentes produisent la même forme de requête."""
+    shape_a, params_a = parameterize_sql("SELECT * FROM candidats WHERE parti_politique_norm LIKE '%rhdp%'")
+    shape_b, params_b = parameterize_sql("SELECT * FROM candidats WHERE parti_politique_norm LIKE '%pdci%'")
+
+    assert shape_a == shape_b
+    assert params_a != params_b
+
+def test_in_list_and_duplicate_columns():
+    """Les listes IN et les colonnes répétées reçoivent des noms distincts."""
+    shape, params = parameterize_sql("SELECT * FROM candidats WHERE score_voix IN (10, 20) OR score_voix = 30")
+
+    assert shape == ("SELECT * FROM candidats WHERE score_voix IN (:score_voix, :score_voix_2) "
+                     "OR score_voix = :score_voix_3")
+    assert params == {"score_voix": 10, "score_voix_2": 20, "score_voix_3": 30}
+
+def test_literals_outside_comparisons_untouched():
+    """Les littéraux hors comparaison (alias, CASE) restent dans la requête."""
+    query = "SELECT CASE WHEN est_elu = 1 THEN 'élu' ELSE 'battu' END AS statut FROM candidats"
+    shape, params = parameterize_sql(query)
+
+    assert "'élu'" in shape and "'battu'" in shape
+    assert params == {"est_elu": 1}
+
+def test_exponent_and_partial_numbers():
+    """Un littéral à exposant est lié en entier ; une valeur non numérique (0x1F) n'est pas découpée."""
+    shape, params = parameterize_sql("SELECT * FROM circonscriptions WHERE taux_participation > 0.5e2 AND code = 0x1F")
+
+    assert shape == "SELECT * FROM circonscriptions WHERE taux_participation > :taux_participation AND code = 0x1F"
+    assert params == {"taux_participation": 50.0}
+
+def test_inline_round_trip():
+    """La réinjection des valeurs redonne une requête équivalente (affichage)."""
+    query = "SELECT * FROM candidats WHERE nom_candidat = 'N''GUESSAN' LIMIT 3"
+    shape, params = parameterize_sql(query)
+
+    assert params["nom_candidat"] == "N'GUESSAN"
+    assert inline_params(shape, params) == query
+
+def test_fetch_results_with_params():
+    """La forme paramétrée s'exécute avec ses valeurs et donne le même résultat que la requête littérale."""
+    query = "SELECT COUNT(*) AS nb FROM vue_elus_uniquement WHERE parti_politique_norm LIKE '%rhdp%'"
+    shape, params = parameterize_sql(query)
+
+    assert execute_sql.fetch_results(shape, params).rows == execute_sql.fetch_results(query).rows
+
+def test_result_cache_keys_on_params():
+    """Même forme, valeurs différentes : deux entrées distinctes dans le cache de résultats."""
+    cache = QueryResultCache()
+    shape = "SELECT * FROM candidats WHERE score_voix > :score_voix"
+    cache.set(shape, ("sig",), [{"n": 1}], params={"score_voix": 10})
+
+    assert cache.get(shape, ("sig",), {"score_voix": 10}).records() == [{"n": 1}]
+    assert cache.get(shape, ("sig",), {"score_voix": 20}) is None
+
+def test_fts_rewrite_with_bound_pattern():
+    """Un LIKE paramétré '%...%' est servi par l'index FTS5 ; un préfixe reste un LIKE."""
+    shape = "SELECT * FROM circonscriptions WHERE nom_circonscription_norm LIKE :nom_circonscription_norm"
+
+    assert "fts_circonscriptions" in rewrite_like_to_fts(shape, FTS_TABLES, {"nom_circonscription_norm": "%agboville%"})
+    assert rewrite_like_to_fts(shape, FTS_TABLES, {"nom_circonscription_norm": "agbo%"}) == shape
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from src.agent.graph import build_agent_graph
+from src.agent.answer_cache import AnswerCache
+from src.agent.streaming import stream_agent_events
+from src.agent.state import UserQueryClassification
+
+QUESTION = "Combien de sièges le RHDP a-t-il remportés au total ?"
+
+def _run(agent):
+    classifier = MagicMock()
+    classifier.invoke_structured.return_value = UserQueryClassification(
+        request_validity="allowed", query_nature="aggregation", reasoning_summary="Test"
+    )
+    sql_client = MagicMock()
+    sql_client.invoke.return_value = MagicMock(
+        content="SELECT COUNT(*) AS sieges FROM vue_elus_uniquement WHERE parti_politique_norm LIKE '%rhdp%'"
+    )
+    answer_client = MagicMock()
+    answer_client.invoke = GenericFakeChatModel(messages=iter([AIMessage(content="Le RHDP a gagné.")])).invoke
+
+    with patch("src.agent.nodes.classify_intent_sql.get_llm_client", return_value=classifier), \
+         patch("src.agent.nodes.generate_adapte_sql.get_llm_client", return_value=sql_client), \
+         patch("src.agent.nodes.generate_final_answer_sql.get_llm_client", return_value=answer_client):
+        return list(stream_agent_events(agent, {"user_query": QUESTION, "errors": [], "sql_results": []}))
+
+def test_stream_emits_nodes_before_tokens_and_final_state():
+    """Le SQL et les résultats arrivent avant la réponse, qui est streamée token par token."""
+    events = _run(build_agent_graph())
+
+    nodes = [e["node"] for e in events if e["type"] == "node"]
+    tokens = [e["text"] for e in events if e["type"] == "token"]
+    first_token = next(i for i, e in enumerate(events) if e["type"] == "token")
+    execute_index = next(i for i, e in enumerate(events) if e.get("node") == "execute_sql")
+
+    assert nodes[:3] == ["guardrail", "classify_intent", "recherche_similaire"]
+    assert execute_index < first_token
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Le RHDP a gagné."
+    assert events[-1]["type"] == "done"
+    assert events[-1]["state"]["final_answer"] == "Le RHDP a gagné."
+
+def test_stream_through_answer_cache(tmp_path):
+    """Le wrapper de cache relaie le flux puis rejoue la réponse en un seul événement."""
+    agent = build_agent_graph(answer_cache=AnswerCache(db_path=str(tmp_path / "cache.db")))
+    _run(agent)
+
+    with patch("src.agent.nodes.classify_intent_sql.get_llm_client", side_effect=AssertionError("LLM appelé")):
+        events = list(stream_agent_events(agent, {"user_query": QUESTION, "errors": []}))
+
+    assert [e.get("node") for e in events if e["type"] == "node"] == ["answer_cache"]
+    assert events[-1]["state"]["final_answer"] == "Le RHDP a gagné."
@@ -0,0 +1,136 @@
+import sqlite3
+import pytest
+from unittest.mock import patch
+from src.agent.nodes import execute_sql
+from src.agent.nodes.verify_sql import verify_sql_node
+from src.agent.nodes.execute_sql import execute_sql_node
+from src.database.authorizer import cte_names, declared_ctes, select_only_authorizer, pop_denial
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    execute_sql._RESULT_CACHE.clear()
+    yield
+    execute_sql._RESULT_CACHE.clear()
+
+@pytest.fixture
+def guarded_conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE candidats (nom TEXT, score_voix INTEGER)")
+    conn.execute("CREATE TABLE secret (v TEXT)")
+    conn.execute("INSERT INTO candidats VALUES ('a', 10), ('b', 20)")
+    conn.set_authorizer(select_only_authorizer)
+    pop_denial()
+    yield conn
+    conn.close()
+
+def _state(query, errors=None):
+    return {"sql_query": query, "errors": errors or []}
+
+def test_valid_query_executed_once_and_passed_to_execute():
+    """Une requête valide est exécutée pendant la vérification ; execute_sql réutilise les lignes."""
+    query = "SELECT COUNT(*) AS nb FROM vue_elus_uniquement WHERE parti_politique_norm LIKE '%rhdp%'"
+
+    verified = verify_sql_node(_state(query))
+    with patch("src.database.connection.ConnectionPool.connection") as mock_conn:
+        executed = execute_sql_node({**_state(query), **verified.update})
+
+    assert verified.goto == "execute_sql"
+    assert verified.update["sql_results"].row(0)["nb"] > 0
+    mock_conn.assert_not_called()
+    assert executed.update["sql_results"] == verified.update["sql_results"]
+
+def test_write_statement_rejected():
+    """Une écriture est refusée par l'autorisateur et renvoyée à la génération."""
+    result = verify_sql_node(_state("DELETE FROM candidats"))
+
+    assert result.goto == "generate_sql"
+    assert result.update["errors"][0].startswith("SÉCURITÉ")
+    assert result.update["sql_query"] is None
+
+def test_unknown_table_reported():
+    """Une table inventée produit l'erreur SQLite pour le retry."""
+    result = verify_sql_node(_state("SELECT * FROM resultats_elections"))
+
+    assert result.goto == "generate_sql"
+    assert "no such table" in result.update["errors"][0]
+
+def test_too_many_errors_stops():
+    """Au troisième échec, on abandonne."""
+    result = verify_sql_node(_state("PRAGMA table_info(candidats)", errors=["e1", "e2"]))
+
+    assert result.goto == "reponse_hors_sujet"
+
+@pytest.mark.parametrize("query", [
+    "WITH s AS (SELECT v FROM secret) SELECT * FROM candidats, s",
+    "SELECT nom FROM candidats WHERE nom IN (SELECT v FROM secret)",
+    "SELECT * FROM candidats, secret",
+])
+def test_authorizer_sees_ctes_subqueries_and_commas(guarded_conn, query):
+    """Les tables cachées dans un CTE, une sous-requête ou une jointure implicite sont vérifiées."""
+    with pytest.raises(sqlite3.DatabaseError):
+        guarded_conn.execute(query)
+
+    assert "secret" in pop_denial()
+
+@pytest.mark.parametrize("query", [
+    "PRAGMA table_info(candidats)",
+    "ATTACH DATABASE ':memory:' AS autre",
+    "CREATE TEMP TABLE t AS SELECT * FROM candidats",
+    "SELECT load_extension('x')",
+])
+def test_authorizer_denies_non_select(guarded_conn, query):
+    """Pragmas, ATTACH, créations et extensions sont refusés à la préparation."""
+    with pytest.raises(sqlite3.DatabaseError):
+        guarded_conn.execute(query)
+
+    assert pop_denial().startswith("SÉCURITÉ")
+
+def test_authorizer_allows_select_with_cte(guarded_conn):
+    """Les SELECT avec CTE et fonctions sur les objets autorisés passent."""
+    rows = guarded_conn.execute(
+        "WITH top AS (SELECT nom, score_voix FROM candidats) SELECT UPPER(nom), MAX(score_voix) FROM top"
+    ).fetchall()
+
+    assert rows == [("B", 20)]
+    assert pop_denial() is None
+
+@pytest.mark.parametrize("query, action", [
+    ("DELETE FROM candidats", "DELETE"),
+    ("INSERT INTO candidats VALUES ('c', 1)", "INSERT"),
+])
+def test_authorizer_denial_names_action(guarded_conn, query, action):
+    """Le message de refus nomme l'action réelle (pas une constante SQLITE_LIMIT_* de même valeur)."""
+    with pytest.raises(sqlite3.DatabaseError):
+        guarded_conn.execute(query)
+
+    assert pop_denial() == f"SÉCURITÉ : Opération interdite ({action} candidats), SELECT uniquement."
+
+def test_authorizer_allows_recursive_cte(guarded_conn):
+    """Un CTE récursif peut se lire lui-même ; les tables non autorisées restent refusées."""
+    query = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x+1 FROM c WHERE x<5) SELECT count(*) FROM c"
+    with declared_ctes(query):
+        rows = guarded_conn.execute(query).fetchall()
+
+    assert rows == [(5,)]
+    assert pop_denial() is None
+    for query in ("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x+1 FROM c, secret WHERE x<5) SELECT * FROM c",
+                  "WITH c AS (SELECT 1) SELECT count(*) FROM secret"):
+        with pytest.raises(sqlite3.DatabaseError), declared_ctes(query):
+            guarded_conn.execute(query)
+        assert "secret" in pop_denial()
+
+def test_recursive_cte_through_verify():
+    """Le CTE récursif passe la vérification de bout en bout (plus de fausse HALLUCINATION)."""
+    query = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x+1 FROM c WHERE x<5) SELECT count(*) AS n FROM c"
+
+    result = verify_sql_node(_state(query))
+
+    assert result.goto == "execute_sql"
+    assert result.update["sql_results"].row(0)["n"] == 5
+
+def test_cte_names_ignore_literals_and_windows():
+    """Seuls les noms déclarés dans une clause WITH sont retenus."""
+    query = ("WITH RECURSIVE \"a\"(x) AS (SELECT 1), b AS MATERIALIZED (SELECT '(WITH z AS (' FROM t) "
+             "SELECT *, rank() OVER w FROM a WINDOW w AS (ORDER BY x), secret AS (ORDER BY x)")
+
+    assert cte_names(query) == {"a", "b"}
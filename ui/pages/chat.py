@@ -8,6 +8,62 @@ import os
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+# Libellés affichés pendant le streaming, par nœud du graphe
+NODE_LABELS = {
+    "guardrail": "Vérification de la question...",
+    "classify_intent": "Analyse de la question...",
+    "recherche_similaire": "Recherche d'exemples similaires...",
+    "generate_sql": "Génération de la requête SQL...",
+    "verify_sql": "Vérification de la requête SQL...",
+    "execute_sql": "Exécution de la requête...",
+    "determine_chart_intent": "Préparation de la réponse...",
+    "generate_chart": "Création du graphique...",
+    "generate_final_answer": "Rédaction de la réponse...",
+}
+
+
+def render_chart(chart_info):
+    """Affiche un graphique : figure Plotly (rendue dans le navigateur) ou PNG base64."""
+    try:
+        if isinstance(chart_info, dict) and "figure" in chart_info:
+            # Export PNG côté navigateur via la barre d'outils Plotly (aucun rendu serveur)
+            st.plotly_chart(chart_info["figure"], use_container_width=True,
+                            config={"toImageButtonOptions": {"format": "png"}})
+            if chart_info.get("note"):
+                st.caption(chart_info["note"])
+            return
+
+        # Gestion robuste du format base64
+        data_str = chart_info.get("data", "") if isinstance(chart_info, dict) else chart_info
+        img_bytes = base64.b64decode(data_str)
+        st.image(img_bytes, width="stretch")
+        if isinstance(chart_info, dict) and chart_info.get("note"):
+            st.caption(chart_info["note"])
+    except Exception:
+        st.error("Erreur d'affichage du graphique")
+
+
+def render_sql(sql_query, sql_params=None):
+    """Affiche la requête SQL générée (valeurs des paramètres réinjectées pour la lecture)."""
+    from src.database.sql_params import inline_params
+
+    with st.expander("Voir la requête SQL"):
+        st.code(inline_params(sql_query, sql_params), language="sql")
+
+
+def render_results(results, total_rows=None, total_exact=True):
+    """Affiche les données brutes (on évite d'afficher des listes vides)."""
+    if not len(results):
+        return
+    with st.expander("Voir les données brutes"):
+        # ResultSet : colonnes numériques partagées avec le DataFrame (pas de copie)
+        df = results.to_pandas() if hasattr(results, "to_pandas") else pd.DataFrame(results)
+        if total_rows and total_rows > len(df):
+            bound = "" if total_exact else "plus de "
+            st.caption(f"Affichage des {len(df)} premières lignes sur {bound}{total_rows}.")
+        st.dataframe(df, use_container_width=True)
+
+
 def chat_page():
     """
     Page de chat avec l'agent SQL électoral
@@ -30,7 +86,8 @@ Pour des résultats plus précis, veuillez toujours préciser :
     def get_agent():
         # C'est ICI que l'import se fait, une fois que les clés sont chargées dans app.py
         from src.agent.graph import build_agent_graph
-        return build_agent_graph()
+        from src.agent.answer_cache import AnswerCache
+        return build_agent_graph(answer_cache=AnswerCache())
     
     # Tentative de chargement de l'agent
     try:
@@ -51,27 +108,18 @@ Pour des résultats plus précis, veuillez toujours préciser :
             # 1. Texte
             st.markdown(message["content"])
             
-            # 2. Graphique (Décodage Base64)
+            # 2. Graphique
             if message.get("chart"):
-                chart_info = message["chart"]
-                try:
-                    # Gestion robuste du format base64
-                    data_str = chart_info.get("data", "") if isinstance(chart_info, dict) else chart_info
-                    img_bytes = base64.b64decode(data_str)
-                    st.image(img_bytes, width="stretch")
-                except Exception as e:
-                    st.error(f"Erreur d'affichage du graphique")
+                render_chart(message["chart"])
+
+            # 3. Requête SQL
+            if message.get("sql_query"):
+                render_sql(message["sql_query"], message.get("sql_params"))
             
-            # 3. Données SQL (Tableau)
-            if message.get("sql_results") is not None:
-                # On évite d'afficher des listes vides
-                results = message["sql_results"]
-                if isinstance(results, list) and not results:
-                    pass
-                else:
-                    with st.expander("Voir les données brutes"):
-                        df = pd.DataFrame(results) if isinstance(results, list) else results
-                        st.dataframe(df, use_container_width=True)
+            # 4. Données SQL (Tableau)
+            if message.get("sql_results"):
+                render_results(message["sql_results"], message.get("sql_total_rows"),
+                               message.get("sql_total_exact", True))
 
     # Affichage de l'historique
     for message in st.session_state.messages:
@@ -85,64 +133,90 @@ Pour des résultats plus précis, veuillez toujours préciser :
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # 2. Réponse Assistant
+        # 2. Réponse Assistant (streaming : chaque élément s'affiche dès que son nœud termine)
         with st.chat_message("assistant"):
-            with st.spinner("Analyse des données en cours..."):
-                try:
-                    # Préparation de l'état initial pour LangGraph
-                    initial_state = {
-                        "user_query": prompt,
-                        # On initialise les autres champs à None/Vide pour éviter les KeyError
-                        "classification": None,
-                        "sql_query": None,
-                        "sql_results": [],
-                        "chart_generated": False,
-                        "errors": [],
-                        "final_answer": None
-                    }
-                    
-                    # Invoquer l'agent
-                    result = agent.invoke(initial_state)
-                    
-                    # Extraction sécurisée des résultats
-                    final_answer = result.get("final_answer", "Je n'ai pas trouvé de réponse.")
-                    sql_results = result.get("sql_results")
-                    chart_data = result.get("chart_data") 
-                    
-                    # --- AFFICHAGE LIVE ---
-                    st.markdown(final_answer)
-                    
-                    if chart_data:
-                        try:
-                            data_str = chart_data.get("data", "") if isinstance(chart_data, dict) else chart_data
-                            img_bytes = base64.b64decode(data_str)
-                            st.image(img_bytes, width="stretch")
-                        except:
-                            pass # On ignore silencieusement les erreurs d'image en live
-                    
-                    if sql_results:
-                         if isinstance(sql_results, list) and len(sql_results) > 0:
-                            with st.expander("Voir les données brutes"):
-                                df = pd.DataFrame(sql_results)
-                                st.dataframe(df, use_container_width=True)
-                    
-                    # --- SAUVEGARDE HISTORIQUE ---
-                    message_data = {
-                        "role": "assistant",
-                        "content": final_answer,
-                        "chart": chart_data,
-                        "sql_results": sql_results
-                    }
-                    st.session_state.messages.append(message_data)
-                    
-                except Exception as e:
-                    # Gestion propre des erreurs pour l'utilisateur
-                    error_msg = f"Une erreur est survenue : {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({
-                        "role": "assistant", 
-                        "content": "Désolé, une erreur technique m'a empêché de répondre."
-                    })
+            from src.agent.streaming import stream_agent_events
+
+            status = st.status("Analyse des données en cours...", expanded=False)
+            answer_placeholder = st.empty()
+            chart_placeholder = st.empty()
+            sql_placeholder = st.empty()
+            data_placeholder = st.empty()
+
+            try:
+                # Préparation de l'état initial pour LangGraph
+                initial_state = {
+                    "user_query": prompt,
+                    # On initialise les autres champs à None/Vide pour éviter les KeyError
+                    "classification": None,
+                    "sql_query": None,
+                    "sql_params": None,
+                    "sql_results": None,
+                    "sql_truncated": False,
+                    "sql_total_rows": None,
+                    "sql_total_exact": True,
+                    "chart_generated": False,
+                    "errors": [],
+                    "final_answer": None
+                }
+
+                streamed_answer = ""
+                result = initial_state
+
+                # Invoquer l'agent en streaming
+                for event in stream_agent_events(agent, initial_state):
+                    if event["type"] == "token":
+                        streamed_answer += event["text"]
+                        answer_placeholder.markdown(streamed_answer + "▌")
+
+                    elif event["type"] == "node":
+                        node, update = event["node"], event["update"]
+                        status.update(label=NODE_LABELS.get(node, "Analyse des données en cours..."))
+
+                        if update.get("sql_query"):
+                            with sql_placeholder.container():
+                                render_sql(update["sql_query"], update.get("sql_params"))
+                        if update.get("sql_results"):
+                            with data_placeholder.container():
+                                render_results(update["sql_results"], update.get("sql_total_rows"),
+                                               update.get("sql_total_exact", True))
+                        if update.get("chart_data"):
+                            with chart_placeholder.container():
+                                render_chart(update["chart_data"])
+                        if update.get("final_answer"):
+                            answer_placeholder.markdown(update["final_answer"])
+
+                    elif event["type"] == "done":
+                        result = event["state"]
+
+                status.update(label="Analyse terminée", state="complete")
+
+                # Extraction sécurisée des résultats
+                final_answer = result.get("final_answer") or streamed_answer or "Je n'ai pas trouvé de réponse."
+                answer_placeholder.markdown(final_answer)
+
+                # --- SAUVEGARDE HISTORIQUE ---
+                message_data = {
+                    "role": "assistant",
+                    "content": final_answer,
+                    "chart": result.get("chart_data"),
+                    "sql_query": result.get("sql_query"),
+                    "sql_params": result.get("sql_params"),
+                    "sql_results": result.get("sql_results"),
+                    "sql_total_rows": result.get("sql_total_rows"),
+                    "sql_total_exact": result.get("sql_total_exact", True)
+                }
+                st.session_state.messages.append(message_data)
+                
+            except Exception as e:
+                status.update(label="Erreur", state="error")
+                # Gestion propre des erreurs pour l'utilisateur
+                error_msg = f"Une erreur est survenue : {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append({
+                    "role": "assistant", 
+                    "content": "Désolé, une erreur technique m'a empêché de répondre."
+                })
 
     # --- RESET ---
     st.sidebar.divider()